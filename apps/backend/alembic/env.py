@@ -28,8 +28,20 @@ from app.db.db import Base
 # Nota: Importamos directamente models.py, no el __init__.py
 from app.models import models  # noqa: F401
 
+from app.db import indices_busqueda
+
 target_metadata = Base.metadata
 
+
+def include_object(objeto, nombre, tipo, reflejado, comparar_con):
+    # Índices de búsqueda creados con DDL propio (app/db/indices_busqueda.py):
+    # no están en la metadata y autogenerate no debe proponer borrarlos
+    if tipo == "index" and nombre in indices_busqueda.PG_INDICES:
+        return False
+    if tipo == "table" and nombre == indices_busqueda.SQLITE_FTS_TABLA:
+        return False
+    return True
+
 # Cargar variables del archivo .env
 # Buscar el archivo .env en el directorio backend
 env_path = os.path.join(backend_root, '.env')
@@ -69,6 +81,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -85,7 +98,8 @@ def run_migrations_online() -> None:
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,32 @@
+"""add ix_formulario_asignaciones_estado_expiracion for expiring overdue assignments
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-19 00:00:06.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3b4c5d6e7f8'
+down_revision: Union[str, Sequence[str], None] = 'f2a3b4c5d6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_formulario_asignaciones_estado_expiracion',
+        'formulario_asignaciones',
+        ['estado', 'fecha_expiracion'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_formulario_asignaciones_estado_expiracion', table_name='formulario_asignaciones')
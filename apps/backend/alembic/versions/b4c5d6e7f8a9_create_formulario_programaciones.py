@@ -0,0 +1,76 @@
+"""create formulario_programaciones for recurring form assignments
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-19 00:00:07.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4c5d6e7f8a9'
+down_revision: Union[str, Sequence[str], None] = 'a3b4c5d6e7f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'formulario_programaciones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('formulario_id', sa.Integer(), nullable=False),
+        sa.Column('paciente_id', sa.Integer(), nullable=False),
+        sa.Column('creado_por', sa.Integer(), nullable=False),
+        sa.Column('fecha_inicio', sa.DateTime(), nullable=False),
+        sa.Column('intervalo_dias', sa.Integer(), nullable=False),
+        sa.Column('repeticiones', sa.Integer(), nullable=False),
+        sa.Column('vigencia_dias', sa.Integer(), nullable=True),
+        sa.Column('generadas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('proxima_fecha', sa.DateTime(), nullable=False),
+        sa.Column('activa', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['formulario_id'], ['formularios.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['paciente_id'], ['pacientes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['creado_por'], ['medicos.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_formulario_programaciones_id'), 'formulario_programaciones', ['id'], unique=False)
+    op.create_index(op.f('ix_formulario_programaciones_formulario_id'), 'formulario_programaciones', ['formulario_id'], unique=False)
+    op.create_index(op.f('ix_formulario_programaciones_paciente_id'), 'formulario_programaciones', ['paciente_id'], unique=False)
+    op.create_index(
+        'ix_formulario_programaciones_activa_proxima',
+        'formulario_programaciones',
+        ['activa', 'proxima_fecha'],
+        unique=False,
+    )
+
+    # Asignaciones generadas por una programación
+    op.add_column('formulario_asignaciones', sa.Column('programacion_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_formulario_asignaciones_programacion_id',
+        'formulario_asignaciones',
+        'formulario_programaciones',
+        ['programacion_id'],
+        ['id'],
+        ondelete='SET NULL',
+    )
+    op.create_index(
+        op.f('ix_formulario_asignaciones_programacion_id'), 'formulario_asignaciones', ['programacion_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_formulario_asignaciones_programacion_id'), table_name='formulario_asignaciones')
+    op.drop_constraint('fk_formulario_asignaciones_programacion_id', 'formulario_asignaciones', type_='foreignkey')
+    op.drop_column('formulario_asignaciones', 'programacion_id')
+    op.drop_index('ix_formulario_programaciones_activa_proxima', table_name='formulario_programaciones')
+    op.drop_index(op.f('ix_formulario_programaciones_paciente_id'), table_name='formulario_programaciones')
+    op.drop_index(op.f('ix_formulario_programaciones_formulario_id'), table_name='formulario_programaciones')
+    op.drop_index(op.f('ix_formulario_programaciones_id'), table_name='formulario_programaciones')
+    op.drop_table('formulario_programaciones')
@@ -0,0 +1,78 @@
+"""add nombre_normalizado and search indexes to pacientes
+
+Revision ID: b7c8d9e0f1a2
+Revises: f1a2b3c4d5e6
+Create Date: 2026-10-19 00:00:01.000000
+
+"""
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db import indices_busqueda
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c8d9e0f1a2'
+down_revision: Union[str, Sequence[str], None] = 'f1a2b3c4d5e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOTE = 1000
+
+
+def _normalizar(texto):
+    # Copia de app.core.texto.normalizar_texto (la migración no depende del código de la app)
+    if not texto:
+        return ""
+    t = unicodedata.normalize("NFKD", str(texto))
+    t = "".join(c for c in t if not unicodedata.combining(c))
+    return " ".join(t.lower().split())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('pacientes', sa.Column('nombre_normalizado', sa.String(), nullable=True))
+
+    # Completar la columna para los pacientes existentes
+    conn = op.get_bind()
+    pacientes = sa.table(
+        'pacientes',
+        sa.column('id', sa.Integer),
+        sa.column('nombre', sa.String),
+        sa.column('nombre_normalizado', sa.String),
+    )
+    actualizar = (
+        pacientes.update()
+        .where(pacientes.c.id == sa.bindparam('b_id'))
+        .values(nombre_normalizado=sa.bindparam('b_nombre'))
+    )
+    filas = conn.execute(sa.select(pacientes.c.id, pacientes.c.nombre)).all()
+    for i in range(0, len(filas), LOTE):
+        conn.execute(actualizar, [
+            {'b_id': id_, 'b_nombre': _normalizar(nombre)} for id_, nombre in filas[i:i + LOTE]
+        ])
+
+    if conn.dialect.name == 'postgresql':
+        op.execute(indices_busqueda.PG_EXTENSION)
+        for sentencia in indices_busqueda.PG_INDICES.values():
+            op.execute(sentencia)
+    elif conn.dialect.name == 'sqlite':
+        for sentencia in indices_busqueda.SQLITE_FTS:
+            op.execute(sentencia)
+        op.execute(indices_busqueda.SQLITE_FTS_REBUILD)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        for indice in indices_busqueda.PG_INDICES:
+            op.execute(f'DROP INDEX IF EXISTS {indice}')
+    elif conn.dialect.name == 'sqlite':
+        for trigger in indices_busqueda.SQLITE_FTS_TRIGGERS:
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute(f'DROP TABLE IF EXISTS {indices_busqueda.SQLITE_FTS_TABLA}')
+    op.drop_column('pacientes', 'nombre_normalizado')
@@ -0,0 +1,36 @@
+"""clear bodies of sent and failed email_outbox rows
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-10-19 00:00:08.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d6e7f8a9b0'
+down_revision: Union[str, Sequence[str], None] = 'b4c5d6e7f8a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Los correos ya procesados guardaban tokens y contraseñas temporales en claro
+    # (los fallidos de ahora en más conservan el cuerpo, pero cifrado).
+    # Los pendientes se dejan: el worker los reconoce (no son tokens Fernet) y
+    # los envía tal cual
+    op.execute(
+        "UPDATE email_outbox SET cuerpo_texto = '', cuerpo_html = NULL "
+        "WHERE estado IN ('enviado', 'fallido')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Los cuerpos borrados no se pueden recuperar
+    pass
@@ -0,0 +1,38 @@
+"""restore partial unique index for the active asignacion per paciente
+
+Revision ID: c8d9e0f1a2b3
+Revises: b7c8d9e0f1a2
+Create Date: 2026-10-19 00:00:02.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d9e0f1a2b3'
+down_revision: Union[str, Sequence[str], None] = 'b7c8d9e0f1a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 8e87c495bd52 borró el índice por error (autogenerate). Antes de recrearlo,
+    # dejar activa sólo la asignación más reciente de cada paciente.
+    op.execute(
+        "UPDATE asignaciones SET activo = false, fecha_desactivacion = CURRENT_TIMESTAMP "
+        "WHERE activo = true AND id NOT IN ("
+        "SELECT MAX(id) FROM asignaciones WHERE activo = true GROUP BY paciente_id)"
+    )
+    op.create_index(
+        'uq_asignacion_activa_por_paciente', 'asignaciones', ['paciente_id'], unique=True,
+        postgresql_where=sa.text('activo = true'), sqlite_where=sa.text('activo = 1'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_asignacion_activa_por_paciente', table_name='asignaciones')
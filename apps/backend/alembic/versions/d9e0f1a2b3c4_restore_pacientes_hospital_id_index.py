@@ -0,0 +1,28 @@
+"""restore index on pacientes.hospital_id
+
+Revision ID: d9e0f1a2b3c4
+Revises: c8d9e0f1a2b3
+Create Date: 2026-10-19 00:00:03.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9e0f1a2b3c4'
+down_revision: Union[str, Sequence[str], None] = 'c8d9e0f1a2b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 8e87c495bd52 lo borró por error; lo usa el listado de pacientes del coordinador
+    op.create_index(op.f('ix_pacientes_hospital_id'), 'pacientes', ['hospital_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pacientes_hospital_id'), table_name='pacientes')
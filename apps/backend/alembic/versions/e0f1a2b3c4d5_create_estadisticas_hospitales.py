@@ -0,0 +1,43 @@
+"""create estadisticas_hospitales rollup table
+
+Revision ID: e0f1a2b3c4d5
+Revises: d9e0f1a2b3c4
+Create Date: 2026-10-19 00:00:04.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e0f1a2b3c4d5'
+down_revision: Union[str, Sequence[str], None] = 'd9e0f1a2b3c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Se completa al arrancar la API (refresco completo) o con
+    # `python -m app.services.estadisticas_hospitales`.
+    op.create_table(
+        'estadisticas_hospitales',
+        sa.Column('hospital_id', sa.Integer(), nullable=False),
+        sa.Column('total_pacientes', sa.Integer(), nullable=False),
+        sa.Column('pacientes_asignados', sa.Integer(), nullable=False),
+        sa.Column('pacientes_sin_medico', sa.Integer(), nullable=False),
+        sa.Column('total_medicos', sa.Integer(), nullable=False),
+        sa.Column('medicos_por_especialidad', sa.JSON(), nullable=False),
+        sa.Column('formularios_pendientes', sa.Integer(), nullable=False),
+        sa.Column('mensajes_no_leidos', sa.Integer(), nullable=False),
+        sa.Column('actualizado_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['hospital_id'], ['hospitales.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('hospital_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('estadisticas_hospitales')
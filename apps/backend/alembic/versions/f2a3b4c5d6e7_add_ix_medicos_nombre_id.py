@@ -0,0 +1,27 @@
+"""add ix_medicos_nombre_id for keyset pagination of medicos
+
+Revision ID: f2a3b4c5d6e7
+Revises: e0f1a2b3c4d5
+Create Date: 2026-10-19 00:00:05.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a3b4c5d6e7'
+down_revision: Union[str, Sequence[str], None] = 'e0f1a2b3c4d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_medicos_nombre_id', 'medicos', ['nombre', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_medicos_nombre_id', table_name='medicos')
@@ -0,0 +1,170 @@
+"""
+Caches con expiración (TTL).
+
+- `CacheTTL`: en memoria, por proceso. Pensada para valores caros de calcular
+  que pueden estar unos segundos desactualizados (estadísticas, catálogos).
+  Cada worker de uvicorn tiene su propia copia: quien modifica los datos debe
+  llamar a `invalidar()` para su proceso, y el TTL acota cuánto tardan en
+  enterarse los demás.
+- `CacheRedis`: la misma interfaz sobre Redis (`REDIS_URL`), compartida por
+  todos los procesos. Si Redis no responde se comporta como una caché vacía.
+
+`crear_cache()` elige una u otra según `CACHE_BACKEND`.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_AUSENTE = object()
+
+
+class CacheTTL:
+    """
+    Diccionario thread-safe cuyas entradas vencen a los `ttl` segundos.
+    Con `max_entradas` se descartan las usadas hace más tiempo (LRU).
+    """
+
+    def __init__(self, ttl: float, max_entradas: int = 1024):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._datos: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Hashable, defecto: Any = None) -> Any:
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return defecto
+            vence, valor = entrada
+            if vence <= time.monotonic():
+                del self._datos[clave]
+                return defecto
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any, ttl: Optional[float] = None) -> None:
+        vence = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._datos[clave] = (vence, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def agregar(self, clave: Hashable, valor: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Guarda sólo si la clave no tiene un valor vigente. Evita que un lector
+        que consultó la base antes de un cambio pise el valor que dejó quien
+        hizo el cambio.
+        """
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None and entrada[0] > time.monotonic():
+                return False
+        self.guardar(clave, valor, ttl)
+        return True
+
+    def obtener_o_calcular(self, clave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """
+        Devuelve el valor cacheado o lo calcula y lo guarda. El cálculo se hace
+        fuera del lock: dos requests simultáneas pueden calcularlo ambas.
+        """
+        valor = self.obtener(clave, _AUSENTE)
+        if valor is _AUSENTE:
+            valor = calcular()
+            self.guardar(clave, valor)
+        return valor
+
+    def invalidar(self, *claves: Hashable) -> None:
+        with self._lock:
+            for clave in claves:
+                self._datos.pop(clave, None)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+
+class CacheRedis:
+    """
+    Misma interfaz que `CacheTTL` sobre Redis. Los valores se guardan como JSON
+    bajo `prefijo:clave`. Los errores de Redis se registran y se tratan como
+    ausencia del valor: quien use la caché vuelve a la base de datos.
+    """
+
+    def __init__(self, prefijo: str, ttl: float, url: Optional[str] = None):
+        import redis
+
+        self.prefijo = prefijo
+        self.ttl = ttl
+        self._redis_error = redis.RedisError
+        self._cliente = redis.Redis.from_url(url or settings.REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def _clave(self, clave: Hashable) -> str:
+        return f"{self.prefijo}:{clave}"
+
+    def _ms(self, ttl: Optional[float]) -> int:
+        return max(1, int((self.ttl if ttl is None else ttl) * 1000))
+
+    def obtener(self, clave: Hashable, defecto: Any = None) -> Any:
+        try:
+            crudo = self._cliente.get(self._clave(clave))
+        except self._redis_error as error:
+            logger.warning("Caché Redis '%s' no disponible: %s", self.prefijo, error)
+            return defecto
+        return defecto if crudo is None else json.loads(crudo)
+
+    def guardar(self, clave: Hashable, valor: Any, ttl: Optional[float] = None) -> None:
+        try:
+            self._cliente.set(self._clave(clave), json.dumps(valor), px=self._ms(ttl))
+        except self._redis_error as error:
+            logger.warning("Caché Redis '%s' no disponible: %s", self.prefijo, error)
+
+    def agregar(self, clave: Hashable, valor: Any, ttl: Optional[float] = None) -> bool:
+        try:
+            return bool(self._cliente.set(self._clave(clave), json.dumps(valor), px=self._ms(ttl), nx=True))
+        except self._redis_error as error:
+            logger.warning("Caché Redis '%s' no disponible: %s", self.prefijo, error)
+            return False
+
+    def obtener_o_calcular(self, clave: Hashable, calcular: Callable[[], Any]) -> Any:
+        valor = self.obtener(clave, _AUSENTE)
+        if valor is _AUSENTE:
+            valor = calcular()
+            self.guardar(clave, valor)
+        return valor
+
+    def invalidar(self, *claves: Hashable) -> None:
+        if not claves:
+            return
+        try:
+            self._cliente.delete(*(self._clave(c) for c in claves))
+        except self._redis_error as error:
+            logger.warning("Caché Redis '%s' no disponible: %s", self.prefijo, error)
+
+    def limpiar(self) -> None:
+        try:
+            for clave in self._cliente.scan_iter(f"{self.prefijo}:*"):
+                self._cliente.delete(clave)
+        except self._redis_error as error:
+            logger.warning("Caché Redis '%s' no disponible: %s", self.prefijo, error)
+
+
+def crear_cache(nombre: str, ttl: float, max_entradas: int = 1024):
+    """
+    Caché compartida entre procesos (Redis) si `CACHE_BACKEND=redis`; si no, en
+    memoria del proceso. Sólo para valores serializables como JSON.
+    """
+    if settings.CACHE_BACKEND == "redis":
+        return CacheRedis(nombre, ttl)
+    return CacheTTL(ttl, max_entradas)
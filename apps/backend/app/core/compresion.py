@@ -0,0 +1,162 @@
+"""
+Compresión de respuestas HTTP (Brotli o gzip).
+
+Las definiciones de formularios, los listados de respuestas y los catálogos de
+hospitales son JSON muy repetitivo, y buena parte de los pacientes entra con
+datos móviles. `CompresionMiddleware` comprime el cuerpo según el
+`Accept-Encoding` del cliente:
+
+- `br` si el paquete `brotli` está instalado y el cliente lo acepta; si no, `gzip`.
+- Sólo respuestas de al menos `COMPRESION_MIN_BYTES` (en las de streaming se
+  comprime siempre: no se conoce el tamaño total).
+- Nunca WebSockets, respuestas que ya traen `Content-Encoding` ni tipos ya
+  comprimidos (XLSX, ZIP, imágenes, ...) o de streaming de eventos.
+
+Al comprimir, un `ETag` fuerte pasa a débil (`W/"..."`): el cuerpo ya no es el
+mismo byte a byte. `no_modificado` compara en forma débil, así que el 304 sigue
+funcionando. Toda respuesta comprimible (por tipo y tamaño) lleva
+`Vary: Accept-Encoding`, se haya comprimido o no en ese request.
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # opcional: sin el paquete sólo se ofrece gzip
+    brotli = None
+
+# Tipos que no vale la pena comprimir (ya comprimidos) o que no se deben
+# bufferizar (eventos en streaming)
+TIPOS_EXCLUIDOS = (
+    "application/vnd.openxmlformats-officedocument",  # .xlsx / .docx
+    "application/zip",
+    "application/gzip",
+    "application/pdf",
+    "image/",
+    "audio/",
+    "video/",
+    "text/event-stream",
+)
+
+
+def elegir_codificacion(accept_encoding: str) -> Optional[str]:
+    """`"br"`, `"gzip"` o `None` según el header `Accept-Encoding` (respeta `q=0`)."""
+    aceptadas = {}
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        calidad = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                calidad = float(parametro[2:])
+            except ValueError:
+                calidad = 0.0
+        if nombre:
+            aceptadas[nombre] = calidad
+    comodin = aceptadas.get("*", 0.0)
+    if brotli is not None and aceptadas.get("br", comodin) > 0:
+        return "br"
+    if aceptadas.get("gzip", comodin) > 0:
+        return "gzip"
+    return None
+
+
+class _Compresor:
+    def __init__(self, codificacion: str):
+        self.codificacion = codificacion
+        if codificacion == "br":
+            self._br = brotli.Compressor(quality=settings.COMPRESION_BROTLI_CALIDAD)
+        else:
+            # wbits 16 + MAX_WBITS: formato gzip (header y CRC)
+            self._gzip = zlib.compressobj(settings.COMPRESION_GZIP_NIVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, datos: bytes, final: bool) -> bytes:
+        if self.codificacion == "br":
+            salida = self._br.process(datos)
+            return salida + (self._br.finish() if final else self._br.flush())
+        salida = self._gzip.compress(datos)
+        return salida + self._gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompresionMiddleware:
+    def __init__(self, app: ASGIApp, minimo_bytes: Optional[int] = None):
+        self.app = app
+        self.minimo_bytes = settings.COMPRESION_MIN_BYTES if minimo_bytes is None else minimo_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # Sin codificación aceptable la respuesta sale tal cual, pero igual lleva
+        # `Vary` para que un caché no se la sirva a un cliente que sí comprime
+        codificacion = elegir_codificacion(Headers(scope=scope).get("accept-encoding", ""))
+
+        inicio: Optional[Message] = None
+        compresor: Optional[_Compresor] = None
+        directo = False
+
+        async def enviar(message: Message) -> None:
+            nonlocal inicio, compresor, directo
+            tipo = message["type"]
+            if tipo == "http.response.start":
+                # Se retiene hasta ver el primer bloque del cuerpo
+                inicio = message
+                headers = Headers(raw=message["headers"])
+                directo = (
+                    "content-encoding" in headers
+                    or headers.get("content-type", "").startswith(TIPOS_EXCLUIDOS)
+                )
+                return
+            if tipo != "http.response.body" or directo:
+                if inicio is not None:
+                    await send(inicio)
+                    inicio = None
+                await send(message)
+                return
+
+            cuerpo = message.get("body", b"")
+            hay_mas = message.get("more_body", False)
+            if inicio is not None:
+                if not hay_mas and len(cuerpo) < self.minimo_bytes:
+                    directo = True
+                    await send(inicio)
+                    inicio = None
+                    await send(message)
+                    return
+                if codificacion is None:
+                    directo = True
+                    MutableHeaders(raw=inicio["headers"]).add_vary_header("Accept-Encoding")
+                    await send(inicio)
+                    inicio = None
+                    await send(message)
+                    return
+                compresor = _Compresor(codificacion)
+                headers = MutableHeaders(raw=inicio["headers"])
+                headers["Content-Encoding"] = codificacion
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                comprimido = compresor.comprimir(cuerpo, final=not hay_mas)
+                if hay_mas:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(comprimido))
+                await send(inicio)
+                inicio = None
+                await send({"type": "http.response.body", "body": comprimido, "more_body": hay_mas})
+                return
+
+            await send({
+                "type": "http.response.body",
+                "body": compresor.comprimir(cuerpo, final=not hay_mas),
+                "more_body": hay_mas,
+            })
+
+        await self.app(scope, receive, enviar)
@@ -24,6 +24,25 @@ class Settings(BaseSettings):
     SMTP_FROM_NAME: str = os.getenv("SMTP_FROM_NAME", "Salud en Mapa")
     SMTP_STARTTLS: bool = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes", "on")
 
+    # Pool de conexiones SMTP y outbox de correos (envío en segundo plano)
+    SMTP_POOL_SIZE: int = int(os.getenv("SMTP_POOL_SIZE", "2"))
+    SMTP_POOL_MAX_IDLE_SECONDS: float = float(os.getenv("SMTP_POOL_MAX_IDLE_SECONDS", "60"))
+    EMAIL_OUTBOX_POLL_SECONDS: float = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "5"))
+    # Los nombres EMAIL_QUEUE_* (de la cola en memoria que precedió al outbox) se
+    # siguen aceptando
+    EMAIL_OUTBOX_BATCH_SIZE: int = int(
+        os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "") or os.getenv("EMAIL_QUEUE_BATCH_SIZE", "20")
+    )
+    EMAIL_OUTBOX_MAX_RETRIES: int = int(
+        os.getenv("EMAIL_OUTBOX_MAX_RETRIES", "") or os.getenv("EMAIL_QUEUE_MAX_RETRIES", "5")
+    )
+    EMAIL_OUTBOX_BACKOFF_SECONDS: float = float(
+        os.getenv("EMAIL_OUTBOX_BACKOFF_SECONDS", "") or os.getenv("EMAIL_QUEUE_BACKOFF_SECONDS", "2")
+    )
+    EMAIL_OUTBOX_LEASE_SECONDS: float = float(os.getenv("EMAIL_OUTBOX_LEASE_SECONDS", "300"))
+    EMAIL_OUTBOX_RETENTION_DAYS: int = int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", "7"))
+    EMAIL_OUTBOX_PURGE_SECONDS: float = float(os.getenv("EMAIL_OUTBOX_PURGE_SECONDS", "3600"))
+
     # URL pública del frontend (para enlaces en los correos)
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "https://www.saludenmapa.com")
 
@@ -33,4 +52,52 @@ class Settings(BaseSettings):
     # Horas de validez del token de invitación de administrador
     ADMIN_INVITATION_TOKEN_EXPIRE_HOURS: int = int(os.getenv("ADMIN_INVITATION_TOKEN_EXPIRE_HOURS", "48"))
 
+    # ===== Monitoreo =====
+    # Consultas SQL más lentas que este umbral se registran en el log
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+    # ===== Caché =====
+    # Antigüedad máxima del catálogo de especialidades y hospitales en memoria
+    # (ver app.services.catalogos; los cambios del propio worker se ven al instante)
+    CATALOGO_CACHE_SECONDS: float = float(os.getenv("CATALOGO_CACHE_SECONDS", "60"))
+    # Cada cuántos segundos un worker consulta la versión compartida del catálogo
+    # (con CACHE_BACKEND=redis, un GET; entre consultas usa la última versión leída)
+    CATALOGO_VERSION_CHECK_SECONDS: float = float(os.getenv("CATALOGO_VERSION_CHECK_SECONDS", "1"))
+    # max-age (Cache-Control) de los endpoints públicos de especialidades y hospitales
+    CATALOGO_HTTP_MAX_AGE: int = int(os.getenv("CATALOGO_HTTP_MAX_AGE", "60"))
+    # Cantidad máxima de tokens JWT verificados que se recuerdan (0 = sin caché)
+    JWT_CACHE_SIZE: int = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+    # "memoria" (por proceso) o "redis" (REDIS_URL, compartida entre procesos)
+    # para las cachés que deben invalidarse en todas las réplicas a la vez
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memoria").lower()
+    # Segundos que se recuerda si un admin está activo (ver require_admin). Con
+    # caché en memoria y varios workers, es la demora máxima de una baja en los
+    # demás workers.
+    ADMIN_ACTIVO_CACHE_SECONDS: float = float(os.getenv("ADMIN_ACTIVO_CACHE_SECONDS", "10"))
+
+    # ===== Estadísticas materializadas por hospital =====
+    # Cada cuántos segundos se recalculan los hospitales con cambios, y cada
+    # cuántos se hace el refresco completo
+    ESTADISTICAS_INCREMENTAL_SECONDS: float = float(os.getenv("ESTADISTICAS_INCREMENTAL_SECONDS", "10"))
+    ESTADISTICAS_REFRESH_SECONDS: float = float(os.getenv("ESTADISTICAS_REFRESH_SECONDS", "900"))
+
+    # ===== Expiración de asignaciones de formularios =====
+    # Cada cuántos segundos se expiran las asignaciones pendientes vencidas, y
+    # cuántas por UPDATE (ver app.services.expiracion_formularios)
+    EXPIRACION_FORMULARIOS_SECONDS: float = float(os.getenv("EXPIRACION_FORMULARIOS_SECONDS", "60"))
+    EXPIRACION_FORMULARIOS_LOTE: int = int(os.getenv("EXPIRACION_FORMULARIOS_LOTE", "1000"))
+
+    # ===== Programaciones recurrentes de formularios =====
+    # Cada cuántos segundos se generan las asignaciones programadas que vencieron,
+    # y cuántas programaciones por lote (ver app.services.programacion_formularios)
+    PROGRAMACIONES_SECONDS: float = float(os.getenv("PROGRAMACIONES_SECONDS", "300"))
+    PROGRAMACIONES_LOTE: int = int(os.getenv("PROGRAMACIONES_LOTE", "1000"))
+
+    # ===== Compresión de respuestas =====
+    # Tamaño mínimo (bytes) de una respuesta para comprimirla (ver app.core.compresion)
+    COMPRESION_MIN_BYTES: int = int(os.getenv("COMPRESION_MIN_BYTES", "1024"))
+    # Nivel de gzip (1-9) y calidad de Brotli (0-11): más alto comprime más y usa más CPU
+    COMPRESION_GZIP_NIVEL: int = int(os.getenv("COMPRESION_GZIP_NIVEL", "6"))
+    COMPRESION_BROTLI_CALIDAD: int = int(os.getenv("COMPRESION_BROTLI_CALIDAD", "4"))
+
 settings = Settings()
@@ -7,13 +7,14 @@ Este módulo contiene las funciones de inyección de dependencias para:
 - Verificar permisos sobre hospitales
 """
 
+from functools import lru_cache
 from typing import Optional
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
+from app.core.cache import crear_cache
 from app.core.config import settings
+from app.core.security import oauth2_scheme, usuario_desde_token
 from app.db.db import get_db
 from app.models.models import Admin, Hospital, Medico, Paciente, Coordinador
 
@@ -22,51 +23,65 @@ SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-
-# ✅ Devolver DICCIONARIO (igual que security.py) para compatibilidad
 def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     """
     Obtiene el usuario actual desde el token JWT.
     Devuelve un DICCIONARIO con la información del usuario.
+
+    Es la única dependencia de autenticación de las rutas: FastAPI la resuelve
+    una sola vez por request aunque varias dependencias la pidan, y la
+    verificación del token queda cacheada por token (ver `decodificar_token`).
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudo validar credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-
-        user_id: str = payload.get("sub")
-        rol: str = payload.get("rol")
-        email: str = payload.get("email")
-        nombre: str = payload.get("nombre")
-
-        if user_id is None or rol is None:
-            raise credentials_exception
-
-        # ✅ Devolver diccionario para compatibilidad con coordinador_service.py
-        return {
-            "id": int(user_id),
-            "rol": rol,
-            "email": email,
-            "nombre": nombre
-        }
-    except JWTError:
-        raise credentials_exception
-    except Exception:
-        raise credentials_exception
+    return usuario_desde_token(token)
 
 
-def require_role(required_roles: list):
-    """Crea una dependencia que verifica roles."""
-    def role_dependency(user: dict = Depends(get_current_user)):
-        if user["rol"] not in required_roles:
-            raise HTTPException(status_code=403, detail="No autorizado")
+@lru_cache(maxsize=None)
+def require_rol(*roles: str, detalle: str = "No autorizado"):
+    """
+    Dependencia que exige que el usuario tenga alguno de `roles`; si no, 403 con
+    `detalle`. Las dependencias se crean una vez por combinación de argumentos,
+    así FastAPI reconoce la misma dependencia en todas las rutas que la usan.
+    """
+    permitidos = frozenset(roles)
+
+    def verificar_rol(user: dict = Depends(get_current_user)) -> dict:
+        if user["rol"] not in permitidos:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detalle)
         return user
-    return role_dependency
+
+    return verificar_rol
+
+
+def require_role(required_roles: list):
+    """Crea una dependencia que verifica roles (ver `require_rol`)."""
+    return require_rol(*required_roles)
+
+
+# admin_id -> bool (activo). Ver `admin_activo` y `registrar_estado_admin`.
+_admins_activos = crear_cache("admin_activo", settings.ADMIN_ACTIVO_CACHE_SECONDS)
+
+
+def admin_activo(db: Session, admin_id: int) -> bool:
+    """
+    Indica si la cuenta de admin existe y está activa. El resultado se recuerda
+    `ADMIN_ACTIVO_CACHE_SECONDS`; las altas y bajas lo actualizan al momento con
+    `registrar_estado_admin`. Un admin inexistente no se cachea.
+    """
+    activo = _admins_activos.obtener(admin_id)
+    if activo is None:
+        fila = db.query(Admin.activo).filter(Admin.id == admin_id).first()
+        if fila is None:
+            return False
+        activo = fila.activo == 1
+        # `agregar` no pisa un valor que haya dejado una baja/alta concurrente
+        _admins_activos.agregar(admin_id, activo)
+    return activo
+
+
+def registrar_estado_admin(admin_id: int, activo: bool) -> None:
+    """Actualiza la caché de `admin_activo`. Llamar DESPUÉS del commit."""
+    _admins_activos.guardar(admin_id, bool(activo))
 
 
 def require_admin(
@@ -76,10 +91,11 @@ def require_admin(
     """
     Requiere que el usuario sea admin Y que la cuenta siga activa en la BD.
 
-    Revalida `activo` contra la base de datos para que un admin desactivado no
-    pueda seguir operando solo porque conserva un JWT emitido antes de la baja.
-    Solo afecta a rutas protegidas con require_admin (no toca a pacientes,
-    médicos ni coordinadores).
+    Revalida `activo` para que un admin desactivado no pueda seguir operando
+    solo porque conserva un JWT emitido antes de la baja. El estado se cachea
+    unos segundos (`admin_activo`) y la baja/reactivación lo actualiza al
+    instante. Solo afecta a rutas protegidas con require_admin (no toca a
+    pacientes, médicos ni coordinadores).
     """
     if user["rol"] != "admin":
         raise HTTPException(
@@ -87,8 +103,7 @@ def require_admin(
             detail="Se requieren permisos de administrador"
         )
 
-    admin = db.query(Admin).filter(Admin.id == user["id"]).first()
-    if not admin or admin.activo != 1:
+    if not admin_activo(db, user["id"]):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cuenta de administrador desactivada."
@@ -97,24 +112,11 @@ def require_admin(
     return user
 
 
-def require_medico(user: dict = Depends(get_current_user)) -> dict:
-    """Requiere que el usuario sea médico o admin"""
-    if user["rol"] not in ["medico", "admin"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Se requieren permisos de médico"
-        )
-    return user
-
+# Requiere que el usuario sea médico o admin
+require_medico = require_rol("medico", "admin", detalle="Se requieren permisos de médico")
 
-def require_coordinador(user: dict = Depends(get_current_user)) -> dict:
-    """Requiere que el usuario sea coordinador o admin"""
-    if user["rol"] not in ["coordinador", "admin"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Se requieren permisos de coordinador"
-        )
-    return user
+# Requiere que el usuario sea coordinador o admin
+require_coordinador = require_rol("coordinador", "admin", detalle="Se requieren permisos de coordinador")
 
 
 # ========== FUNCIONES DE VALIDACIÓN PARA COORDINADORES ==========
@@ -236,14 +238,10 @@ def verificar_paciente_en_hospital(
     return True
 
 
-def require_admin_or_coordinador(user: dict = Depends(get_current_user)) -> dict:
-    """Requiere que el usuario sea admin O coordinador."""
-    if user["rol"] not in ["admin", "coordinador"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Se requieren permisos de administrador o coordinador"
-        )
-    return user
+# Requiere que el usuario sea admin O coordinador.
+require_admin_or_coordinador = require_rol(
+    "admin", "coordinador", detalle="Se requieren permisos de administrador o coordinador"
+)
 
 
 def require_coordinador_with_hospital(
@@ -0,0 +1,70 @@
+"""
+Caché HTTP (ETag / Last-Modified / 304) para respuestas públicas.
+
+El endpoint calcula sus validadores (p. ej. con `catalogos.validadores`) y llama
+a `no_modificado()` antes de armar la respuesta: si el cliente ya tiene esa
+versión se devuelve un 304 sin cuerpo, sin consultar la base ni serializar.
+"""
+
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+
+def _coincide_etag(if_none_match: str, etag: str) -> bool:
+    # Comparación débil (RFC 9110 §13.1.2): se ignora el prefijo W/
+    if if_none_match.strip() == "*":
+        return True
+    candidatos = (c.strip() for c in if_none_match.split(","))
+    return any(c.removeprefix("W/") == etag for c in candidatos)
+
+
+def _no_modificado_desde(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        desde = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if desde.tzinfo is None:
+        return False
+    return last_modified <= desde
+
+
+def no_modificado(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    max_age: Optional[int] = None,
+) -> Optional[Response]:
+    """
+    Agrega `ETag`, `Last-Modified` y `Cache-Control` a `response` y, si el
+    request es condicional y el cliente tiene la versión vigente, devuelve la
+    respuesta 304 que el endpoint debe retornar. Si no, devuelve None.
+
+    `If-None-Match` tiene prioridad; `If-Modified-Since` sólo se evalúa si no
+    viene `If-None-Match`.
+    """
+    if max_age is None:
+        max_age = settings.CATALOGO_HTTP_MAX_AGE
+    cabeceras = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if last_modified is not None:
+        cabeceras["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    response.headers.update(cabeceras)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        vigente = _coincide_etag(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        vigente = (
+            if_modified_since is not None
+            and last_modified is not None
+            and _no_modificado_desde(if_modified_since, last_modified)
+        )
+    if vigente:
+        return Response(status_code=304, headers=cabeceras)
+    return None
@@ -0,0 +1,220 @@
+"""
+Métricas de la API en formato de texto de Prometheus (`GET /metrics`).
+
+Todo se mantiene en memoria del proceso, sin colector externo ni dependencias:
+
+- `Contador` e `Histograma` con etiquetas, seguros entre hilos.
+- `MetricasMiddleware` registra cantidad y latencia de requests HTTP por ruta
+  (plantilla de la ruta, no el path concreto, para acotar la cardinalidad).
+- `registrar_gauge` permite exponer valores que se leen al momento del scrape
+  (pool de conexiones, WebSockets abiertos, outbox de correos, ...). Los
+  gauges de la aplicación se registran en app/main.py.
+
+Cada worker de uvicorn tiene sus propias métricas: Prometheus debe scrapear cada
+proceso por separado (o usar un solo worker por contenedor).
+"""
+
+import bisect
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Etiquetas = Tuple[str, ...]
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _formatear_etiquetas(nombres: Sequence[str], valores: Etiquetas, extra: str = "") -> str:
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores: Dict[Etiquetas, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *valores: str, cantidad: float = 1) -> None:
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def exportar(self) -> List[str]:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        with self._lock:
+            items = list(self._valores.items())
+        for valores, total in items:
+            lineas.append(f"{self.nombre}{_formatear_etiquetas(self.etiquetas, valores)} {_numero(total)}")
+        return lineas
+
+
+class Histograma:
+    def __init__(
+        self,
+        nombre: str,
+        ayuda: str,
+        etiquetas: Sequence[str] = (),
+        buckets: Sequence[float] = BUCKETS_LATENCIA,
+    ):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.buckets = tuple(sorted(buckets))
+        # por etiquetas: [conteos por bucket..., +Inf], suma
+        self._series: Dict[Etiquetas, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, *valores: str) -> None:
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = ([0] * (len(self.buckets) + 1), [0.0])
+            serie[0][indice] += 1
+            serie[1][0] += valor
+
+    def medir(self, *valores: str) -> "_Cronometro":
+        """Context manager que observa la duración del bloque en segundos."""
+        return _Cronometro(self, valores)
+
+    def exportar(self) -> List[str]:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        with self._lock:
+            series = [(k, list(c), s[0]) for k, (c, s) in self._series.items()]
+        for valores, conteos, suma in series:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + (float("inf"),), conteos):
+                acumulado += conteo
+                le = f'le="{_numero(limite)}"'
+                lineas.append(
+                    f"{self.nombre}_bucket{_formatear_etiquetas(self.etiquetas, valores, le)} {acumulado}"
+                )
+            etiquetas = _formatear_etiquetas(self.etiquetas, valores)
+            lineas.append(f"{self.nombre}_sum{etiquetas} {_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{etiquetas} {acumulado}")
+        return lineas
+
+
+class _Cronometro:
+    __slots__ = ("_histograma", "_valores", "_inicio")
+
+    def __init__(self, histograma: Histograma, valores: Etiquetas):
+        self._histograma = histograma
+        self._valores = valores
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histograma.observar(time.perf_counter() - self._inicio, *self._valores)
+        return False
+
+
+# Un gauge devuelve un número, o un dict {valores de etiquetas: número}
+ValorGauge = Union[float, Dict[Etiquetas, float]]
+
+
+class _Gauge:
+    def __init__(self, nombre: str, ayuda: str, funcion: Callable[[], ValorGauge], etiquetas: Sequence[str]):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.funcion = funcion
+        self.etiquetas = tuple(etiquetas)
+
+    def exportar(self) -> List[str]:
+        try:
+            valor = self.funcion()
+        except Exception:  # noqa: BLE001 - un gauge roto no debe romper /metrics
+            logger.exception("No se pudo calcular la métrica %s", self.nombre)
+            return []
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} gauge"]
+        if isinstance(valor, dict):
+            for valores, numero in valor.items():
+                lineas.append(f"{self.nombre}{_formatear_etiquetas(self.etiquetas, valores)} {_numero(numero)}")
+        else:
+            lineas.append(f"{self.nombre} {_numero(valor)}")
+        return lineas
+
+
+_registro: List[Union[Contador, Histograma, _Gauge]] = []
+
+
+def registrar_gauge(
+    nombre: str, ayuda: str, funcion: Callable[[], ValorGauge], etiquetas: Sequence[str] = ()
+) -> None:
+    _registro.append(_Gauge(nombre, ayuda, funcion, etiquetas))
+
+
+def exportar() -> str:
+    """Todas las métricas registradas en formato de texto de Prometheus."""
+    lineas: List[str] = []
+    for metrica in _registro:
+        lineas.extend(metrica.exportar())
+    return "\n".join(lineas) + "\n"
+
+
+def _registrar(metrica):
+    _registro.append(metrica)
+    return metrica
+
+
+# ========== MÉTRICAS DE LA APLICACIÓN ==========
+
+http_requests_total = _registrar(Contador(
+    "http_requests_total", "Requests HTTP atendidas.", ("method", "route", "status"),
+))
+http_request_duration_seconds = _registrar(Histograma(
+    "http_request_duration_seconds", "Latencia de las requests HTTP en segundos.", ("method", "route"),
+))
+bcrypt_duration_seconds = _registrar(Histograma(
+    "bcrypt_duration_seconds", "Duración de las operaciones bcrypt (hash/verify) en segundos.", ("operacion",),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+))
+
+
+class MetricasMiddleware:
+    """Middleware ASGI que cuenta y mide las requests HTTP por ruta."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        estado = {"codigo": 500}
+
+        async def send_con_estado(message):
+            if message["type"] == "http.response.start":
+                estado["codigo"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_estado)
+        finally:
+            route = scope.get("route")
+            # Sin ruta (404) se agrupa en una sola serie para no crear una por path.
+            plantilla = getattr(route, "path", None) or "sin_ruta"
+            metodo = scope.get("method", "")
+            http_requests_total.inc(metodo, plantilla, str(estado["codigo"]))
+            http_request_duration_seconds.observar(time.perf_counter() - inicio, metodo, plantilla)
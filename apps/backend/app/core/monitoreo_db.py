@@ -0,0 +1,127 @@
+"""
+Monitoreo de consultas SQL por request.
+
+Los eventos de SQLAlchemy (`before/after_cursor_execute`, registrados sobre la
+clase `Engine`, así aplican a cualquier engine creado por `init_engine`) cuentan
+las sentencias y el tiempo acumulado en la base de datos de la request actual,
+que se identifica con un `ContextVar`. `MonitoreoDBMiddleware` abre ese contexto
+y agrega a la respuesta:
+
+- `X-DB-Queries`: cantidad de sentencias ejecutadas.
+- `Server-Timing`: `db` (tiempo en la base) y `app` (tiempo total de la request).
+
+Las consultas que superan `SLOW_QUERY_MS` se registran en el log con la ruta y la
+FORMA de los parámetros (nombres y tipos), nunca sus valores: pueden contener
+datos de pacientes.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EstadisticasDB:
+    __slots__ = ("consultas", "tiempo_db", "scope")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.consultas = 0
+        self.tiempo_db = 0.0  # segundos
+        self.scope = scope
+
+    @property
+    def ruta(self) -> str:
+        """Método + plantilla de la ruta (`GET /pacientes/{paciente_id}`), si ya se resolvió."""
+        if self.scope is None:
+            return "-"
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope.get("path", "-")
+        return f"{self.scope.get('method', 'WS')} {path}"
+
+
+_estadisticas: ContextVar[Optional[EstadisticasDB]] = ContextVar("estadisticas_db", default=None)
+
+
+def estadisticas_actuales() -> Optional[EstadisticasDB]:
+    return _estadisticas.get()
+
+
+def forma_parametros(parametros: Any) -> str:
+    """Describe los parámetros de una sentencia sin exponer sus valores."""
+    if isinstance(parametros, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parametros.items()) + "}"
+    if isinstance(parametros, (list, tuple)):
+        if parametros and isinstance(parametros[0], (dict, list, tuple)):
+            # executemany: N juegos de parámetros
+            return f"{len(parametros)} x {forma_parametros(parametros[0])}"
+        return "(" + ", ".join(type(v).__name__ for v in parametros) + ")"
+    return type(parametros).__name__
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_consulta", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("inicio_consulta")
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+
+    estadisticas = _estadisticas.get()
+    if estadisticas is not None:
+        estadisticas.consultas += 1
+        estadisticas.tiempo_db += duracion
+
+    duracion_ms = duracion * 1000
+    if duracion_ms >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            "Consulta lenta (%.1f ms) en %s: %s | parámetros: %s",
+            duracion_ms,
+            estadisticas.ruta if estadisticas is not None else "-",
+            " ".join(statement.split())[:1000],
+            forma_parametros(parameters),
+        )
+
+
+class MonitoreoDBMiddleware:
+    """Middleware ASGI que expone las estadísticas de SQL de cada request HTTP."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estadisticas = EstadisticasDB(scope)
+        token = _estadisticas.set(estadisticas)
+        inicio = time.perf_counter()
+
+        async def send_con_encabezados(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - inicio) * 1000
+                db_ms = estadisticas.tiempo_db * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(estadisticas.consultas).encode()))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={db_ms:.1f};desc="{estadisticas.consultas} queries", app;dur={total_ms:.1f}'.encode(),
+                ))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_encabezados)
+        finally:
+            _estadisticas.reset(token)
@@ -0,0 +1,24 @@
+"""
+Respuestas JSON rápidas.
+
+La app usa `ORJSONResponse` como `default_response_class`: FastAPI valida el
+valor devuelto contra el `response_model` y lo serializa con orjson.
+
+En los listados grandes armados con columnas de la base (que ya tienen los
+tipos del schema) esa validación es la mayor parte del costo de la respuesta.
+`json_directo()` serializa los dicts tal cual con orjson y devuelve la
+`Response` ya armada: FastAPI no la valida ni la codifica de nuevo. El endpoint
+conserva `response_model` para OpenAPI.
+
+Usarlo sólo si el contenido tiene exactamente los campos del `response_model`
+y ningún dato viene del usuario sin validar (ver `bench_serializacion`).
+"""
+
+from typing import Any, Optional
+
+from fastapi.responses import ORJSONResponse
+
+
+def json_directo(contenido: Any, status_code: int = 200, headers: Optional[dict] = None) -> ORJSONResponse:
+    """Respuesta JSON con el contenido serializado por orjson, sin pasar por el `response_model`."""
+    return ORJSONResponse(content=contenido, status_code=status_code, headers=headers)
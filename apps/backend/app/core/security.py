@@ -1,3 +1,5 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Union
 from jose import JWTError, jwt
@@ -7,7 +9,9 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.db.db import get_db
 from app.models.models import Paciente, Medico, Coordinador
+from app.core.cache import CacheTTL
 from app.core.config import settings  # ✅ IMPORTAR SETTINGS
+from app.core.metricas import bcrypt_duration_seconds
 
 # ✅ Usar settings centralizado - ESTO ES LA CLAVE DEL FIX
 SECRET_KEY = settings.SECRET_KEY
@@ -17,19 +21,25 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Claims de tokens ya verificados, por hash SHA-256 del token (nunca el token en
+# claro). Cada entrada vence en el `exp` del token; ver `decodificar_token`.
+_cache_tokens = CacheTTL(ACCESS_TOKEN_EXPIRE_MINUTES * 60, max_entradas=settings.JWT_CACHE_SIZE)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica que una contraseña coincida con su hash"""
     # Truncar a 72 bytes para bcrypt
     password_bytes = plain_password.encode('utf-8')[:72]
-    return pwd_context.verify(password_bytes, hashed_password)
+    with bcrypt_duration_seconds.medir("verify"):
+        return pwd_context.verify(password_bytes, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Genera el hash de una contraseña"""
     # Truncar a 72 bytes para bcrypt
     password_bytes = password.encode('utf-8')[:72]
-    return pwd_context.hash(password_bytes)
+    with bcrypt_duration_seconds.medir("hash"):
+        return pwd_context.hash(password_bytes)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -45,52 +55,78 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def decodificar_token(token: str) -> dict:
+    """
+    Verifica (firma y expiración) y decodifica un token JWT. Lanza JWTError si
+    no es válido.
+
+    Los clientes repiten el mismo token en ráfagas de requests: los claims de
+    un token válido se guardan en un LRU acotado (`JWT_CACHE_SIZE`) hasta su
+    `exp`, así la verificación completa se hace una vez por token. Los tokens
+    inválidos nunca se cachean, y los que no tienen `exp` tampoco.
+    """
+    clave = hashlib.sha256(token.encode("utf-8")).digest()
+    claims = _cache_tokens.obtener(clave)
+    if claims is None:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            restante = exp - time.time()
+            if restante > 0:
+                _cache_tokens.guardar(clave, claims, ttl=restante)
+    # Copia: el caller puede modificar el diccionario sin tocar la caché
+    return dict(claims)
+
+
 def decode_token(token: str) -> Optional[dict]:
     """Decodifica un token JWT y retorna su payload"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return decodificar_token(token)
     except JWTError:
         return None
 
 
-def get_current_user(
-        token: str = Depends(oauth2_scheme),
-        db: Session = Depends(get_db)
-) -> dict:
+def usuario_desde_token(token: str) -> dict:
     """
-    Obtiene el usuario actual desde el token JWT.
-    Devuelve un diccionario con la información del usuario.
+    Verifica el token y devuelve el usuario como diccionario
+    `{"id", "rol", "email", "nombre"}`. Lanza 401 si el token no es válido o le
+    falta `sub` o `rol`. No consulta la base de datos.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudo validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
-
     try:
-        # Decodificar el token JWT
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        rol: str = payload.get("rol")
-        email: str = payload.get("email")
-        nombre: str = payload.get("nombre")
-
-        if user_id is None:
+        # Decodificar el token JWT (cacheado por token, ver decodificar_token)
+        payload = decodificar_token(token)
+        user_id = payload.get("sub")
+        rol = payload.get("rol")
+        if user_id is None or rol is None:
             raise credentials_exception
-
-        # ✅ DEVOLVER UN DICCIONARIO EN LUGAR DE BUSCAR EN LA BD
         return {
             "id": int(user_id),
             "rol": rol,
-            "email": email,
-            "nombre": nombre
+            "email": payload.get("email"),
+            "nombre": payload.get("nombre")
         }
-
-    except JWTError:
+    except (JWTError, ValueError):
         raise credentials_exception
 
 
+def get_current_user(
+        token: str = Depends(oauth2_scheme),
+        db: Session = Depends(get_db)
+) -> dict:
+    """
+    Obtiene el usuario actual desde el token JWT.
+
+    Se mantiene por compatibilidad: las rutas usan `app.core.deps.get_current_user`,
+    que además memoriza el usuario durante el request.
+    """
+    return usuario_desde_token(token)
+
+
 def get_current_active_user(
         current_user: Union[Paciente, Medico, Coordinador] = Depends(get_current_user)
 ) -> Union[Paciente, Medico, Coordinador]:
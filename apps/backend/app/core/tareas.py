@@ -0,0 +1,91 @@
+"""
+Tareas periódicas en segundo plano.
+
+Cada `TareaPeriodica` corre en un hilo propio y ejecuta su función cada
+`intervalo` segundos. `despertar()` adelanta la siguiente ejecución (por ejemplo,
+justo después de encolar un correo). Las tareas se arrancan y detienen desde el
+`lifespan` de la aplicación (ver app/main.py).
+
+Las tareas que no deben correr en paralelo en varias réplicas usan `liderazgo()`.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import text
+
+from app.db.db import get_engine
+
+logger = logging.getLogger(__name__)
+
+
+class TareaPeriodica:
+    def __init__(self, nombre: str, funcion: Callable[[], None], intervalo: float):
+        self.nombre = nombre
+        self._funcion = funcion
+        self._intervalo = intervalo
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self._despertar = threading.Event()
+        self._lock = threading.Lock()
+
+    def iniciar(self) -> None:
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._bucle, name=self.nombre, daemon=True)
+            self._hilo.start()
+
+    def detener(self, timeout: float = 10.0) -> None:
+        """Detiene la tarea; si hay una ejecución en curso espera a que termine."""
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo is None:
+            return
+        self._detener.set()
+        self._despertar.set()
+        hilo.join(timeout)
+
+    def despertar(self) -> None:
+        """Adelanta la próxima ejecución sin esperar al intervalo."""
+        self._despertar.set()
+
+    def ejecutar_ahora(self) -> None:
+        """Ejecuta la función en el hilo actual (útil para scripts y tests)."""
+        try:
+            self._funcion()
+        except Exception:  # noqa: BLE001 - una tarea fallida no debe matar el hilo
+            logger.exception("Falló la tarea periódica '%s'.", self.nombre)
+
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            self.ejecutar_ahora()
+            self._despertar.wait(self._intervalo)
+            self._despertar.clear()
+
+
+@contextmanager
+def liderazgo(clave: int) -> Iterator[bool]:
+    """
+    `True` si esta réplica debe ejecutar la pasada. En PostgreSQL, sólo la que
+    obtiene el advisory lock `clave` (`pg_try_advisory_lock`, sin esperar); las
+    demás reciben `False` y saltean esa pasada. En otras bases (SQLite, un solo
+    proceso) siempre `True`.
+    """
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+    # Lock de sesión en una conexión propia: la sesión de trabajo puede hacer
+    # commit por lote y cambiar de conexión
+    with engine.connect() as conexion:
+        obtenido = conexion.execute(text("SELECT pg_try_advisory_lock(:clave)"), {"clave": clave}).scalar()
+        try:
+            yield bool(obtenido)
+        finally:
+            if obtenido:
+                conexion.execute(text("SELECT pg_advisory_unlock(:clave)"), {"clave": clave})
+            conexion.commit()
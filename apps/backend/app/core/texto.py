@@ -0,0 +1,17 @@
+"""Utilidades de normalización de texto para búsquedas."""
+
+import unicodedata
+from typing import Optional
+
+
+def normalizar_texto(texto: Optional[str]) -> str:
+    """
+    Minúsculas, sin acentos y con los espacios colapsados.
+    "  José  PÉREZ " -> "jose perez". Se usa para las columnas `*_normalizado`
+    y para normalizar los términos de búsqueda de la misma forma.
+    """
+    if not texto:
+        return ""
+    t = unicodedata.normalize("NFKD", str(texto))
+    t = "".join(c for c in t if not unicodedata.combining(c))
+    return " ".join(t.lower().split())
@@ -0,0 +1,47 @@
+"""
+DDL de los índices de búsqueda de pacientes (ver app/services/busqueda_pacientes.py).
+
+Única definición: la usan los modelos (`create_all`, tests y benchmarks) y la
+migración b7c8d9e0f1a2. No importa nada de la app, así la migración no arrastra
+los modelos.
+
+- PostgreSQL: extensión pg_trgm, índice GIN trigram sobre el nombre normalizado
+  e índice `text_pattern_ops` para buscar el documento por prefijo.
+- SQLite: tabla FTS5 con tokenizer trigram, sincronizada con `pacientes` por
+  triggers.
+"""
+
+PG_EXTENSION = "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+
+# {nombre del índice: CREATE INDEX}
+PG_INDICES = {
+    "ix_pacientes_nombre_normalizado_trgm": (
+        "CREATE INDEX ix_pacientes_nombre_normalizado_trgm "
+        "ON pacientes USING gin (nombre_normalizado gin_trgm_ops)"
+    ),
+    "ix_pacientes_documento_prefijo": (
+        "CREATE INDEX ix_pacientes_documento_prefijo ON pacientes (documento text_pattern_ops)"
+    ),
+}
+
+SQLITE_FTS_TABLA = "pacientes_fts"
+SQLITE_FTS_TRIGGERS = ("pacientes_fts_ai", "pacientes_fts_ad", "pacientes_fts_au")
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS pacientes_fts USING fts5("
+    "nombre_normalizado, documento, content='pacientes', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS pacientes_fts_ai AFTER INSERT ON pacientes BEGIN "
+    "INSERT INTO pacientes_fts(rowid, nombre_normalizado, documento) "
+    "VALUES (new.id, new.nombre_normalizado, new.documento); END",
+    "CREATE TRIGGER IF NOT EXISTS pacientes_fts_ad AFTER DELETE ON pacientes BEGIN "
+    "INSERT INTO pacientes_fts(pacientes_fts, rowid, nombre_normalizado, documento) "
+    "VALUES ('delete', old.id, old.nombre_normalizado, old.documento); END",
+    "CREATE TRIGGER IF NOT EXISTS pacientes_fts_au AFTER UPDATE ON pacientes BEGIN "
+    "INSERT INTO pacientes_fts(pacientes_fts, rowid, nombre_normalizado, documento) "
+    "VALUES ('delete', old.id, old.nombre_normalizado, old.documento); "
+    "INSERT INTO pacientes_fts(rowid, nombre_normalizado, documento) "
+    "VALUES (new.id, new.nombre_normalizado, new.documento); END",
+]
+
+# Reindexa los pacientes que ya existían al crear la tabla FTS
+SQLITE_FTS_REBUILD = "INSERT INTO pacientes_fts(pacientes_fts) VALUES ('rebuild')"
@@ -1,5 +1,9 @@
+from contextlib import asynccontextmanager
+
+from anyio import from_thread, to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from app.routers import (
     auth,
     pacientes,
@@ -11,15 +15,50 @@ from app.routers import (
     admins,
     coordinadores,
     asignaciones,
-    formularios,
-    mensajes,
     importacion_medicos
 )
+from app.core import metricas
+from app.core.compresion import CompresionMiddleware
+from app.core.monitoreo_db import MonitoreoDBMiddleware
+from app.db.db import get_engine, get_sessionmaker
+from app.services import (
+    email_service,
+    email_outbox,
+    estadisticas_hospitales,
+    expiracion_formularios,
+    programacion_formularios,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Worker que envía en segundo plano los correos del outbox
+    email_outbox.worker_outbox.iniciar()
+    email_outbox.worker_purga_outbox.iniciar()
+    # Resumen materializado de estadísticas por hospital
+    estadisticas_hospitales.worker_incremental.iniciar()
+    estadisticas_hospitales.worker_completo.iniciar()
+    # Pasa a "expirado" las asignaciones de formularios vencidas
+    expiracion_formularios.worker_expiracion.iniciar()
+    # Genera las asignaciones de las programaciones recurrentes que vencieron
+    programacion_formularios.worker_programaciones.iniciar()
+    yield
+    programacion_formularios.worker_programaciones.detener()
+    expiracion_formularios.worker_expiracion.detener()
+    estadisticas_hospitales.worker_completo.detener()
+    estadisticas_hospitales.worker_incremental.detener()
+    email_outbox.worker_purga_outbox.detener()
+    email_outbox.worker_outbox.detener()
+    email_service.cerrar_conexiones()
+
 
 app = FastAPI(
     title="PINV20-292 API",
     description="API para el sistema de seguimiento COVID-19",
     version="1.0.0",
+    lifespan=lifespan,
+    # Serialización con orjson en todas las rutas (ver app.core.respuestas)
+    default_response_class=ORJSONResponse,
 )
 
 # ✅ CONFIGURACIÓN CORS CORREGIDA
@@ -39,6 +78,13 @@ app.add_middleware(
     expose_headers=["*"],  # Exponer todos los headers en la respuesta
 )
 
+# Cantidad de consultas SQL y tiempo en la base por request (X-DB-Queries, Server-Timing)
+app.add_middleware(MonitoreoDBMiddleware)
+# Cantidad y latencia de requests por ruta (expuestas en /metrics)
+app.add_middleware(metricas.MetricasMiddleware)
+# Brotli/gzip para respuestas grandes (el último agregado es el más externo)
+app.add_middleware(CompresionMiddleware)
+
 # Incluir routers
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(pacientes.router, prefix="/pacientes", tags=["pacientes"])
@@ -53,9 +99,6 @@ app.include_router(coordinadores.router, prefix="/coordinadores", tags=["Coordin
 app.include_router(asignaciones.router, prefix="/asignaciones", tags=["Asignaciones"])
 app.include_router(importacion_medicos.router, prefix="/importacion-medicos", tags=["Importación Médicos"])
 
-app.include_router(formularios.router, prefix="/formularios", tags=["Formularios"])
-
-app.include_router(mensajes.router, prefix="/mensajes", tags=["mensajes"])
 @app.get("/")
 async def root():
     return {
@@ -67,4 +110,49 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+# ===== Métricas (/metrics) =====
+
+def _estado_pool_db():
+    pool = get_engine().pool
+    estado = {}
+    for nombre in ("size", "checkedin", "checkedout", "overflow"):
+        medir = getattr(pool, nombre, None)
+        if callable(medir):
+            estado[(nombre,)] = medir()
+    return estado
+
+
+def _correos_outbox():
+    db = get_sessionmaker()()
+    try:
+        return {(estado,): total for estado, total in email_outbox.contar_por_estado(db).items()}
+    finally:
+        db.close()
+
+
+def _threadpool(campo: str):
+    # Los endpoints sync (y con ellos bcrypt y las consultas SQL) corren en el
+    # threadpool de anyio: las tareas en espera indican workers saturados.
+    # /metrics corre en ese threadpool: el limitador se lee en el event loop.
+    def medir():
+        limitador = from_thread.run_sync(to_thread.current_default_thread_limiter)
+        return getattr(limitador.statistics(), campo)
+    return medir
+
+
+metricas.registrar_gauge("db_pool_connections", "Conexiones del pool de SQLAlchemy por estado.", _estado_pool_db, ("estado",))
+metricas.registrar_gauge("websocket_connections", "WebSockets de chat abiertos.", mensajes.manager.total_conexiones)
+metricas.registrar_gauge("websocket_chats", "Chats con al menos un WebSocket abierto.", mensajes.manager.total_chats)
+metricas.registrar_gauge("email_outbox_messages", "Correos en el outbox por estado.", _correos_outbox, ("estado",))
+metricas.registrar_gauge("threadpool_tokens_in_use", "Hilos del threadpool en uso.", _threadpool("borrowed_tokens"))
+metricas.registrar_gauge("threadpool_tokens_total", "Tamaño del threadpool.", _threadpool("total_tokens"))
+metricas.registrar_gauge("threadpool_tasks_waiting", "Tareas esperando un hilo del threadpool.", _threadpool("tasks_waiting"))
+
+
+# Sync: el gauge del outbox consulta la base y no debe bloquear el event loop
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(metricas.exportar(), media_type="text/plain; version=0.0.4")
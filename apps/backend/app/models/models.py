@@ -1,7 +1,9 @@
 import enum
-from sqlalchemy import Column, Integer, String, Date, Float, Enum, ForeignKey, DateTime, JSON, Text, Table, Boolean, text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Date, Float, Enum, ForeignKey, DateTime, JSON, Text, Table, Boolean, Index, DDL, event, text
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
+from app.core.texto import normalizar_texto
+from app.db import indices_busqueda
 from app.db.db import Base
 from datetime import datetime
 
@@ -48,6 +50,8 @@ class Paciente(Base):
     id = Column(Integer, primary_key=True, index=True)
     documento = Column(String, unique=True, index=True, nullable=False)
     nombre = Column(String, nullable=False)
+    # Nombre sin acentos y en minúsculas para la búsqueda (se mantiene solo, ver `_normalizar_nombre`)
+    nombre_normalizado = Column(String, nullable=True)
     fecha_nacimiento = Column(Date, nullable=False)
     genero = Column(Enum(GeneroEnum), nullable=False)
     direccion = Column(String, nullable=True)
@@ -58,7 +62,7 @@ class Paciente(Base):
     hashed_password = Column(String, nullable=False)
     rol = Column(Enum(RolEnum), default=RolEnum.paciente, nullable=False)
 
-    hospital_id = Column(Integer, ForeignKey("hospitales.id"), nullable=True)
+    hospital_id = Column(Integer, ForeignKey("hospitales.id"), nullable=True, index=True)
 
 
     # Relaciones
@@ -68,6 +72,11 @@ class Paciente(Base):
 
     hospital = relationship("Hospital", back_populates="pacientes")
 
+    @validates("nombre")
+    def _normalizar_nombre(self, key, nombre):
+        self.nombre_normalizado = normalizar_texto(nombre)
+        return nombre
+
 
 class PasswordResetToken(Base):
     """
@@ -112,6 +121,41 @@ class AdminInvitation(Base):
     revoked_at = Column(DateTime, nullable=True)
 
 
+class EmailOutbox(Base):
+    """
+    Correo pendiente de envío (patrón outbox).
+
+    Se inserta en la MISMA transacción que el registro que lo origina (token de
+    recuperación, invitación, alta de médico), así nunca queda un registro sin su
+    correo ni un correo de un registro que hizo rollback. Un worker lo envía y
+    reintenta con backoff exponencial (`proximo_intento`); tras agotar los
+    reintentos queda en estado `fallido` (dead-letter) para revisión manual.
+
+    Los cuerpos se guardan cifrados (llevan tokens y contraseñas temporales). Al
+    pasar a enviado se vacían; los fallidos conservan el cuerpo cifrado para
+    revisarlos o reenviarlos. Ambos se borran tras `EMAIL_OUTBOX_RETENTION_DAYS`
+    días (ver app/services/email_outbox.py).
+
+    Estados: pendiente, enviando (reclamado por un worker), enviado, fallido.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_estado_proximo_intento", "estado", "proximo_intento"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    destinatario = Column(String, nullable=False)
+    asunto = Column(String, nullable=False)
+    cuerpo_texto = Column(Text, nullable=False)
+    cuerpo_html = Column(Text, nullable=True)
+    estado = Column(String(20), default="pendiente", server_default="pendiente", nullable=False)
+    intentos = Column(Integer, default=0, server_default="0", nullable=False)
+    proximo_intento = Column(DateTime, default=datetime.utcnow, nullable=False)
+    ultimo_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    enviado_at = Column(DateTime, nullable=True)
+
+
 class Especialidad(Base):
     __tablename__ = "especialidades"
 
@@ -126,6 +170,10 @@ class Especialidad(Base):
 
 class Medico(Base):
     __tablename__ = "medicos"
+    __table_args__ = (
+        # Orden y paginación por cursor de GET /medicos/
+        Index("ix_medicos_nombre_id", "nombre", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     documento = Column(String, unique=True, index=True, nullable=False)
@@ -201,6 +249,15 @@ class Asignacion(Base):
     paciente = relationship("Paciente", back_populates="asignaciones")
     medico = relationship("Medico", back_populates="asignaciones")
 
+    # Una sola asignación activa por paciente; también resuelve el JOIN
+    # "paciente -> asignación activa" con un solo acceso al índice.
+    __table_args__ = (
+        Index(
+            "uq_asignacion_activa_por_paciente", "paciente_id", unique=True,
+            postgresql_where=text("activo = true"), sqlite_where=text("activo = 1"),
+        ),
+    )
+
 
 class Formulario(Base):
     __tablename__ = "formularios"
@@ -223,6 +280,10 @@ class Formulario(Base):
 
 class FormularioAsignacion(Base):
     __tablename__ = "formulario_asignaciones"
+    __table_args__ = (
+        # Expiración de pendientes vencidas (ver app.services.expiracion_formularios)
+        Index("ix_formulario_asignaciones_estado_expiracion", "estado", "fecha_expiracion"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     formulario_id = Column(Integer, ForeignKey("formularios.id"), nullable=False, index=True)
@@ -234,6 +295,10 @@ class FormularioAsignacion(Base):
     numero_instancia = Column(Integer, default=1, nullable=False)  # Permite múltiples instancias
     estado = Column(String(50), default="pendiente", nullable=False)  # pendiente, completado, expirado, cancelado
     datos_extra = Column(JSON, nullable=True, default=dict)  # ✅ RENOMBRADO de 'metadata' a 'datos_extra'
+    # Programación recurrente que generó la asignación (None = asignada a mano)
+    programacion_id = Column(
+        Integer, ForeignKey("formulario_programaciones.id", ondelete="SET NULL"), nullable=True, index=True
+    )
 
     # Relaciones
     formulario = relationship("Formulario", back_populates="asignaciones")
@@ -242,6 +307,35 @@ class FormularioAsignacion(Base):
     respuestas = relationship("RespuestaFormulario", back_populates="asignacion")
 
 
+class FormularioProgramacion(Base):
+    """
+    Asignación recurrente de un formulario a un paciente (p. ej. semanal por 12
+    semanas). Cada ocurrencia se materializa como una `FormularioAsignacion`
+    cuando llega `proxima_fecha` (ver app/services/programacion_formularios.py).
+    """
+    __tablename__ = "formulario_programaciones"
+    __table_args__ = (
+        # Programaciones con ocurrencias por generar
+        Index("ix_formulario_programaciones_activa_proxima", "activa", "proxima_fecha"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    formulario_id = Column(Integer, ForeignKey("formularios.id", ondelete="CASCADE"), nullable=False, index=True)
+    paciente_id = Column(Integer, ForeignKey("pacientes.id", ondelete="CASCADE"), nullable=False, index=True)
+    creado_por = Column(Integer, ForeignKey("medicos.id"), nullable=False)
+    fecha_inicio = Column(DateTime, nullable=False)
+    intervalo_dias = Column(Integer, nullable=False)
+    repeticiones = Column(Integer, nullable=False)  # ocurrencias en total
+    vigencia_dias = Column(Integer, nullable=True)  # días para responder cada ocurrencia (None = sin vencimiento)
+    generadas = Column(Integer, default=0, nullable=False)
+    proxima_fecha = Column(DateTime, nullable=False)
+    activa = Column(Boolean, default=True, nullable=False)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    formulario = relationship("Formulario")
+    paciente = relationship("Paciente")
+
+
 class RespuestaFormulario(Base):
     __tablename__ = "respuestas_formularios"
 
@@ -289,4 +383,42 @@ class Admin(Base):
     fecha_creacion = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     def __repr__(self):
-        return f"<Admin(id={self.id}, nombre='{self.nombre}', email='{self.email}')>"
\ No newline at end of file
+        return f"<Admin(id={self.id}, nombre='{self.nombre}', email='{self.email}')>"
+
+
+class EstadisticaHospital(Base):
+    """
+    Resumen materializado de estadísticas por hospital (una fila por hospital).
+
+    Lo mantiene app/services/estadisticas_hospitales.py: se recalcula para los
+    hospitales afectados poco después de cada cambio relevante y completo de
+    forma periódica. Las vistas de administración lo leen sin agregar en vivo.
+    """
+    __tablename__ = "estadisticas_hospitales"
+
+    hospital_id = Column(Integer, ForeignKey("hospitales.id", ondelete="CASCADE"), primary_key=True)
+    total_pacientes = Column(Integer, default=0, nullable=False)
+    pacientes_asignados = Column(Integer, default=0, nullable=False)
+    pacientes_sin_medico = Column(Integer, default=0, nullable=False)
+    total_medicos = Column(Integer, default=0, nullable=False)
+    medicos_por_especialidad = Column(JSON, nullable=False, default=dict)
+    formularios_pendientes = Column(Integer, default=0, nullable=False)
+    mensajes_no_leidos = Column(Integer, default=0, nullable=False)
+    actualizado_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    hospital = relationship("Hospital")
+
+
+# ========== ÍNDICES DE BÚSQUEDA DE PACIENTES ==========
+# Ver app/services/busqueda_pacientes.py. El DDL está en app/db/indices_busqueda.py
+# (lo comparte la migración b7c8d9e0f1a2); esto cubre `create_all`.
+
+event.listen(Base.metadata, "before_create", DDL(indices_busqueda.PG_EXTENSION).execute_if(dialect="postgresql"))
+for _sentencia in indices_busqueda.PG_INDICES.values():
+    event.listen(Paciente.__table__, "after_create", DDL(_sentencia).execute_if(dialect="postgresql"))
+for _sentencia in indices_busqueda.SQLITE_FTS:
+    event.listen(Paciente.__table__, "after_create", DDL(_sentencia).execute_if(dialect="sqlite"))
+event.listen(
+    Paciente.__table__, "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {indices_busqueda.SQLITE_FTS_TABLA}").execute_if(dialect="sqlite"),
+)
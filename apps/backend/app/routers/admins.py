@@ -8,8 +8,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.deps import require_admin
-from app.core.security import get_password_hash, get_current_user
+from app.core.deps import get_current_user, registrar_estado_admin, require_admin
+from app.core.security import get_password_hash
 from app.db.db import get_db
 from app.models.models import Admin, AdminInvitation, Coordinador, Medico, Paciente, RolEnum
 from app.schemas.schemas import (
@@ -19,9 +19,10 @@ from app.schemas.schemas import (
     AdminInvitationValidateOut,
     AdminOut,
     AdminUpdate,
+    EstadisticaHospitalMaterializadaOut,
     MessageResponse,
 )
-from app.services import email_service
+from app.services import email_service, email_outbox, estadisticas_hospitales
 
 logger = logging.getLogger(__name__)
 
@@ -80,7 +81,7 @@ def _invitacion_pendiente_por_email(db: Session, email: str) -> AdminInvitation
 
 
 def _crear_y_enviar_invitacion(db: Session, email: str, invited_by_admin_id: int) -> None:
-    """Genera un token seguro, persiste la invitación y envía el email. No loguea el token."""
+    """Genera un token seguro, persiste la invitación y encola el email. No loguea el token."""
     token = secrets.token_urlsafe(32)
     expira_horas = settings.ADMIN_INVITATION_TOKEN_EXPIRE_HOURS
     invitacion = AdminInvitation(
@@ -90,15 +91,14 @@ def _crear_y_enviar_invitacion(db: Session, email: str, invited_by_admin_id: int
         expires_at=datetime.utcnow() + timedelta(hours=expira_horas),
     )
     db.add(invitacion)
-    db.commit()
 
-    # El fallo de envío no debe deshacer la invitación ya persistida.
-    try:
-        email_service.enviar_invitacion_admin(email.lower(), token, expira_horas)
-    except email_service.EmailNoConfiguradoError:
-        logger.warning("SMTP no configurado: no se envió el email de invitación de admin.")
-    except Exception:  # noqa: BLE001
-        logger.exception("Fallo al enviar el email de invitación de admin.")
+    # El email va al outbox en la misma transacción que la invitación; el worker
+    # lo envía (con reintentos) fuera de la request.
+    if not email_service.smtp_configurado():
+        logger.warning("SMTP no configurado: el email de invitación de admin queda pendiente en el outbox.")
+    email_outbox.encolar(db, email.lower(), email_service.contenido_invitacion_admin(email.lower(), token, expira_horas))
+    db.commit()
+    email_outbox.notificar()
 
 
 @router.post("/invitaciones", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
@@ -238,6 +238,33 @@ def reenviar_invitacion_admin(
     return {"message": "Invitación reenviada correctamente."}
 
 
+# ================================================================
+# ESTADÍSTICAS POR HOSPITAL (resumen materializado)
+# ================================================================
+
+@router.get("/estadisticas/hospitales", response_model=List[EstadisticaHospitalMaterializadaOut])
+def get_estadisticas_hospitales(
+        db: Session = Depends(get_db),
+        current_user=Depends(require_admin)
+):
+    """
+    Estadísticas de todos los hospitales (solo admin). Lee la tabla
+    `estadisticas_hospitales`, que se actualiza a los pocos segundos de cada
+    cambio; `actualizado_at` indica la antigüedad de cada fila.
+    """
+    return estadisticas_hospitales.listar(db)
+
+
+@router.post("/estadisticas/hospitales/recalcular", response_model=MessageResponse)
+def recalcular_estadisticas_hospitales(
+        db: Session = Depends(get_db),
+        current_user=Depends(require_admin)
+):
+    """Fuerza el recálculo completo de las estadísticas por hospital (solo admin)"""
+    total = estadisticas_hospitales.recalcular(db)
+    return {"message": f"Estadísticas recalculadas para {total} hospital(es)."}
+
+
 @router.get("/", response_model=List[AdminOut])
 def get_all_admins(
         incluir_inactivos: bool = False,
@@ -375,6 +402,8 @@ def update_admin(
         setattr(admin, field, value)
 
     db.commit()
+    if "activo" in update_data:
+        registrar_estado_admin(admin_id, admin.activo == 1)
     db.refresh(admin)
 
     return admin
@@ -413,6 +442,7 @@ def deactivate_admin(
     # Desactivar (baja lógica)
     admin.activo = 0
     db.commit()
+    registrar_estado_admin(admin_id, False)
 
     return {"message": "Administrador desactivado exitosamente", "id": admin_id}
 
@@ -434,6 +464,7 @@ def reactivate_admin(
 
     admin.activo = 1
     db.commit()
+    registrar_estado_admin(admin_id, True)
     db.refresh(admin)
 
     return admin
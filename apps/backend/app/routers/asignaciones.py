@@ -3,7 +3,7 @@ Router para endpoints de asignaciones
 Gestión de asignaciones médico-paciente y médico-hospital
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -22,6 +22,7 @@ from app.schemas.schemas import (
     OperacionExitosaResponse
 )
 from app.core.deps import require_coordinador, get_current_user,require_medico
+from app.services.busqueda_pacientes import LIMITE_MAXIMO, LIMITE_POR_DEFECTO, buscar_pacientes_con_asignacion
 from app.services.coordinador_service import (
     asignar_medico_a_hospital,
     remover_medico_de_hospital,
@@ -29,7 +30,6 @@ from app.services.coordinador_service import (
     asignar_medico_a_paciente,
     obtener_asignacion_paciente,
     desasignar_medico_de_paciente,
-    buscar_paciente,
     obtener_pacientes_sin_hospital,
     obtener_medicos_disponibles,
     obtener_coordinador_actual,
@@ -174,29 +174,30 @@ def desasignar_medico_paciente(
 
 @router.get("/buscar-paciente", response_model=List[BuscarPacienteOut])
 def buscar_paciente_endpoint(
+        response: Response,
         q: str = Query(..., min_length=1, description="Término de búsqueda (documento o nombre)"),
         solo_sin_hospital: bool = Query(False, description="Filtrar solo pacientes sin hospital asignado"),
+        skip: int = Query(0, ge=0),
+        limit: int = Query(LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
         db: Session = Depends(get_db),
         current_user: dict = Depends(require_coordinador)
 ):
     """
-    Busca pacientes por documento o nombre.
+    Busca pacientes por documento (prefijo) o nombre (sin distinguir acentos ni
+    mayúsculas), ordenados por relevancia y paginados. El total de coincidencias
+    se devuelve en el header `X-Total-Count`.
     Retorna información del paciente con su hospital y médico asignado.
 
     - Si solo_sin_hospital=True, devuelve únicamente pacientes sin hospital asignado.
     - Si solo_sin_hospital=False (default), devuelve todos los pacientes que coincidan.
     """
-    pacientes = buscar_paciente(db, q)
-
-    # Filtrar si se solicita solo pacientes sin hospital
-    if solo_sin_hospital:
-        pacientes = [p for p in pacientes if p.hospital_id is None]
+    filas, total = buscar_pacientes_con_asignacion(
+        db, q, skip=skip, limit=limit, solo_sin_hospital=solo_sin_hospital
+    )
+    response.headers["X-Total-Count"] = str(total)
 
     resultado = []
-    for paciente in pacientes:
-        # Obtener asignación activa
-        asignacion = obtener_asignacion_paciente(db, paciente.id)
-
+    for paciente, asignacion in filas:
         resultado.append({
             "id": paciente.id,
             "documento": paciente.documento,
@@ -13,11 +13,10 @@ from app.schemas.schemas import (
     Token, UserInfo,
     ForgotPasswordRequest, ResetPasswordRequest, MessageResponse,
 )
-from app.core.security import (
-    get_password_hash, verify_password, create_access_token, get_current_user
-)
+from app.core.deps import get_current_user
+from app.core.security import get_password_hash, verify_password, create_access_token
 from app.core.config import settings
-from app.services import email_service
+from app.services import catalogos, email_service, email_outbox
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import datetime, timedelta
 
@@ -91,32 +90,21 @@ def register_medico(medico: MedicoCreate, db: Session = Depends(get_db)):
     """Registra un nuevo médico en el sistema"""
     from app.services.medico_service import crear_medico, MedicoValidationError
 
-    # Verificar que las especialidades existan (por ID, solo activas)
-    especialidades = []
-    if medico.especialidad_ids:
-        for esp_id in medico.especialidad_ids:
-            especialidad = db.query(Especialidad).filter(
-                Especialidad.id == esp_id,
-                Especialidad.activa == 1
-            ).first()
-            if not especialidad:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Especialidad con ID {esp_id} no encontrada o inactiva"
-                )
-            especialidades.append(especialidad)
+    # Verificar que las especialidades existan (por ID, solo activas; catálogo en memoria)
+    especialidades, esp_id = catalogos.resolver(db, Especialidad, medico.especialidad_ids, solo_activas=True)
+    if esp_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Especialidad con ID {esp_id} no encontrada o inactiva"
+        )
 
     # Verificar que los hospitales existan (por ID)
-    hospitales = []
-    if medico.hospital_ids:
-        for hospital_id in medico.hospital_ids:
-            hospital = db.query(Hospital).filter(Hospital.id == hospital_id).first()
-            if not hospital:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Hospital con ID {hospital_id} no encontrado"
-                )
-            hospitales.append(hospital)
+    hospitales, hospital_id = catalogos.resolver(db, Hospital, medico.hospital_ids)
+    if hospital_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Hospital con ID {hospital_id} no encontrado"
+        )
 
     # Crear el médico reutilizando la lógica compartida (valida email/documento, hashea, asocia M2M)
     try:
@@ -349,20 +337,19 @@ def forgot_password(body: ForgotPasswordRequest, db: Session = Depends(get_db)):
         used=False,
     )
     db.add(reset)
-    db.commit()
 
-    # El fallo de envío NO debe romper la respuesta genérica ni revelar información.
-    try:
-        email_service.enviar_recuperacion_password(
-            email=email,
-            nombre=getattr(user, "nombre", ""),
-            token=token,
-            expira_minutos=expira_minutos,
-        )
-    except email_service.EmailNoConfiguradoError:
-        logger.warning("SMTP no configurado: no se envió el correo de recuperación.")
-    except Exception as e:  # noqa: BLE001
-        logger.error("Falló el envío del correo de recuperación: %s", e)
+    # El correo va al outbox en la misma transacción que el token: el envío (y sus
+    # reintentos) ocurre fuera de la request, sin afectar la respuesta genérica.
+    if not email_service.smtp_configurado():
+        logger.warning("SMTP no configurado: el correo de recuperación queda pendiente en el outbox.")
+    email_outbox.encolar(db, email, email_service.contenido_recuperacion_password(
+        email=email,
+        nombre=getattr(user, "nombre", ""),
+        token=token,
+        expira_minutos=expira_minutos,
+    ))
+    db.commit()
+    email_outbox.notificar()
 
     return mensaje_generico
 
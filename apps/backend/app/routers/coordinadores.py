@@ -3,7 +3,7 @@ Router para endpoints de coordinadores
 Gestión de coordinadores y sus operaciones
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -19,14 +19,15 @@ from app.schemas.schemas import (
     PacienteOut,
     PacienteConMedicoOut,
 )
-from app.core.security import get_current_user
+from app.core.deps import get_current_user, require_rol
 from app.services.coordinador_service import (
     crear_coordinador,
     asignar_hospital_a_coordinador,
     obtener_coordinador_actual,
     obtener_medicos_del_hospital,
     obtener_pacientes_del_hospital,
-    obtener_estadisticas_hospital
+    obtener_estadisticas_hospital,
+    estadisticas_hospital
 )
 
 router = APIRouter()
@@ -38,7 +39,7 @@ router = APIRouter()
 def create_coordinador(
         coordinador_data: CoordinadorCreate,
         db: Session = Depends(get_db),
-        current_user: dict = Depends(get_current_user)
+        current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden crear coordinadores"))
 ):
     """
     Crea un nuevo coordinador (solo admin).
@@ -49,13 +50,6 @@ def create_coordinador(
     - **password**: Contraseña
     - **hospital_id**: ID del hospital (opcional)
     """
-    # ✅ Verificación de rol admin
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden crear coordinadores"
-        )
-    
     coordinador = crear_coordinador(db, coordinador_data, current_user)
     return coordinador
 
@@ -65,18 +59,11 @@ def get_all_coordinadores(
         skip: int = Query(0, ge=0),
         limit: int = Query(100, ge=1, le=500),
         db: Session = Depends(get_db),
-        current_user: dict = Depends(get_current_user)
+        current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden ver la lista de coordinadores"))
 ):
     """
     Obtiene todos los coordinadores (solo admin).
     """
-    # ✅ Verificación de rol admin
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden ver la lista de coordinadores"
-        )
-    
     coordinadores = db.query(Coordinador).offset(skip).limit(limit).all()
     return coordinadores
 
@@ -205,18 +192,11 @@ def assign_hospital_to_coordinador(
         coordinador_id: int,
         hospital_id: int = Query(..., description="ID del hospital a asignar"),
         db: Session = Depends(get_db),
-        current_user: dict = Depends(get_current_user)
+        current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden asignar hospitales a coordinadores"))
 ):
     """
     Asigna un hospital a un coordinador (solo admin).
     """
-    # ✅ Verificación de rol admin
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden asignar hospitales a coordinadores"
-        )
-    
     coordinador = asignar_hospital_a_coordinador(db, coordinador_id, hospital_id, current_user)
     return coordinador
 
@@ -225,18 +205,11 @@ def assign_hospital_to_coordinador(
 def delete_coordinador(
         coordinador_id: int,
         db: Session = Depends(get_db),
-        current_user: dict = Depends(get_current_user)
+        current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden eliminar coordinadores"))
 ):
     """
     Elimina un coordinador (solo admin).
     """
-    # ✅ Verificación de rol admin
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden eliminar coordinadores"
-        )
-    
     coordinador = db.query(Coordinador).filter(Coordinador.id == coordinador_id).first()
 
     if not coordinador:
@@ -259,19 +232,12 @@ def delete_coordinador(
 @router.get("/me", response_model=CoordinadorOut)
 def get_mi_perfil(
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_rol("coordinador", detalle="Este endpoint es solo para coordinadores"))
 ):
     """
     Obtiene el perfil del coordinador autenticado.
     ✅ Cualquier coordinador puede acceder a sus propios datos.
     """
-    # ✅ Verificar que sea coordinador
-    if current_user["rol"] != "coordinador":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Este endpoint es solo para coordinadores"
-        )
-    
     coordinador = obtener_coordinador_actual(db, current_user)
     return coordinador
 
@@ -279,19 +245,12 @@ def get_mi_perfil(
 @router.get("/me/dashboard", response_model=CoordinadorDashboardOut)
 def get_mi_dashboard(
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_rol("coordinador", detalle="Este endpoint es solo para coordinadores"))
 ):
     """
     Obtiene el dashboard del coordinador con estadísticas de su hospital.
     ✅ Cualquier coordinador puede acceder a su dashboard.
     """
-    # ✅ Verificar que sea coordinador
-    if current_user["rol"] != "coordinador":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Este endpoint es solo para coordinadores"
-        )
-    
     coordinador = obtener_coordinador_actual(db, current_user)
 
     if not coordinador.hospital_id:
@@ -319,19 +278,12 @@ def get_mi_dashboard(
 @router.get("/me/hospital", response_model=HospitalDetalladoOut)
 def get_mi_hospital(
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_rol("coordinador", detalle="Este endpoint es solo para coordinadores"))
 ):
     """
     Obtiene el hospital asignado al coordinador con información detallada.
     ✅ Cualquier coordinador puede acceder a la info de su hospital.
     """
-    # ✅ Verificar que sea coordinador
-    if current_user["rol"] != "coordinador":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Este endpoint es solo para coordinadores"
-        )
-    
     coordinador = obtener_coordinador_actual(db, current_user)
 
     if not coordinador.hospital:
@@ -340,8 +292,8 @@ def get_mi_hospital(
             detail="No tienes un hospital asignado"
         )
 
-    # Contar pacientes
-    pacientes_count = len(coordinador.hospital.pacientes)
+    # Contar pacientes (COUNT cacheado, sin cargar cada paciente)
+    pacientes_count = estadisticas_hospital(db, coordinador.hospital_id)["total_pacientes"]
 
     hospital_detallado = {
         **coordinador.hospital.__dict__,
@@ -357,20 +309,13 @@ def get_mi_hospital(
 def get_mis_medicos(
     especialidad_id: Optional[int] = Query(None, description="Filtrar por especialidad"),
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_rol("coordinador", detalle="Este endpoint es solo para coordinadores"))
 ):
     """
     Obtiene los médicos del hospital del coordinador.
     Opcionalmente filtrados por especialidad.
     ✅ Cualquier coordinador puede ver los médicos de su hospital.
     """
-    # ✅ Verificar que sea coordinador
-    if current_user["rol"] != "coordinador":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Este endpoint es solo para coordinadores"
-        )
-    
     coordinador = obtener_coordinador_actual(db, current_user)
 
     if not coordinador.hospital_id:
@@ -385,20 +330,21 @@ def get_mis_medicos(
 
 @router.get("/me/pacientes", response_model=List[PacienteConMedicoOut])
 def get_mis_pacientes(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    q: Optional[str] = Query(None, description="Documento (prefijo) o nombre"),
+    con_medico: Optional[bool] = Query(None, description="True: con médico asignado, False: sin médico"),
+    medico_id: Optional[int] = Query(None, description="Filtrar por médico asignado"),
+    orden: str = Query("nombre", description="nombre, documento, fecha_nacimiento, medico o fecha_asignacion; prefijo '-' para descendente"),
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_rol("coordinador", detalle="Este endpoint es solo para coordinadores"))
 ):
     """
-    Obtiene los pacientes del hospital del coordinador.
+    Obtiene los pacientes del hospital del coordinador, paginados.
+    El total (con los filtros aplicados) se devuelve en el header `X-Total-Count`.
     ✅ Cualquier coordinador puede ver los pacientes de su hospital.
     """
-    # ✅ Verificar que sea coordinador
-    if current_user["rol"] != "coordinador":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Este endpoint es solo para coordinadores"
-        )
-    
     coordinador = obtener_coordinador_actual(db, current_user)
 
     if not coordinador.hospital_id:
@@ -407,5 +353,9 @@ def get_mis_pacientes(
             detail="No tienes un hospital asignado"
         )
 
-    pacientes = obtener_pacientes_del_hospital(db, coordinador.hospital_id, current_user)
+    pacientes, total = obtener_pacientes_del_hospital(
+        db, coordinador.hospital_id, current_user,
+        skip=skip, limit=limit, q=q, con_medico=con_medico, medico_id=medico_id, orden=orden
+    )
+    response.headers["X-Total-Count"] = str(total)
     return pacientes
\ No newline at end of file
@@ -1,43 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.db.db import get_db
 from app.models.models import Especialidad, Medico
-from app.schemas.schemas import EspecialidadCreate, EspecialidadUpdate, EspecialidadResponse
-from app.core.security import get_current_user
+from app.schemas.schemas import EspecialidadCreate, EspecialidadUpdate, EspecialidadResponse, MedicoEspecialidadOut
+from app.core.deps import require_rol
+from app.core.http_cache import no_modificado
+from app.services import catalogos
+from app.services.busqueda_medicos import LIMITE_MAXIMO, listar_medicos_de_especialidad
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[EspecialidadResponse])
 def get_all_especialidades(
+        request: Request,
+        response: Response,
         incluir_inactivas: bool = False,
         db: Session = Depends(get_db)
 ):
-    """Obtiene todas las especialidades (públicamente accesible)"""
-    query = db.query(Especialidad)
-
-    if not incluir_inactivas:
-        query = query.filter(Especialidad.activa == 1)
-
-    especialidades = query.order_by(Especialidad.nombre).all()
-    return especialidades
+    """
+    Obtiene todas las especialidades (públicamente accesible, desde el catálogo
+    en memoria). Cacheable: responde 304 a `If-None-Match` con el ETag vigente.
+    """
+    no_modificada = no_modificado(request, response, *catalogos.validadores(db, "especialidades"))
+    if no_modificada:
+        return no_modificada
+    return catalogos.especialidades(db, incluir_inactivas)
 
 
 @router.get("/{especialidad_id}", response_model=EspecialidadResponse)
 def get_especialidad_by_id(
         especialidad_id: int,
+        request: Request,
+        response: Response,
         db: Session = Depends(get_db)
 ):
-    """Obtiene una especialidad por ID"""
-    especialidad = db.query(Especialidad).filter(Especialidad.id == especialidad_id).first()
+    """Obtiene una especialidad por ID (cacheable con ETag)"""
+    especialidad = catalogos.especialidad_por_id(db, especialidad_id)
     
     if not especialidad:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Especialidad no encontrada"
         )
-    
+
+    no_modificada = no_modificado(request, response, *catalogos.validadores(db, "especialidades"))
+    if no_modificada:
+        return no_modificada
     return especialidad
 
 
@@ -45,16 +55,9 @@ def get_especialidad_by_id(
 def create_especialidad(
         especialidad: EspecialidadCreate,
         db: Session = Depends(get_db),
-        current_user: dict = Depends(get_current_user)
+        current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden crear especialidades"))
 ):
     """Crea una nueva especialidad (solo admin)"""
-    # ✅ AGREGAR: Verificación de rol admin
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden crear especialidades"
-        )
-    
     # Verificar si ya existe
     existing = db.query(Especialidad).filter(Especialidad.nombre == especialidad.nombre).first()
     if existing:
@@ -71,6 +74,7 @@ def create_especialidad(
 
     db.add(nueva_especialidad)
     db.commit()
+    catalogos.invalidar()
     db.refresh(nueva_especialidad)
 
     return nueva_especialidad
@@ -81,16 +85,9 @@ def update_especialidad(
         especialidad_id: int,
         especialidad_update: EspecialidadUpdate,
         db: Session = Depends(get_db),
-        current_user: dict = Depends(get_current_user)
+        current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden actualizar especialidades"))
 ):
     """Actualiza una especialidad (solo admin)"""
-    # ✅ AGREGAR: Verificación de rol admin
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden actualizar especialidades"
-        )
-    
     especialidad = db.query(Especialidad).filter(Especialidad.id == especialidad_id).first()
 
     if not especialidad:
@@ -115,6 +112,7 @@ def update_especialidad(
         setattr(especialidad, field, value)
 
     db.commit()
+    catalogos.invalidar()
     db.refresh(especialidad)
 
     return especialidad
@@ -124,16 +122,9 @@ def update_especialidad(
 def delete_especialidad(
         especialidad_id: int,
         db: Session = Depends(get_db),
-        current_user: dict = Depends(get_current_user)
+        current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden desactivar especialidades"))
 ):
     """Desactiva una especialidad (baja lógica) - Solo admin"""
-    # ✅ AGREGAR: Verificación de rol admin
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden desactivar especialidades"
-        )
-    
     especialidad = db.query(Especialidad).filter(Especialidad.id == especialidad_id).first()
 
     if not especialidad:
@@ -145,71 +136,43 @@ def delete_especialidad(
     # Baja lógica (no eliminamos, solo desactivamos)
     especialidad.activa = 0
     db.commit()
+    catalogos.invalidar()
 
     return {"message": "Especialidad desactivada exitosamente", "id": especialidad_id}
 
 
-@router.get("/{especialidad_id}/medicos", response_model=List[dict])
+@router.get("/{especialidad_id}/medicos", response_model=List[MedicoEspecialidadOut])
 def get_medicos_by_especialidad(
         especialidad_id: int,
+        response: Response,
+        skip: int = Query(0, ge=0),
+        limit: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO, description="Tamaño de página; sin `limit` devuelve todos"),
         db: Session = Depends(get_db),
-        current_user: dict = Depends(get_current_user)  # ✅ CAMBIAR: Usar get_current_user
+        current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden ver esta información"))
 ):
-    """Obtiene todos los médicos que tienen una especialidad específica (solo admin)"""
-    print(f"🔍 Usuario autenticado: {current_user}")
-    print(f"🔍 Buscando especialidad ID: {especialidad_id}")
-    
-    # ✅ AGREGAR: Verificación de rol admin
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden ver esta información"
-        )
-    
-    especialidad = db.query(Especialidad).filter(Especialidad.id == especialidad_id).first()
-
-    if not especialidad:
+    """
+    Obtiene los médicos que tienen una especialidad específica (solo admin),
+    ordenados por nombre. Sin `limit` devuelve todos; con `skip`/`limit`
+    pagina. El total se devuelve en el header `X-Total-Count`.
+    """
+    if not catalogos.especialidad_por_id(db, especialidad_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Especialidad no encontrada"
         )
 
-    # Obtener médicos relacionados con esta especialidad
-    medicos = especialidad.medicos
-
-    # Formatear respuesta - CORREGIDO
-    medicos_data = []
-    for medico in medicos:
-        # El médico puede tener múltiples hospitales (many-to-many)
-        # Tomamos el primero si existe
-        hospital_principal = medico.hospitales[0] if medico.hospitales else None
-        
-        medico_info = {
-            "id": medico.id,
-            "nombre": medico.nombre,
-            "documento": medico.documento,
-            "email": medico.email,
-            "hospital_id": hospital_principal.id if hospital_principal else None,
-            "hospital_nombre": hospital_principal.nombre if hospital_principal else None
-        }
-        medicos_data.append(medico_info)
-
-    return medicos_data
+    medicos, total = listar_medicos_de_especialidad(db, especialidad_id, skip=skip, limit=limit)
+    response.headers["X-Total-Count"] = str(total)
+    return medicos
 
 
 @router.post("/{especialidad_id}/reactivar", response_model=EspecialidadResponse)
 def reactivar_especialidad(
         especialidad_id: int,
         db: Session = Depends(get_db),
-        current_user: dict = Depends(get_current_user)
+        current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden reactivar especialidades"))
 ):
     """Reactiva una especialidad desactivada (solo admin)"""
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden reactivar especialidades"
-        )
-    
     especialidad = db.query(Especialidad).filter(Especialidad.id == especialidad_id).first()
 
     if not especialidad:
@@ -220,6 +183,7 @@ def reactivar_especialidad(
 
     especialidad.activa = 1
     db.commit()
+    catalogos.invalidar()
     db.refresh(especialidad)
 
     return especialidad
\ No newline at end of file
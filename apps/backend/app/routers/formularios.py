@@ -6,44 +6,39 @@ from datetime import datetime
 
 from app.db.db import get_db
 from app.models.models import (
-    Formulario, FormularioAsignacion, RespuestaFormulario, Paciente, Medico, Asignacion
+    Formulario, FormularioAsignacion, FormularioProgramacion, RespuestaFormulario, Paciente, Medico, Asignacion
 )
 from app.schemas.schemas import (
     FormularioCreate, FormularioUpdate, FormularioOut, FormularioListOut,
     FormularioAsignacionCreate, FormularioAsignacionOut, FormularioAsignacionDetalleOut,
+    FormularioAsignacionMasivaCreate, FormularioAsignacionMasivaOut,
+    FormularioProgramacionCreate, FormularioProgramacionOut,
     RespuestaFormularioCreate, RespuestaFormularioOut,
     RespuestaResumenItemOut, RespuestasResumenPaginadoOut, RespuestaFormularioDetalleOut,
     MiRespuestaFormularioOut
 )
-from app.core.security import get_current_user
+from app.core.deps import get_current_user, require_rol
+from app.core.respuestas import json_directo
+from app.services import asignacion_formularios, programacion_formularios
 
 router = APIRouter()
 
 
 # ========== HELPERS ==========
 
-def require_medico(current_user: dict = Depends(get_current_user)):
-    """Verifica que el usuario sea médico"""
-    if current_user["rol"] != "medico":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los médicos pueden realizar esta acción"
-        )
-    return current_user
+# Verifica que el usuario sea médico (solo médicos, a diferencia de deps.require_medico)
+require_medico = require_rol("medico", detalle="Solo los médicos pueden realizar esta acción")
 
 
 # ========== RUTAS ESTÁTICAS PRIMERO ==========
 
 @router.get("/mis-asignaciones", response_model=List[FormularioAsignacionDetalleOut])
 def mis_asignaciones(
-    estado: Optional[str] = Query(None, description="Filtrar por estado: pendiente, completado, todos"),
+    estado: Optional[str] = Query(None, description="Filtrar por estado: pendiente, completado, expirado, todos"),
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_rol("paciente", detalle="Solo pacientes pueden ver sus asignaciones"))
 ):
     """Obtiene los formularios asignados al paciente actual"""
-    if current_user["rol"] != "paciente":
-        raise HTTPException(status_code=403, detail="Solo pacientes pueden ver sus asignaciones")
-
     query = db.query(FormularioAsignacion).join(Formulario).filter(
         FormularioAsignacion.paciente_id == current_user["id"]
     )
@@ -71,12 +66,9 @@ def mis_asignaciones(
 def obtener_mi_respuesta(
     asignacion_id: int,
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_rol("paciente", detalle="Solo pacientes pueden ver sus respuestas"))
 ):
     """Obtiene la respuesta del paciente a una asignación completada (solo lectura)"""
-    if current_user["rol"] != "paciente":
-        raise HTTPException(status_code=403, detail="Solo pacientes pueden ver sus respuestas")
-    
     asignacion = db.query(FormularioAsignacion).filter(
         FormularioAsignacion.id == asignacion_id,
         FormularioAsignacion.paciente_id == current_user["id"]
@@ -222,8 +214,8 @@ def asignar_formulario(
     if not paciente:
         raise HTTPException(status_code=404, detail="Paciente no encontrado")
     
-    # Calcular número de instancia
-    count = db.query(func.count(FormularioAsignacion.id)).filter(
+    # Calcular número de instancia (el mismo criterio que las programaciones recurrentes)
+    ultima_instancia = db.query(func.coalesce(func.max(FormularioAsignacion.numero_instancia), 0)).filter(
         FormularioAsignacion.formulario_id == formulario_id,
         FormularioAsignacion.paciente_id == data.paciente_id
     ).scalar()
@@ -233,7 +225,7 @@ def asignar_formulario(
         paciente_id=data.paciente_id,
         asignado_por=current_user["id"],
         fecha_expiracion=data.fecha_expiracion,
-        numero_instancia=count + 1,
+        numero_instancia=ultima_instancia + 1,
         datos_extra=data.datos_extra or {}
     )
     
@@ -244,6 +236,54 @@ def asignar_formulario(
     return asignacion
 
 
+@router.post(
+    "/{formulario_id}/asignaciones/masivas",
+    response_model=FormularioAsignacionMasivaOut,
+    status_code=status.HTTP_201_CREATED,
+)
+def asignar_formulario_masivo(
+    formulario_id: int,
+    data: FormularioAsignacionMasivaCreate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_medico)
+):
+    """
+    Asigna un formulario a varios pacientes en una sola transacción: a los de
+    `paciente_ids` o, con `todos_mis_pacientes`, a todos los pacientes activos
+    del médico. Si algún paciente no existe no se asigna a ninguno.
+    """
+    if (data.paciente_ids is None) == (not data.todos_mis_pacientes):
+        raise HTTPException(
+            status_code=400,
+            detail="Indique paciente_ids o todos_mis_pacientes (solo uno de los dos)",
+        )
+
+    formulario = db.query(Formulario).filter(Formulario.id == formulario_id).first()
+    if not formulario:
+        raise HTTPException(status_code=404, detail="Formulario no encontrado")
+    if not formulario.activo:
+        raise HTTPException(status_code=400, detail="El formulario está inactivo")
+
+    if data.todos_mis_pacientes:
+        paciente_ids = asignacion_formularios.pacientes_activos_de_medico(db, current_user["id"])
+    else:
+        paciente_ids = data.paciente_ids
+
+    asignados, faltante = asignacion_formularios.asignar_a_pacientes(
+        db,
+        formulario_id=formulario_id,
+        paciente_ids=paciente_ids,
+        asignado_por=current_user["id"],
+        fecha_expiracion=data.fecha_expiracion,
+        datos_extra=data.datos_extra,
+    )
+    if faltante is not None:
+        raise HTTPException(status_code=404, detail=f"Paciente {faltante} no encontrado")
+    db.commit()
+
+    return {"formulario_id": formulario_id, "asignadas": len(asignados), "paciente_ids": asignados}
+
+
 @router.get("/{formulario_id}/asignaciones", response_model=List[FormularioAsignacionDetalleOut])
 def listar_asignaciones_formulario(
     formulario_id: int,
@@ -271,6 +311,96 @@ def listar_asignaciones_formulario(
     ]
 
 
+# ========== PROGRAMACIONES RECURRENTES ==========
+
+@router.post(
+    "/{formulario_id}/programaciones",
+    response_model=List[FormularioProgramacionOut],
+    status_code=status.HTTP_201_CREATED,
+)
+def programar_formulario(
+    formulario_id: int,
+    data: FormularioProgramacionCreate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_medico)
+):
+    """
+    Programa un formulario recurrente (p. ej. semanal por 12 semanas) para uno o
+    varios pacientes. Las asignaciones se generan en segundo plano a medida que
+    vence cada ocurrencia (ver app.services.programacion_formularios).
+    """
+    formulario = db.query(Formulario).filter(Formulario.id == formulario_id).first()
+    if not formulario:
+        raise HTTPException(status_code=404, detail="Formulario no encontrado")
+    if not formulario.activo:
+        raise HTTPException(status_code=400, detail="El formulario está inactivo")
+
+    existentes = {
+        fila[0] for fila in db.query(Paciente.id).filter(Paciente.id.in_(set(data.paciente_ids))).all()
+    }
+    for paciente_id in data.paciente_ids:
+        if paciente_id not in existentes:
+            raise HTTPException(status_code=404, detail=f"Paciente {paciente_id} no encontrado")
+
+    programaciones = programacion_formularios.crear_programaciones(
+        db,
+        formulario_id=formulario_id,
+        paciente_ids=data.paciente_ids,
+        creado_por=current_user["id"],
+        intervalo_dias=data.intervalo_dias,
+        repeticiones=data.repeticiones,
+        fecha_inicio=data.fecha_inicio,
+        vigencia_dias=data.vigencia_dias,
+    )
+    # Se arma la respuesta antes del commit: después habría que recargar cada fila
+    db.flush()
+    resultado = [FormularioProgramacionOut.model_validate(p) for p in programaciones]
+    db.commit()
+
+    if programaciones and programaciones[0].proxima_fecha <= datetime.utcnow():
+        # La primera ocurrencia ya venció: generarla sin esperar al intervalo
+        programacion_formularios.worker_programaciones.despertar()
+    return resultado
+
+
+@router.get("/{formulario_id}/programaciones", response_model=List[FormularioProgramacionOut])
+def listar_programaciones(
+    formulario_id: int,
+    solo_activas: bool = Query(True),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_medico)
+):
+    """Programaciones del formulario creadas por el médico actual"""
+    query = db.query(FormularioProgramacion).filter(
+        FormularioProgramacion.formulario_id == formulario_id,
+        FormularioProgramacion.creado_por == current_user["id"],
+    )
+    if solo_activas:
+        query = query.filter(FormularioProgramacion.activa.is_(True))
+    return query.order_by(FormularioProgramacion.proxima_fecha, FormularioProgramacion.id).all()
+
+
+@router.delete("/programaciones/{programacion_id}")
+def cancelar_programacion(
+    programacion_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_medico)
+):
+    """Detiene una programación. Las asignaciones ya generadas se conservan."""
+    programacion = db.query(FormularioProgramacion).filter(
+        FormularioProgramacion.id == programacion_id
+    ).first()
+    if not programacion:
+        raise HTTPException(status_code=404, detail="Programación no encontrada")
+    if programacion.creado_por != current_user["id"]:
+        raise HTTPException(status_code=403, detail="No tienes permiso")
+
+    programacion.activa = False
+    db.commit()
+
+    return {"message": "Programación cancelada", "id": programacion_id}
+
+
 @router.post("/asignaciones/{asignacion_id}/responder")
 def responder_formulario(
     asignacion_id: int,
@@ -539,6 +669,8 @@ def listar_resumen_respuestas(
         ).all()
         con_respuesta = {f[0] for f in filas_resp}
 
+    # Todos los valores salen de columnas con los tipos del schema: se serializan
+    # directo con orjson, sin revalidar cada fila contra el response_model
     items = []
     for asig in asignaciones:
         medico_id_row, medico_nombre_row = mapa_medico.get(asig.paciente_id, (None, None))
@@ -548,7 +680,8 @@ def listar_resumen_respuestas(
             "formulario_id": asig.formulario_id,
             "formulario_titulo": asig.formulario.titulo if asig.formulario else None,
             "estado": asig.estado,
-            "numero_instancia": asig.numero_instancia,
+            # La columna admite NULL en filas viejas: mismo default que el schema
+            "numero_instancia": asig.numero_instancia or 1,
             "paciente_id": asig.paciente_id,
             "paciente_nombre": asig.paciente.nombre if asig.paciente else None,
             "paciente_documento": asig.paciente.documento if asig.paciente else None,
@@ -561,7 +694,7 @@ def listar_resumen_respuestas(
             "tiene_respuesta": asig.id in con_respuesta,
         })
 
-    return {"total": total, "items": items}
+    return json_directo({"total": total, "items": items})
 
 
 @router.get("/respuestas/{asignacion_id}", response_model=RespuestaFormularioDetalleOut)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Request, Response, UploadFile, File, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.db import get_db
@@ -8,9 +8,11 @@ from app.schemas.schemas import (
     HospitalUpdate,
     HospitalOut,
     HospitalesCercanosResponse,
-    HospitalConDistanciaOut,
 )
-from app.core.security import get_current_user
+from app.core.deps import require_rol
+from app.core.http_cache import no_modificado
+from app.core.respuestas import json_directo
+from app.services import catalogos
 import csv
 import io
 import math
@@ -33,6 +35,8 @@ def _distancia_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
 
 @router.get("/", response_model=List[HospitalOut])
 def get_all_hospitales(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     nombre: Optional[str] = None,
@@ -40,25 +44,30 @@ def get_all_hospitales(
     ciudad: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Obtiene todos los hospitales con filtros opcionales (público)"""
-    query = db.query(Hospital)
-    
-    # Aplicar filtros si existen
-    if nombre:
-        query = query.filter(Hospital.nombre.ilike(f"%{nombre}%"))
-    if departamento:
-        query = query.filter(Hospital.departamento.ilike(f"%{departamento}%"))
-    if ciudad:
-        query = query.filter(Hospital.ciudad.ilike(f"%{ciudad}%"))
-    
-    hospitales = query.offset(skip).limit(limit).all()
-    return hospitales
+    """
+    Obtiene todos los hospitales con filtros opcionales (público, desde el
+    catálogo en memoria). Cacheable: responde 304 a `If-None-Match` con el ETag
+    vigente.
+    """
+    no_modificada = no_modificado(request, response, *catalogos.validadores(db, "hospitales"))
+    if no_modificada:
+        return no_modificada
+
+    hospitales = catalogos.hospitales(db)
+
+    # Aplicar filtros si existen (subcadena sin distinguir mayúsculas, como ILIKE)
+    for campo, valor in (("nombre", nombre), ("departamento", departamento), ("ciudad", ciudad)):
+        if valor:
+            buscado = valor.casefold()
+            hospitales = [h for h in hospitales if buscado in (h[campo] or "").casefold()]
+
+    return hospitales[skip:skip + limit]
 
 
 @router.get("/mis-cercanos", response_model=HospitalesCercanosResponse)
 def get_mis_hospitales_cercanos(
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_rol("paciente", detalle="Solo los pacientes pueden buscar hospitales cercanos"))
 ):
     """
     Devuelve los hospitales del sistema ordenados del más cercano al más lejano
@@ -67,13 +76,6 @@ def get_mis_hospitales_cercanos(
     La ubicación se obtiene siempre del paciente del token (nunca de un ID enviado
     por el cliente). Solo accesible para pacientes.
     """
-    # ✅ Validar que sea paciente
-    if current_user["rol"] != "paciente":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los pacientes pueden buscar hospitales cercanos"
-        )
-
     paciente = db.query(Paciente).filter(Paciente.id == current_user["id"]).first()
     if not paciente:
         raise HTTPException(
@@ -90,43 +92,47 @@ def get_mis_hospitales_cercanos(
             hospitales=[]
         )
 
-    hospitales = db.query(Hospital).all()
+    # Las filas del catálogo ya tienen los campos y tipos de HospitalOut: se
+    # serializan directo con orjson, sin revalidarlas (json_directo)
     hospitales_con_distancia = []
-    for h in hospitales:
-        if h.latitud is None or h.longitud is None:
+    for h in catalogos.hospitales(db):
+        if h["latitud"] is None or h["longitud"] is None:
             continue
-        distancia = _distancia_km(paciente.latitud, paciente.longitud, h.latitud, h.longitud)
+        distancia = _distancia_km(paciente.latitud, paciente.longitud, h["latitud"], h["longitud"])
         hospitales_con_distancia.append(
-            HospitalConDistanciaOut.model_validate(
-                {**HospitalOut.model_validate(h).model_dump(), "distancia_km": round(distancia, 2)}
-            )
+            {**h, "distancia_km": round(distancia, 2)}
         )
 
     # Ordenar del más cercano al más lejano
-    hospitales_con_distancia.sort(key=lambda x: x.distancia_km if x.distancia_km is not None else float("inf"))
+    hospitales_con_distancia.sort(key=lambda x: x["distancia_km"])
 
-    return HospitalesCercanosResponse(
-        tiene_ubicacion=True,
-        latitud=paciente.latitud,
-        longitud=paciente.longitud,
-        hospitales=hospitales_con_distancia
-    )
+    return json_directo({
+        "tiene_ubicacion": True,
+        "latitud": paciente.latitud,
+        "longitud": paciente.longitud,
+        "hospitales": hospitales_con_distancia,
+    })
 
 
 @router.get("/{hospital_id}", response_model=HospitalOut)
 def get_hospital_by_id(
     hospital_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    """Obtiene un hospital por ID (público)"""
-    hospital = db.query(Hospital).filter(Hospital.id == hospital_id).first()
+    """Obtiene un hospital por ID (público, cacheable con ETag)"""
+    hospital = catalogos.hospital_por_id(db, hospital_id)
     
     if not hospital:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Hospital no encontrado"
         )
-    
+
+    no_modificada = no_modificado(request, response, *catalogos.validadores(db, "hospitales"))
+    if no_modificada:
+        return no_modificada
     return hospital
 
 
@@ -138,13 +144,12 @@ def get_hospitales_cercanos(
     db: Session = Depends(get_db)
 ):
     """Obtiene hospitales cercanos a una ubicación (público)"""
-    hospitales = db.query(Hospital).all()
     cercanos = []
     
-    for h in hospitales:
-        if h.latitud and h.longitud:
+    for h in catalogos.hospitales(db):
+        if h["latitud"] and h["longitud"]:
             # Cálculo simple de distancia (no es exacto pero funciona para distancias cortas)
-            distancia = ((h.latitud - lat)**2 + (h.longitud - lon)**2)**0.5
+            distancia = ((h["latitud"] - lat)**2 + (h["longitud"] - lon)**2)**0.5
             if distancia <= radio:
                 cercanos.append(h)
     
@@ -155,16 +160,9 @@ def get_hospitales_cercanos(
 def create_hospital(
     hospital: HospitalCreate,
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden crear hospitales"))
 ):
     """Crea un nuevo hospital (solo admin)"""
-    # ✅ Validar que sea admin
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden crear hospitales"
-        )
-
     # Verificar si ya existe un hospital con ese código
     if hospital.codigo:
         existing = db.query(Hospital).filter(Hospital.codigo == hospital.codigo).first()
@@ -189,6 +187,7 @@ def create_hospital(
     
     db.add(nuevo_hospital)
     db.commit()
+    catalogos.invalidar()
     db.refresh(nuevo_hospital)
     
     return nuevo_hospital
@@ -199,16 +198,9 @@ def update_hospital(
     hospital_id: int,
     hospital_update: HospitalUpdate,
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden actualizar hospitales"))
 ):
     """Actualiza un hospital (solo admin)"""
-    # ✅ Validar que sea admin
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden actualizar hospitales"
-        )
-
     hospital = db.query(Hospital).filter(Hospital.id == hospital_id).first()
 
     if not hospital:
@@ -234,6 +226,7 @@ def update_hospital(
         setattr(hospital, field, value)
     
     db.commit()
+    catalogos.invalidar()
     db.refresh(hospital)
     
     return hospital
@@ -243,16 +236,9 @@ def update_hospital(
 def delete_hospital(
     hospital_id: int,
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden eliminar hospitales"))
 ):
     """Elimina un hospital (solo admin)"""
-    # ✅ Validar que sea admin
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden eliminar hospitales"
-        )
-
     hospital = db.query(Hospital).filter(Hospital.id == hospital_id).first()
 
     if not hospital:
@@ -270,6 +256,7 @@ def delete_hospital(
     
     db.delete(hospital)
     db.commit()
+    catalogos.invalidar()
     
     return {"message": "Hospital eliminado exitosamente", "id": hospital_id}
 
@@ -278,16 +265,9 @@ def delete_hospital(
 def importar_hospitales(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden importar hospitales"))
 ):
     """Importa hospitales desde un archivo CSV (solo admin)"""
-    # ✅ Validar que sea admin
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden importar hospitales"
-        )
-
     try:
         content = file.file.read().decode("utf-8")
         reader = csv.DictReader(io.StringIO(content))
@@ -318,6 +298,7 @@ def importar_hospitales(
                 errors.append(f"Línea {idx}: {str(e)}")
         
         db.commit()
+        catalogos.invalidar()
         
         return {
             "importados": count,
@@ -8,7 +8,11 @@ Reglas de seguridad:
   en otro hospital.
 
 Reutiliza la lógica de alta individual (`app.services.medico_service.crear_medico`)
-y el servicio de correo (`app.services.email_service`).
+y el servicio de correo (`app.services.email_service`) a través del outbox
+(`app.services.email_outbox`): `correos_enviados` cuenta los correos encolados.
+
+`openpyxl` se importa dentro de cada endpoint: es la dependencia más pesada del
+arranque y sólo la usan estas rutas (ver `benchmarks.perfil_arranque`).
 """
 
 import io
@@ -18,14 +22,13 @@ from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from fastapi.responses import StreamingResponse
-from openpyxl import Workbook, load_workbook
 from sqlalchemy.orm import Session
 
-from app.core.security import get_current_user
+from app.core.deps import get_current_user
 from app.db.db import get_db
 from app.models.models import Coordinador, Hospital
 from app.schemas.schemas import MedicoImportResult, MedicoImportErrorRow
-from app.services import email_service
+from app.services import email_service, email_outbox
 from app.services.medico_service import (
     crear_medico,
     generar_password_temporal,
@@ -134,6 +137,7 @@ def descargar_plantilla(
 ):
     """Descarga una plantilla .xlsx con las columnas esperadas y una fila de ejemplo."""
     _obtener_coordinador_con_hospital(db, current_user)
+    from openpyxl import Workbook
 
     wb = Workbook()
     ws = wb.active
@@ -190,6 +194,8 @@ def importar_medicos(
         )
 
     # Abrir el Excel
+    from openpyxl import load_workbook
+
     try:
         contenido = file.file.read()
         wb = load_workbook(filename=io.BytesIO(contenido), read_only=True, data_only=True)
@@ -238,6 +244,7 @@ def importar_medicos(
     correos_enviados = 0
     correos_con_error = 0
     errores: List[MedicoImportErrorRow] = []
+    smtp_ok = email_service.smtp_configurado()
 
     emails_vistos: set = set()
     documentos_vistos: set = set()
@@ -301,7 +308,9 @@ def importar_medicos(
             errores.append(MedicoImportErrorRow(fila=offset, medico=etiqueta, resultado=str(e)))
             continue
 
-        # Crear médico (commit por fila para aislar errores)
+        # Crear médico y su correo de bienvenida en el outbox (commit por fila
+        # para aislar errores). El worker envía los correos en lotes sobre una
+        # conexión SMTP reutilizada, así la importación no espera al SMTP.
         password_temporal = generar_password_temporal()
         try:
             crear_medico(
@@ -314,8 +323,15 @@ def importar_medicos(
                 especialidades=especialidades,
                 hospitales=[hospital],
                 debe_cambiar_password=True,
-                commit=True,
+                commit=False,
             )
+            email_outbox.encolar(db, email, email_service.contenido_bienvenida_medico(
+                email=email,
+                nombre=nombre,
+                hospital_nombre=hospital.nombre,
+                password_temporal=password_temporal,
+            ))
+            db.commit()
         except MedicoValidationError as e:
             db.rollback()
             con_error += 1
@@ -331,28 +347,18 @@ def importar_medicos(
         emails_vistos.add(email_norm)
         documentos_vistos.add(documento)
 
-        # Enviar correo de bienvenida (un fallo NO elimina al médico ya creado)
-        try:
-            email_service.enviar_bienvenida_medico(
-                email=email,
-                nombre=nombre,
-                hospital_nombre=hospital.nombre,
-                password_temporal=password_temporal,
-            )
+        if smtp_ok:
             correos_enviados += 1
-        except email_service.EmailNoConfiguradoError:
+        else:
             correos_con_error += 1
             errores.append(MedicoImportErrorRow(
                 fila=offset, medico=etiqueta,
-                resultado="Médico creado, pero el correo no se envió (SMTP no configurado)",
-            ))
-        except Exception as e:  # noqa: BLE001 - cualquier fallo de envío
-            correos_con_error += 1
-            errores.append(MedicoImportErrorRow(
-                fila=offset, medico=etiqueta,
-                resultado=f"Médico creado, pero falló el envío del correo: {e}",
+                resultado="Médico creado, pero el correo quedó pendiente (SMTP no configurado)",
             ))
 
+    if correos_enviados:
+        email_outbox.notificar()
+
     return MedicoImportResult(
         hospital=hospital.nombre,
         procesados=procesados,
@@ -376,6 +382,7 @@ def exportar_medicos(
     """Exporta a .xlsx los médicos del hospital del coordinador (sin datos sensibles de auth)."""
     coordinador = _obtener_coordinador_con_hospital(db, current_user)
     hospital: Hospital = coordinador.hospital
+    from openpyxl import Workbook
 
     wb = Workbook()
     ws = wb.active
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.db.db import get_db
 from app.models.models import Medico, Hospital, Especialidad, RolEnum
 from app.schemas.schemas import MedicoResponse, MedicoUpdate, CambiarPasswordRequest
-from app.core.security import get_current_user, get_password_hash
+from app.core.deps import get_current_user, require_rol
+from app.core.security import get_password_hash
+from app.services import catalogos
+from app.services.busqueda_medicos import (
+    LIMITE_MAXIMO, LIMITE_POR_DEFECTO, CursorInvalido, listar_medicos
+)
 
 router = APIRouter()
 
@@ -13,19 +18,13 @@ router = APIRouter()
 def cambiar_mi_password(
         payload: CambiarPasswordRequest,
         db: Session = Depends(get_db),
-        current_user: dict = Depends(get_current_user)
+        current_user: dict = Depends(require_rol("medico", detalle="Este endpoint es solo para médicos"))
 ):
     """
     Permite al médico autenticado cambiar su propia contraseña.
     El médico se deriva del token (nunca de un id enviado por el cliente).
     Al cambiarla, se limpia la marca `debe_cambiar_password`.
     """
-    if current_user["rol"] != "medico":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Este endpoint es solo para médicos"
-        )
-
     nueva = (payload.password or "").strip()
     if len(nueva) < 6:
         raise HTTPException(
@@ -49,30 +48,45 @@ def cambiar_mi_password(
 
 @router.get("/", response_model=List[MedicoResponse])
 def get_all_medicos(
+        response: Response,
+        limit: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO, description="Tamaño de página; sin `limit` ni `cursor` devuelve todos"),
+        cursor: Optional[str] = Query(None, description="Valor de `X-Next-Cursor` de la página anterior"),
+        hospital_id: Optional[int] = Query(None, description="Filtrar por hospital"),
+        especialidad_id: Optional[int] = Query(None, description="Filtrar por especialidad"),
+        nombre: Optional[str] = Query(None, description="Prefijo del nombre"),
         db: Session = Depends(get_db),
         current_user: dict = Depends(get_current_user)
 ):
-    """Obtiene todos los médicos registrados"""
-    medicos = db.query(Medico).all()
+    """
+    Obtiene los médicos registrados ordenados por nombre. Sin `limit` ni
+    `cursor` devuelve todos; con alguno de los dos pagina por cursor y, si hay
+    más resultados, el cursor de la página siguiente se devuelve en el header
+    `X-Next-Cursor`.
+    """
+    if cursor and limit is None:
+        limit = LIMITE_POR_DEFECTO
+    try:
+        medicos, siguiente = listar_medicos(
+            db, limit=limit, cursor=cursor, hospital_id=hospital_id,
+            especialidad_id=especialidad_id, nombre=nombre,
+        )
+    except CursorInvalido as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+    if siguiente:
+        response.headers["X-Next-Cursor"] = siguiente
     return medicos
 
 
 @router.get("/me", response_model=MedicoResponse)
 def get_mi_perfil_medico(
         db: Session = Depends(get_db),
-        current_user: dict = Depends(get_current_user)
+        current_user: dict = Depends(require_rol("medico", detalle="Este endpoint es solo para médicos"))
 ):
     """
     Devuelve los datos del médico autenticado, incluyendo sus hospitales.
     Solo lectura y exclusivo para médicos: el médico se deriva del token
     (nunca de un medico_id enviado por el cliente).
     """
-    if current_user["rol"] != "medico":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Este endpoint es solo para médicos"
-        )
-
     medico = db.query(Medico).filter(Medico.id == current_user["id"]).first()
     if not medico:
         raise HTTPException(
@@ -131,28 +145,22 @@ def update_medico(
 
     # Actualizar especialidades
     if especialidad_ids is not None:
-        especialidades = []
-        for esp_id in especialidad_ids:
-            esp = db.query(Especialidad).filter(Especialidad.id == esp_id).first()
-            if not esp:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Especialidad {esp_id} no encontrada"
-                )
-            especialidades.append(esp)
+        especialidades, esp_id = catalogos.resolver(db, Especialidad, especialidad_ids)
+        if esp_id is not None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Especialidad {esp_id} no encontrada"
+            )
         medico.especialidades = especialidades
 
     # Actualizar hospitales
     if hospital_ids is not None:
-        hospitales = []
-        for hospital_id in hospital_ids:
-            hospital = db.query(Hospital).filter(Hospital.id == hospital_id).first()
-            if not hospital:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Hospital {hospital_id} no encontrado"
-                )
-            hospitales.append(hospital)
+        hospitales, hospital_id = catalogos.resolver(db, Hospital, hospital_ids)
+        if hospital_id is not None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Hospital {hospital_id} no encontrado"
+            )
         medico.hospitales = hospitales
 
     db.commit()
@@ -165,16 +173,9 @@ def update_medico(
 def delete_medico(
         medico_id: int,
         db: Session = Depends(get_db),
-        current_user: dict = Depends(get_current_user)
+        current_user: dict = Depends(require_rol("admin", detalle="Solo los administradores pueden eliminar médicos"))
 ):
     """Elimina un médico (solo admin)"""
-    # ✅ CORRECCIÓN: Usar current_user["rol"] (diccionario, no objeto)
-    if current_user["rol"] != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden eliminar médicos"
-        )
-
     medico = db.query(Medico).filter(Medico.id == medico_id).first()
 
     if not medico:
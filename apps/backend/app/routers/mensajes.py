@@ -4,7 +4,9 @@ from sqlalchemy import and_, or_, func
 from app.db.db import get_db
 from app.models.models import Mensaje, Paciente, Medico, Asignacion, RolEnum
 from app.schemas.schemas import MensajeOut
-from app.core.security import get_current_user, create_access_token, decode_token
+from app.core.deps import get_current_user
+from app.core.security import create_access_token, decode_token
+from app.services import estadisticas_hospitales
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
@@ -95,6 +97,14 @@ class ConnectionManager:
                 except:
                     pass
 
+    def total_conexiones(self) -> int:
+        """Cantidad de WebSockets abiertos (para /metrics)."""
+        return sum(len(conexiones) for conexiones in self.active_connections.values())
+
+    def total_chats(self) -> int:
+        """Cantidad de chats (paciente, médico) con al menos un WebSocket abierto."""
+        return len(self.active_connections)
+
 manager = ConnectionManager()
 
 # ========== AUTORIZACIÓN DE ACCESO AL CHAT ==========
@@ -374,7 +384,9 @@ def marcar_mensajes_leidos(
             Mensaje.medico_id == medico_id,
             Mensaje.leido == 0
         ).update({"leido": 1})
-    
+
+    # El UPDATE masivo no pasa por el flush del ORM: avisar al resumen por hospital
+    estadisticas_hospitales.marcar_paciente(db, paciente_id)
     db.commit()
     return {"message": "Mensajes marcados como leídos"}
 
@@ -497,6 +497,16 @@ class EspecialidadOut(EspecialidadBase):
 EspecialidadResponse = EspecialidadOut
 
 
+class MedicoEspecialidadOut(BaseModel):
+    """Médico de una especialidad con su hospital principal (el de menor ID)."""
+    id: int
+    nombre: str
+    documento: str
+    email: str
+    hospital_id: Optional[int] = None
+    hospital_nombre: Optional[str] = None
+
+
 # ================================================================
 # ASIGNACIÓN MEDICO–PACIENTE SCHEMAS
 # ================================================================
@@ -772,6 +782,7 @@ class FormularioAsignacionOut(BaseModel):
     numero_instancia: int
     estado: str
     datos_extra: Optional[dict] = None
+    programacion_id: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -789,6 +800,86 @@ class FormularioAsignacionDetalleOut(FormularioAsignacionOut):
         from_attributes = True
 
 
+class FormularioAsignacionMasivaCreate(BaseModel):
+    """Asignar un formulario a una lista de pacientes o a todos los del médico"""
+    paciente_ids: Optional[List[int]] = None
+    todos_mis_pacientes: bool = False  # pacientes con asignación activa al médico
+    fecha_expiracion: Optional[datetime] = None
+    datos_extra: Optional[dict] = None
+
+    @field_validator('paciente_ids')
+    @classmethod
+    def validar_pacientes(cls, v):
+        if v is not None and len(v) > 5000:
+            raise ValueError('No se pueden asignar más de 5000 pacientes por vez')
+        return v
+
+
+class FormularioAsignacionMasivaOut(BaseModel):
+    """Resultado de una asignación masiva"""
+    formulario_id: int
+    asignadas: int
+    paciente_ids: List[int]
+
+
+class FormularioProgramacionCreate(BaseModel):
+    """Asignación recurrente de un formulario a uno o varios pacientes"""
+    paciente_ids: List[int]
+    intervalo_dias: int  # cada cuántos días se repite
+    repeticiones: int  # ocurrencias en total
+    fecha_inicio: Optional[datetime] = None  # primera ocurrencia (por defecto, ahora)
+    vigencia_dias: Optional[int] = None  # días para responder cada ocurrencia
+
+    @field_validator('paciente_ids')
+    @classmethod
+    def validar_pacientes(cls, v):
+        if not v:
+            raise ValueError('Debe indicar al menos un paciente')
+        if len(v) > 5000:
+            raise ValueError('No se pueden programar más de 5000 pacientes por vez')
+        return v
+
+    @field_validator('intervalo_dias')
+    @classmethod
+    def validar_intervalo(cls, v):
+        if not 1 <= v <= 365:
+            raise ValueError('El intervalo debe estar entre 1 y 365 días')
+        return v
+
+    @field_validator('repeticiones')
+    @classmethod
+    def validar_repeticiones(cls, v):
+        if not 1 <= v <= 520:
+            raise ValueError('Las repeticiones deben estar entre 1 y 520')
+        return v
+
+    @field_validator('vigencia_dias')
+    @classmethod
+    def validar_vigencia(cls, v):
+        if v is not None and v < 1:
+            raise ValueError('La vigencia debe ser de al menos 1 día')
+        return v
+
+
+class FormularioProgramacionOut(BaseModel):
+    """Programación recurrente y su avance"""
+    id: int
+    formulario_id: int
+    paciente_id: int
+    creado_por: int
+    fecha_inicio: datetime
+    intervalo_dias: int
+    repeticiones: int
+    vigencia_dias: Optional[int] = None
+    generadas: int
+    proxima_fecha: datetime
+    activa: bool
+    fecha_creacion: datetime
+
+    class Config:
+        from_attributes = True
+
+
 # ================================================================
 # RESPUESTAS DE FORMULARIOS SCHEMAS
 # ================================================================
@@ -1040,6 +1131,20 @@ class EstadisticasHospitalOut(BaseModel):
         from_attributes = True
 
 
+class EstadisticaHospitalMaterializadaOut(BaseModel):
+    """Fila del resumen materializado de estadísticas por hospital (vista admin)"""
+    hospital_id: int
+    hospital_nombre: str
+    total_pacientes: int
+    pacientes_asignados: int
+    pacientes_sin_medico: int
+    total_medicos: int
+    medicos_por_especialidad: Dict[str, int] = {}
+    formularios_pendientes: int
+    mensajes_no_leidos: int
+    actualizado_at: datetime
+
+
 class EstadisticasGeneralesOut(BaseModel):
     """Estadísticas generales del sistema"""
     total_hospitales: int
@@ -0,0 +1,85 @@
+"""
+Asignación masiva de un formulario a una cohorte de pacientes.
+
+`asignar_a_pacientes` valida e inserta todas las asignaciones en la transacción
+del caller con un número fijo de consultas, sin importar cuántos pacientes sean:
+
+- una consulta `IN` para comprobar que los pacientes existen;
+- una consulta agrupada por paciente con el `numero_instancia` más alto que ya
+  tiene cada uno para el formulario (el mismo criterio que la asignación
+  individual y las programaciones recurrentes);
+- un `INSERT` masivo (executemany por lotes, sin objetos del ORM).
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.models.models import Asignacion, FormularioAsignacion, Paciente
+from app.services import estadisticas_hospitales
+
+
+def pacientes_activos_de_medico(db: Session, medico_id: int) -> List[int]:
+    """IDs de los pacientes con asignación activa al médico, ordenados."""
+    filas = (
+        db.query(Asignacion.paciente_id)
+        .filter(Asignacion.medico_id == medico_id, Asignacion.activo.is_(True))
+        .distinct()
+        .order_by(Asignacion.paciente_id)
+        .all()
+    )
+    return [fila[0] for fila in filas]
+
+
+def asignar_a_pacientes(
+    db: Session,
+    *,
+    formulario_id: int,
+    paciente_ids: Sequence[int],
+    asignado_por: int,
+    fecha_expiracion: Optional[datetime] = None,
+    datos_extra: Optional[dict] = None,
+) -> Tuple[List[int], Optional[int]]:
+    """
+    Asigna el formulario a cada paciente (sin repetidos). NO hace commit.
+    Devuelve `(paciente_ids, faltante)`: `faltante` es el primer paciente que no
+    existe y en ese caso no se inserta nada.
+    """
+    unicos = list(dict.fromkeys(paciente_ids))
+    if not unicos:
+        return [], None
+
+    existentes = {fila[0] for fila in db.query(Paciente.id).filter(Paciente.id.in_(unicos)).all()}
+    for paciente_id in unicos:
+        if paciente_id not in existentes:
+            return [], paciente_id
+
+    ultima_instancia: Dict[int, int] = dict(
+        db.query(FormularioAsignacion.paciente_id, func.max(FormularioAsignacion.numero_instancia))
+        .filter(
+            FormularioAsignacion.formulario_id == formulario_id,
+            FormularioAsignacion.paciente_id.in_(unicos),
+        )
+        .group_by(FormularioAsignacion.paciente_id)
+        .all()
+    )
+
+    ahora = datetime.utcnow()
+    db.execute(insert(FormularioAsignacion), [
+        {
+            "formulario_id": formulario_id,
+            "paciente_id": paciente_id,
+            "asignado_por": asignado_por,
+            "fecha_asignacion": ahora,
+            "fecha_expiracion": fecha_expiracion,
+            "numero_instancia": (ultima_instancia.get(paciente_id) or 0) + 1,
+            "estado": "pendiente",
+            "datos_extra": datos_extra or {},
+        }
+        for paciente_id in unicos
+    ])
+    # El INSERT masivo no pasa por el flush
+    estadisticas_hospitales.marcar_paciente(db, *unicos)
+    return unicos, None
@@ -0,0 +1,140 @@
+"""
+Listado paginado de médicos (`GET /medicos/`).
+
+- Paginación por cursor (keyset) sobre `(nombre, id)`: cada página es un
+  `WHERE (nombre, id) > (ultimo_nombre, ultimo_id) ORDER BY nombre, id LIMIT n`
+  que usa el índice `ix_medicos_nombre_id`, sin `OFFSET` que crezca con la página.
+  Sin `limit` devuelve todos (el comportamiento anterior del endpoint).
+- Filtros por hospital y especialidad con `EXISTS` sobre las tablas intermedias
+  (no duplica médicos) y por prefijo del nombre.
+- Especialidades y hospitales se cargan con `selectinload`: tres consultas por
+  página, sin importar cuántos médicos tenga.
+
+`listar_medicos_de_especialidad` (`GET /especialidades/{id}/medicos`) es una
+sola consulta proyectada: sólo las columnas que muestra el listado, sin cargar
+objetos ni relaciones.
+"""
+
+import base64
+import binascii
+import json
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.models import Especialidad, Hospital, Medico, medico_especialidad, medico_hospital
+
+LIMITE_POR_DEFECTO = 100
+LIMITE_MAXIMO = 500
+
+
+class CursorInvalido(ValueError):
+    """El cursor recibido no fue generado por `codificar_cursor`."""
+
+
+def codificar_cursor(medico: Medico) -> str:
+    crudo = json.dumps([medico.nombre, medico.id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        nombre, medico_id = json.loads(crudo)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as error:
+        raise CursorInvalido("Cursor de paginación inválido") from error
+    if not isinstance(nombre, str) or not isinstance(medico_id, int):
+        raise CursorInvalido("Cursor de paginación inválido")
+    return nombre, medico_id
+
+
+def _escapar_like(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def listar_medicos(
+    db: Session,
+    *,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    hospital_id: Optional[int] = None,
+    especialidad_id: Optional[int] = None,
+    nombre: Optional[str] = None,
+) -> Tuple[List[Medico], Optional[str]]:
+    """
+    Devuelve una página de médicos ordenados por nombre y el cursor de la página
+    siguiente (`None` si es la última). Con `limit=None`, todos los médicos
+    (desde `cursor`, si se indica) y sin cursor siguiente. Lanza
+    `CursorInvalido` si el cursor no se puede decodificar.
+    """
+    query = db.query(Medico).options(
+        selectinload(Medico.especialidades),
+        selectinload(Medico.hospitales),
+    )
+
+    if hospital_id is not None:
+        query = query.filter(Medico.hospitales.any(Hospital.id == hospital_id))
+    if especialidad_id is not None:
+        query = query.filter(Medico.especialidades.any(Especialidad.id == especialidad_id))
+    prefijo = (nombre or "").strip()
+    if prefijo:
+        query = query.filter(Medico.nombre.ilike(f"{_escapar_like(prefijo)}%", escape="\\"))
+
+    if cursor:
+        ultimo_nombre, ultimo_id = decodificar_cursor(cursor)
+        query = query.filter(or_(
+            Medico.nombre > ultimo_nombre,
+            and_(Medico.nombre == ultimo_nombre, Medico.id > ultimo_id),
+        ))
+
+    query = query.order_by(Medico.nombre, Medico.id)
+    if limit is None:
+        return query.all(), None
+    # Un registro de más para saber si hay página siguiente sin contar el total
+    medicos = query.limit(limit + 1).all()
+    if len(medicos) > limit:
+        medicos = medicos[:limit]
+        return medicos, codificar_cursor(medicos[-1])
+    return medicos, None
+
+
+def listar_medicos_de_especialidad(
+    db: Session,
+    especialidad_id: int,
+    *,
+    skip: int = 0,
+    limit: Optional[int] = None,
+) -> Tuple[List[dict], int]:
+    """
+    Médicos con la especialidad, ordenados por nombre, con su hospital principal
+    (el de menor ID; `None` si no tiene). Devuelve la página (todos desde
+    `skip` si `limit` es `None`) y el total.
+    """
+    hospital_principal = (
+        select(func.min(medico_hospital.c.hospital_id))
+        .where(medico_hospital.c.medico_id == Medico.id)
+        .correlate(Medico)
+        .scalar_subquery()
+    )
+    filas = (
+        db.query(
+            Medico.id, Medico.nombre, Medico.documento, Medico.email,
+            Hospital.id.label("hospital_id"), Hospital.nombre.label("hospital_nombre"),
+        )
+        .join(medico_especialidad, medico_especialidad.c.medico_id == Medico.id)
+        .outerjoin(Hospital, Hospital.id == hospital_principal)
+        .filter(medico_especialidad.c.especialidad_id == especialidad_id)
+        .order_by(Medico.nombre, Medico.id)
+        .offset(skip)
+    )
+    if limit is not None:
+        filas = filas.limit(limit)
+    filas = filas.all()
+    total = (
+        db.query(func.count())
+        .select_from(medico_especialidad)
+        .filter(medico_especialidad.c.especialidad_id == especialidad_id)
+        .scalar()
+    )
+    return [dict(fila._mapping) for fila in filas], total
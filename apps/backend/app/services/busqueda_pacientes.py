@@ -0,0 +1,146 @@
+"""
+Búsqueda indexada de pacientes por nombre o documento.
+
+- El nombre se compara contra `Paciente.nombre_normalizado` (sin acentos, en
+  minúsculas): cada palabra del término debe aparecer en el nombre, en cualquier
+  posición. En PostgreSQL el `LIKE '%...%'` usa el índice GIN trigram (pg_trgm);
+  en SQLite se resuelve con la tabla FTS5 `pacientes_fts` (tokenizer trigram)
+  cuando todas las palabras tienen al menos 3 caracteres.
+- El documento se busca por PREFIJO (`LIKE 'q%'`), que usa el índice
+  `text_pattern_ops` en PostgreSQL.
+- Ranking: documento exacto, documento por prefijo, nombre que empieza con el
+  término, y luego similitud trigram (sólo PostgreSQL) y orden alfabético.
+- Siempre paginado: como máximo `LIMITE_MAXIMO` resultados por página.
+- `buscar_pacientes_con_asignacion` trae además la asignación activa, el médico
+  y el hospital en la misma consulta (cantidad de queries constante por página).
+"""
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, or_, text
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
+
+from app.core.texto import normalizar_texto
+from app.models.models import Asignacion, Medico, Paciente
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 100
+
+# Largo mínimo de cada palabra para usar el índice trigram de SQLite (FTS5)
+_MINIMO_TRIGRAM = 3
+
+
+def _escapar_like(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _condicion_nombre(db: Session, palabras: List[str]):
+    if db.get_bind().dialect.name == "sqlite" and all(len(p) >= _MINIMO_TRIGRAM for p in palabras):
+        # Frases entre comillas: el tokenizer trigram las busca como subcadenas.
+        consulta_fts = " AND ".join('"' + p.replace('"', '""') + '"' for p in palabras)
+        return Paciente.id.in_(
+            text("SELECT rowid FROM pacientes_fts WHERE pacientes_fts MATCH :consulta_fts")
+            .bindparams(consulta_fts=f"nombre_normalizado : ({consulta_fts})")
+        )
+    return and_(*(
+        Paciente.nombre_normalizado.like(f"%{_escapar_like(p)}%", escape="\\") for p in palabras
+    ))
+
+
+def condicion_busqueda(db: Session, termino: str):
+    """
+    Condición WHERE "documento empieza con `termino` o el nombre contiene todas
+    sus palabras". Devuelve None si el término queda vacío al normalizarlo.
+    """
+    termino = (termino or "").strip()
+    normalizado = normalizar_texto(termino)
+    if not normalizado:
+        return None
+    return or_(
+        Paciente.documento.like(f"{_escapar_like(termino)}%", escape="\\"),
+        _condicion_nombre(db, normalizado.split()),
+    )
+
+
+def consulta_busqueda(db: Session, termino: str, solo_sin_hospital: bool = False) -> Optional[Query]:
+    """
+    Query (sin paginar) de pacientes que coinciden con `termino`, ya ordenada por
+    relevancia. Devuelve None si el término queda vacío al normalizarlo.
+    """
+    condicion = condicion_busqueda(db, termino)
+    if condicion is None:
+        return None
+    termino = termino.strip()
+    normalizado = normalizar_texto(termino)
+    prefijo_documento = f"{_escapar_like(termino)}%"
+
+    query = db.query(Paciente).filter(condicion)
+    if solo_sin_hospital:
+        query = query.filter(Paciente.hospital_id.is_(None))
+
+    relevancia = case(
+        (Paciente.documento == termino, 0),
+        (Paciente.documento.like(prefijo_documento, escape="\\"), 1),
+        (Paciente.nombre_normalizado.like(f"{_escapar_like(normalizado)}%", escape="\\"), 2),
+        else_=3,
+    )
+    orden = [relevancia]
+    if db.get_bind().dialect.name == "postgresql":
+        orden.append(func.similarity(Paciente.nombre_normalizado, normalizado).desc())
+    orden.extend([Paciente.nombre, Paciente.id])
+    return query.order_by(*orden)
+
+
+def buscar_pacientes(
+    db: Session,
+    termino: str,
+    skip: int = 0,
+    limit: int = LIMITE_POR_DEFECTO,
+    solo_sin_hospital: bool = False,
+) -> Tuple[List[Paciente], int]:
+    """
+    Página de pacientes que coinciden con `termino` y el total de coincidencias.
+    `limit` se recorta a `LIMITE_MAXIMO`.
+    """
+    query = consulta_busqueda(db, termino, solo_sin_hospital)
+    if query is None:
+        return [], 0
+
+    limit = max(1, min(limit, LIMITE_MAXIMO))
+    total = query.order_by(None).count()
+    return query.offset(skip).limit(limit).all(), total
+
+
+def buscar_pacientes_con_asignacion(
+    db: Session,
+    termino: str,
+    skip: int = 0,
+    limit: int = LIMITE_POR_DEFECTO,
+    solo_sin_hospital: bool = False,
+) -> Tuple[List[Tuple[Paciente, Optional[Asignacion]]], int]:
+    """
+    Como `buscar_pacientes`, pero cada resultado es `(paciente, asignacion_activa)`.
+
+    La asignación activa se une con un LEFT JOIN (a lo sumo una por paciente,
+    garantizado por `uq_asignacion_activa_por_paciente`); hospital y médico se
+    cargan en el mismo SELECT y las colecciones del médico con `selectinload`.
+    """
+    query = consulta_busqueda(db, termino, solo_sin_hospital)
+    if query is None:
+        return [], 0
+
+    limit = max(1, min(limit, LIMITE_MAXIMO))
+    total = query.order_by(None).count()
+    filas = (
+        query.add_entity(Asignacion)
+        .outerjoin(Asignacion, and_(Asignacion.paciente_id == Paciente.id, Asignacion.activo.is_(True)))
+        .options(
+            joinedload(Paciente.hospital),
+            joinedload(Asignacion.medico).selectinload(Medico.especialidades),
+            joinedload(Asignacion.medico).selectinload(Medico.hospitales),
+        )
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [(paciente, asignacion) for paciente, asignacion in filas], total
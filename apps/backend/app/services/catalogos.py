@@ -0,0 +1,213 @@
+"""
+Caché en memoria de los catálogos de especialidades y hospitales.
+
+Son tablas chicas que casi no cambian y se leen en cada alta de médico, en la
+importación masiva y en los listados públicos. Se cargan completas (dos
+consultas) en un snapshot inmutable con índices por ID y por nombre
+normalizado; las búsquedas son O(1) y sin ir a la base.
+
+Invalidación por versión: toda alta, edición, baja, reactivación o importación
+llama a `invalidar()`, que cambia la versión del catálogo, y la próxima lectura
+reconstruye el snapshot. El snapshot siempre vive en la memoria del worker; con
+`CACHE_BACKEND=redis` lo único que se comparte es el número de versión, que
+cada worker consulta (un GET) como mucho cada `CATALOGO_VERSION_CHECK_SECONDS`:
+ése es el atraso máximo con que los demás workers ven un cambio. En memoria
+cada worker sólo ve sus propios cambios, y `CATALOGO_CACHE_SECONDS` acota
+cuánto tardan los demás.
+
+Cada snapshot tiene además un ETag por catálogo (hash de su contenido) y la
+fecha en que se construyó, para el caché HTTP de los endpoints públicos (ver
+`validadores` y `app.core.http_cache`).
+
+Los diccionarios devueltos son compartidos: no modificarlos.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import crear_cache
+from app.core.config import settings
+from app.core.texto import normalizar_texto
+from app.models.models import Especialidad, Hospital
+
+_CAMPOS_ESPECIALIDAD = ("id", "nombre", "descripcion", "activa")
+_CAMPOS_HOSPITAL = (
+    "id", "nombre", "codigo", "departamento", "ciudad", "barrio", "direccion",
+    "telefono", "latitud", "longitud",
+)
+
+# Versión vigente de los catálogos; sólo tiene que cambiar en cada invalidación
+_versiones = crear_cache("catalogos_version", ttl=365 * 24 * 3600)
+# Última versión leída de `_versiones` y cuándo (time.monotonic())
+_version_vista: Tuple[int, float] = (0, float("-inf"))
+_lock = threading.Lock()
+_snapshot: Optional["_Catalogos"] = None
+# ETags y fecha del último snapshot: si el contenido no cambió, la reconstrucción
+# (por TTL o por invalidación) conserva su Last-Modified
+_ultimos_validadores: Tuple[Dict[str, str], Optional[datetime]] = ({}, None)
+
+
+def _etag(filas: List[dict]) -> str:
+    # Depende sólo del contenido: todos los workers calculan el mismo ETag
+    # para los mismos datos, aunque hayan construido el snapshot en otro momento.
+    crudo = json.dumps(filas, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return '"' + hashlib.sha256(crudo).hexdigest()[:32] + '"'
+
+
+class _Catalogos:
+    def __init__(self, version, especialidades: List[dict], hospitales: List[dict]):
+        global _ultimos_validadores
+        self.version = version
+        self.construido = time.monotonic()
+        self.etags = {"especialidades": _etag(especialidades), "hospitales": _etag(hospitales)}
+        etags_previos, actualizado_previo = _ultimos_validadores
+        if self.etags == etags_previos and actualizado_previo is not None:
+            self.actualizado = actualizado_previo
+        else:
+            self.actualizado = datetime.now(timezone.utc).replace(microsecond=0)
+        _ultimos_validadores = (self.etags, self.actualizado)
+        self.especialidades = especialidades  # ordenadas por nombre
+        self.especialidades_por_id: Dict[int, dict] = {e["id"]: e for e in especialidades}
+        self.especialidades_por_nombre: Dict[str, dict] = {
+            normalizar_texto(e["nombre"]): e for e in especialidades
+        }
+        self.hospitales = hospitales  # ordenados por ID
+        self.hospitales_por_id: Dict[int, dict] = {h["id"]: h for h in hospitales}
+
+
+def _version() -> int:
+    """
+    Versión vigente, releída de `_versiones` como mucho cada
+    `CATALOGO_VERSION_CHECK_SECONDS`. Si la versión compartida no está (Redis
+    caído o clave vencida) se conserva la última conocida.
+    """
+    global _version_vista
+    version, leida = _version_vista
+    ahora = time.monotonic()
+    if ahora - leida >= settings.CATALOGO_VERSION_CHECK_SECONDS:
+        compartida = _versiones.obtener("version")
+        if compartida is not None:
+            version = compartida
+        _version_vista = (version, ahora)
+    return version
+
+
+def invalidar() -> None:
+    """Descarta el snapshot de catálogos. Llamar DESPUÉS del commit."""
+    global _snapshot, _version_vista
+    version = time.time_ns()
+    _versiones.guardar("version", version)
+    with _lock:
+        _version_vista = (version, time.monotonic())
+        _snapshot = None
+
+
+def _fila(objeto, campos: Sequence[str]) -> dict:
+    return {campo: getattr(objeto, campo) for campo in campos}
+
+
+def _catalogos(db: Session) -> _Catalogos:
+    global _snapshot
+    version = _version()
+    actual = _snapshot
+    if (
+        actual is not None
+        and actual.version == version
+        and time.monotonic() - actual.construido < settings.CATALOGO_CACHE_SECONDS
+    ):
+        return actual
+    with _lock:
+        actual = _snapshot
+        if actual is None or actual.version != version or (
+            time.monotonic() - actual.construido >= settings.CATALOGO_CACHE_SECONDS
+        ):
+            especialidades = db.query(*(getattr(Especialidad, c) for c in _CAMPOS_ESPECIALIDAD)) \
+                .order_by(Especialidad.nombre).all()
+            hospitales = db.query(*(getattr(Hospital, c) for c in _CAMPOS_HOSPITAL)) \
+                .order_by(Hospital.id).all()
+            actual = _Catalogos(
+                version,
+                [_fila(e, _CAMPOS_ESPECIALIDAD) for e in especialidades],
+                [_fila(h, _CAMPOS_HOSPITAL) for h in hospitales],
+            )
+            _snapshot = actual
+    return actual
+
+
+def validadores(db: Session, catalogo: str) -> Tuple[str, datetime]:
+    """
+    `(etag, last_modified)` vigentes de "especialidades" u "hospitales". Sin
+    consultas si el snapshot está en memoria.
+    """
+    actual = _catalogos(db)
+    return actual.etags[catalogo], actual.actualizado
+
+
+# ========== ESPECIALIDADES ==========
+
+def especialidades(db: Session, incluir_inactivas: bool = False) -> List[dict]:
+    """Especialidades ordenadas por nombre (por defecto sólo las activas)."""
+    todas = _catalogos(db).especialidades
+    if incluir_inactivas:
+        return todas
+    return [e for e in todas if e["activa"] == 1]
+
+
+def especialidad_por_id(db: Session, especialidad_id: int) -> Optional[dict]:
+    return _catalogos(db).especialidades_por_id.get(especialidad_id)
+
+
+def especialidad_por_nombre(db: Session, nombre: str) -> Optional[dict]:
+    """Búsqueda sin distinguir mayúsculas, acentos ni espacios repetidos."""
+    return _catalogos(db).especialidades_por_nombre.get(normalizar_texto(nombre))
+
+
+# ========== HOSPITALES ==========
+
+def hospitales(db: Session) -> List[dict]:
+    """Todos los hospitales, ordenados por ID."""
+    return _catalogos(db).hospitales
+
+
+def hospital_por_id(db: Session, hospital_id: int) -> Optional[dict]:
+    return _catalogos(db).hospitales_por_id.get(hospital_id)
+
+
+# ========== RESOLUCIÓN DE IDs ==========
+
+def resolver(
+    db: Session,
+    modelo: Type,
+    ids: Sequence[int],
+    *,
+    solo_activas: bool = False,
+) -> Tuple[list, Optional[int]]:
+    """
+    Convierte IDs de especialidades u hospitales en instancias del modelo para
+    asociarlas a un médico. Devuelve `(instancias, faltante)`: `faltante` es el
+    primer ID que no existe (o está inactivo, con `solo_activas`) y en ese caso
+    no se consulta la base. Si todos son válidos, una sola consulta `IN` trae
+    las instancias en el orden recibido (sin repetidos).
+    """
+    catalogos = _catalogos(db)
+    indice = catalogos.especialidades_por_id if modelo is Especialidad else catalogos.hospitales_por_id
+    unicos = list(dict.fromkeys(ids or []))
+    for id_ in unicos:
+        fila = indice.get(id_)
+        if fila is None or (solo_activas and fila.get("activa") != 1):
+            return [], id_
+    if not unicos:
+        return [], None
+
+    por_id = {obj.id: obj for obj in db.query(modelo).filter(modelo.id.in_(unicos)).all()}
+    for id_ in unicos:
+        # Borrado en otro worker después de construir el snapshot
+        if id_ not in por_id or (solo_activas and por_id[id_].activa != 1):
+            return [], id_
+    return [por_id[id_] for id_ in unicos], None
@@ -3,7 +3,8 @@ Servicios para la gestión de coordinadores y asignaciones
 Contiene toda la lógica de negocio relacionada con coordinadores
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_
+from sqlalchemy.orm import Session, contains_eager, joinedload
 from fastapi import HTTPException, status
 from typing import List, Optional, Tuple
 from datetime import datetime
@@ -15,7 +16,6 @@ from app.models.models import (
     Medico,
     Paciente,
     Asignacion,
-    Especialidad,
     RolEnum
 )
 from app.schemas.schemas import (
@@ -24,6 +24,8 @@ from app.schemas.schemas import (
     AsignacionCreate,
 )
 from app.core.security import get_password_hash
+from app.services import estadisticas_hospitales
+from app.services.busqueda_pacientes import LIMITE_POR_DEFECTO, buscar_pacientes, condicion_busqueda
 
 
 # ========== UTILIDADES GEOGRÁFICAS ==========
@@ -330,6 +332,7 @@ def asignar_medico_a_hospital(
     # Asignar médico al hospital
     medico.hospitales.append(hospital)
     db.commit()
+    refrescar_estadisticas_hospital(db, hospital_id)
     db.refresh(medico)
 
     return medico
@@ -376,6 +379,7 @@ def remover_medico_de_hospital(
     # Remover médico del hospital
     medico.hospitales.remove(hospital)
     db.commit()
+    refrescar_estadisticas_hospital(db, hospital_id)
     db.refresh(medico)
 
     return medico
@@ -412,13 +416,40 @@ def obtener_medicos_del_hospital(
 
 # ========== GESTIÓN DE PACIENTES Y ASIGNACIONES ==========
 
+# Campos por los que se puede ordenar el listado de pacientes del hospital
+# (prefijo "-" para orden descendente)
+ORDENES_PACIENTES_HOSPITAL = {
+    "nombre": Paciente.nombre,
+    "documento": Paciente.documento,
+    "fecha_nacimiento": Paciente.fecha_nacimiento,
+    "medico": Medico.nombre,
+    "fecha_asignacion": Asignacion.fecha_asignacion,
+}
+
+
 def obtener_pacientes_del_hospital(
     db: Session,
     hospital_id: int,
-    coordinador_user: dict
-) -> List[dict]:
-    """
-    Obtiene los pacientes asignados a un hospital con su médico asignado.
+    coordinador_user: dict,
+    skip: int = 0,
+    limit: int = 100,
+    q: Optional[str] = None,
+    con_medico: Optional[bool] = None,
+    medico_id: Optional[int] = None,
+    orden: str = "nombre"
+) -> Tuple[List[dict], int]:
+    """
+    Obtiene una página de pacientes del hospital con su médico asignado, y el
+    total de pacientes que cumplen los filtros.
+
+    Una sola consulta: LEFT JOIN a la asignación activa (a lo sumo una por
+    paciente) y a su médico; las colecciones del médico se cargan con
+    `selectinload` (una consulta más por colección, no por paciente).
+
+    Filtros:
+    - q: documento (prefijo) o nombre, como en la búsqueda de pacientes
+    - con_medico: True = sólo con médico asignado, False = sólo sin médico
+    - medico_id: sólo los pacientes asignados a ese médico
     """
     # Obtener el coordinador
     coordinador = obtener_coordinador_actual(db, coordinador_user)
@@ -426,22 +457,49 @@ def obtener_pacientes_del_hospital(
     # Verificar que el coordinador puede operar en este hospital
     verificar_coordinador_hospital(coordinador, hospital_id)
 
-    # Obtener pacientes del hospital
-    pacientes = db.query(Paciente).filter(
-        Paciente.hospital_id == hospital_id
-    ).all()
+    campo = ORDENES_PACIENTES_HOSPITAL.get(orden.lstrip("-"))
+    if campo is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Orden inválido. Opciones: {', '.join(ORDENES_PACIENTES_HOSPITAL)}"
+        )
 
-    # Agregar información del médico asignado a cada paciente
-    resultado = []
-    for paciente in pacientes:
-        # Buscar asignación activa
-        asignacion_activa = db.query(Asignacion).filter(
-            Asignacion.paciente_id == paciente.id,
-            Asignacion.activo == True
-        ).first()
+    query = (
+        db.query(Paciente, Asignacion)
+        .outerjoin(Asignacion, and_(Asignacion.paciente_id == Paciente.id, Asignacion.activo.is_(True)))
+        .outerjoin(Medico, Medico.id == Asignacion.medico_id)
+        .filter(Paciente.hospital_id == hospital_id)
+    )
 
-        # Construir diccionario con datos del paciente
-        paciente_dict = {
+    if q:
+        condicion = condicion_busqueda(db, q)
+        if condicion is not None:
+            query = query.filter(condicion)
+    if con_medico is True:
+        query = query.filter(Asignacion.id.isnot(None))
+    elif con_medico is False:
+        query = query.filter(Asignacion.id.is_(None))
+    if medico_id:
+        query = query.filter(Asignacion.medico_id == medico_id)
+
+    total = query.order_by(None).count()
+
+    filas = (
+        query.options(
+            joinedload(Paciente.hospital),
+            contains_eager(Asignacion.medico).selectinload(Medico.especialidades),
+            contains_eager(Asignacion.medico).selectinload(Medico.hospitales),
+        )
+        .order_by(campo.desc() if orden.startswith("-") else campo, Paciente.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+    # Construir diccionario con datos del paciente
+    resultado = []
+    for paciente, asignacion_activa in filas:
+        resultado.append({
             "id": paciente.id,
             "documento": paciente.documento,
             "nombre": paciente.nombre,
@@ -456,10 +514,9 @@ def obtener_pacientes_del_hospital(
             "hospital_id": paciente.hospital_id,
             "hospital": paciente.hospital,
             "medico_asignado": asignacion_activa.medico if asignacion_activa else None
-        }
-        resultado.append(paciente_dict)
+        })
 
-    return resultado
+    return resultado, total
 
 
 def obtener_pacientes_sin_hospital(
@@ -528,8 +585,10 @@ def asignar_paciente_a_hospital(
         )
 
     # Asignar hospital al paciente
+    hospital_anterior_id = paciente.hospital_id
     paciente.hospital_id = hospital_id
     db.commit()
+    refrescar_estadisticas_hospital(db, hospital_anterior_id, hospital_id)
     db.refresh(paciente)
 
     return paciente
@@ -607,6 +666,7 @@ def asignar_medico_a_paciente(
 
     db.add(nueva_asignacion)
     db.commit()
+    refrescar_estadisticas_hospital(db, paciente.hospital_id)
     db.refresh(nueva_asignacion)
 
     return nueva_asignacion
@@ -659,6 +719,7 @@ def desasignar_medico_de_paciente(
     asignacion.fecha_desactivacion = datetime.utcnow()
 
     db.commit()
+    refrescar_estadisticas_hospital(db, paciente.hospital_id)
     db.refresh(asignacion)
 
     return asignacion
@@ -668,16 +729,14 @@ def desasignar_medico_de_paciente(
 
 def buscar_paciente(
         db: Session,
-        query: str
+        query: str,
+        limit: int = LIMITE_POR_DEFECTO
 ) -> List[Paciente]:
     """
-    Busca pacientes por documento o nombre.
+    Busca pacientes por documento (prefijo) o nombre (sin acentos), ordenados por
+    relevancia y limitados a `limit`. Ver app/services/busqueda_pacientes.py.
     """
-    pacientes = db.query(Paciente).filter(
-        (Paciente.documento.ilike(f"%{query}%")) |
-        (Paciente.nombre.ilike(f"%{query}%"))
-    ).all()
-
+    pacientes, _ = buscar_pacientes(db, query, limit=limit)
     return pacientes
 
 
@@ -699,59 +758,54 @@ def obtener_medicos_disponibles(
 
 # ========== ESTADÍSTICAS Y REPORTES ==========
 
-def obtener_estadisticas_hospital(
-    db: Session,
-    hospital_id: int,
-    coordinador_user: dict
-) -> dict:
+def refrescar_estadisticas_hospital(db: Session, *hospital_ids: Optional[int]) -> None:
     """
-    Obtiene estadísticas de un hospital.
+    Recalcula en el momento las estadísticas materializadas de esos hospitales
+    (llamar después del commit), así el dashboard del coordinador refleja sus
+    propios cambios enseguida. Los demás cambios los toma el refresco
+    incremental de `app.services.estadisticas_hospitales`.
     """
-    coordinador = obtener_coordinador_actual(db, coordinador_user)
-    verificar_coordinador_hospital(coordinador, hospital_id)
+    estadisticas_hospitales.recalcular(db, hospital_ids)
 
-    hospital = db.query(Hospital).filter(Hospital.id == hospital_id).first()
-    if not hospital:
+
+def estadisticas_hospital(db: Session, hospital_id: int) -> dict:
+    """
+    Estadísticas de un hospital, leídas de la tabla materializada (ver
+    app/services/estadisticas_hospitales.py), sin verificar permisos. Lanza 404
+    si el hospital no existe.
+    """
+    fila = estadisticas_hospitales.obtener(db, hospital_id)
+    if fila is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Hospital no encontrado"
         )
 
-    # Contar médicos
-    total_medicos = len(hospital.medicos)
-
-    # Contar pacientes
-    total_pacientes = db.query(Paciente).filter(
-        Paciente.hospital_id == hospital_id
-    ).count()
-
-    # Contar pacientes con médico asignado
-    pacientes_asignados = db.query(Asignacion).join(Paciente).filter(
-        Paciente.hospital_id == hospital_id,
-        Asignacion.activo == True
-    ).count()
-
-    pacientes_sin_medico = total_pacientes - pacientes_asignados
-
-    # Calcular porcentaje de cobertura
+    total_pacientes = fila["total_pacientes"]
+    pacientes_asignados = fila["pacientes_asignados"]
     porcentaje_cobertura = (pacientes_asignados / total_pacientes * 100) if total_pacientes > 0 else 0
 
-    # Médicos por especialidad
-    medicos_por_especialidad = {}
-    for medico in hospital.medicos:
-        for especialidad in medico.especialidades:
-            if especialidad.nombre in medicos_por_especialidad:
-                medicos_por_especialidad[especialidad.nombre] += 1
-            else:
-                medicos_por_especialidad[especialidad.nombre] = 1
-
     return {
         "hospital_id": hospital_id,
-        "hospital_nombre": hospital.nombre,
-        "total_medicos": total_medicos,
+        "hospital_nombre": fila["hospital_nombre"],
+        "total_medicos": fila["total_medicos"],
         "total_pacientes": total_pacientes,
         "pacientes_asignados": pacientes_asignados,
-        "pacientes_sin_medico": pacientes_sin_medico,
+        "pacientes_sin_medico": fila["pacientes_sin_medico"],
         "porcentaje_cobertura": round(porcentaje_cobertura, 2),
-        "medicos_por_especialidad": medicos_por_especialidad
-    }
\ No newline at end of file
+        "medicos_por_especialidad": dict(fila["medicos_por_especialidad"])
+    }
+
+
+def obtener_estadisticas_hospital(
+    db: Session,
+    hospital_id: int,
+    coordinador_user: dict
+) -> dict:
+    """
+    Obtiene estadísticas de un hospital.
+    """
+    coordinador = obtener_coordinador_actual(db, coordinador_user)
+    verificar_coordinador_hospital(coordinador, hospital_id)
+
+    return estadisticas_hospital(db, hospital_id)
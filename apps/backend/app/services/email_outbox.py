@@ -0,0 +1,277 @@
+"""
+Outbox de correos: envío diferido, con reintentos y dead-letter.
+
+Los flujos de la API llaman a `encolar(db, ...)` ANTES de su `db.commit()`: el
+correo queda guardado en la tabla `email_outbox` en la misma transacción que el
+registro que lo origina. Un worker en segundo plano (`worker_outbox`) toma los
+pendientes en lotes, los envía sobre una conexión SMTP reutilizada y:
+
+- marca `enviado` los que salieron;
+- reprograma con backoff exponencial (`EMAIL_OUTBOX_BACKOFF_SECONDS * 2**n`) los
+  que fallaron;
+- pasa a `fallido` (dead-letter) los que agotaron `EMAIL_OUTBOX_MAX_RETRIES` o que
+  el servidor rechazó de forma definitiva.
+
+Como el estado vive en la base de datos, un reinicio no pierde correos. Cada
+lote se reclama en una transacción corta: pasa a `enviando` con un plazo
+(`EMAIL_OUTBOX_LEASE_SECONDS`) y el envío SMTP ocurre sin locks ni transacción
+abierta. En PostgreSQL el reclamo usa `FOR UPDATE SKIP LOCKED`, así varias
+réplicas de la API pueden drenar el outbox sin enviar dos veces el mismo correo;
+si un worker se cae a mitad del envío, su lote se reintenta al vencer el plazo.
+
+Si SMTP no está configurado los correos quedan `pendiente` y se envían cuando se
+configure.
+
+Los cuerpos llevan secretos (token de recuperación, enlace de invitación,
+contraseña temporal del médico), así que se guardan cifrados (Fernet, con una
+clave derivada de `SECRET_KEY`) y se vacían apenas el correo queda `enviado`.
+Los `fallido` conservan el cuerpo cifrado para revisarlos o reenviarlos (volver
+el estado a `pendiente`) hasta que `worker_purga_outbox` los borra, junto con
+los enviados, después de `EMAIL_OUTBOX_RETENTION_DAYS` días; así la tabla no
+crece sin límite.
+"""
+
+import base64
+import hashlib
+import logging
+import smtplib
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tareas import TareaPeriodica
+from app.db.db import get_sessionmaker
+from app.models.models import EmailOutbox
+from app.services import email_service
+
+logger = logging.getLogger(__name__)
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_ENVIANDO = "enviando"
+ESTADO_ENVIADO = "enviado"
+ESTADO_FALLIDO = "fallido"
+
+
+class CuerpoIlegibleError(Exception):
+    """El cuerpo guardado no se pudo descifrar (p. ej. cambió `SECRET_KEY`)."""
+    pass
+
+
+# ========== CIFRADO DE LOS CUERPOS ==========
+
+@lru_cache(maxsize=1)
+def _fernet(secret_key: str) -> Fernet:
+    # Clave propia del outbox: no se reutiliza la de firma de los JWT tal cual
+    clave = hashlib.sha256(f"email-outbox:{secret_key}".encode()).digest()
+    return Fernet(base64.urlsafe_b64encode(clave))
+
+
+def _cifrar(texto: Optional[str]) -> Optional[str]:
+    if texto is None:
+        return None
+    return _fernet(settings.SECRET_KEY).encrypt(texto.encode()).decode()
+
+
+# Todo token Fernet empieza así (byte de versión 0x80 en base64 urlsafe)
+_PREFIJO_FERNET = "gAAAAA"
+
+
+def _descifrar(texto: Optional[str]) -> Optional[str]:
+    if texto is None:
+        return None
+    if not texto.startswith(_PREFIJO_FERNET):
+        # Encolado en claro antes de cifrar el outbox: se envía tal cual
+        return texto
+    try:
+        return _fernet(settings.SECRET_KEY).decrypt(texto.encode()).decode()
+    except InvalidToken as e:
+        raise CuerpoIlegibleError("No se pudo descifrar el cuerpo del correo") from e
+
+
+def _vaciar(correo: EmailOutbox) -> None:
+    # Ya se envió: no se conservan los secretos
+    correo.cuerpo_texto = ""
+    correo.cuerpo_html = None
+
+
+# ========== ENCOLAR Y ENVIAR ==========
+
+def encolar(db: Session, destinatario: str, contenido: email_service.ContenidoEmail) -> EmailOutbox:
+    """
+    Agrega un correo al outbox. NO hace commit: el caller lo confirma junto con
+    el registro que origina el correo.
+    """
+    correo = EmailOutbox(
+        destinatario=destinatario,
+        asunto=contenido.asunto,
+        cuerpo_texto=_cifrar(contenido.cuerpo_texto),
+        cuerpo_html=_cifrar(contenido.cuerpo_html),
+        estado=ESTADO_PENDIENTE,
+        intentos=0,
+        proximo_intento=datetime.utcnow(),
+    )
+    db.add(correo)
+    return correo
+
+
+def _reprogramar(correo: EmailOutbox, error: Exception, ahora: datetime) -> None:
+    correo.estado = ESTADO_PENDIENTE
+    correo.intentos += 1
+    correo.ultimo_error = str(error)[:1000]
+    definitivo = isinstance(error, (smtplib.SMTPRecipientsRefused, CuerpoIlegibleError))
+    if definitivo or correo.intentos >= settings.EMAIL_OUTBOX_MAX_RETRIES:
+        correo.estado = ESTADO_FALLIDO
+        logger.error("Correo %s a dead-letter tras %d intento(s): %s", correo.id, correo.intentos, error)
+        return
+    espera = settings.EMAIL_OUTBOX_BACKOFF_SECONDS * (2 ** (correo.intentos - 1))
+    correo.proximo_intento = ahora + timedelta(seconds=espera)
+
+
+def _reclamar(db: Session, limite: int) -> List[int]:
+    """
+    Toma un lote de correos vencidos y los pasa a `enviando` con un plazo
+    (`EMAIL_OUTBOX_LEASE_SECONDS`) en `proximo_intento`. Hace commit: los locks
+    de las filas duran sólo esta transacción, no el envío SMTP.
+    """
+    ahora = datetime.utcnow()
+    query = (
+        db.query(EmailOutbox)
+        .filter(
+            # Un `enviando` con el plazo vencido es de un worker que se cayó
+            EmailOutbox.estado.in_((ESTADO_PENDIENTE, ESTADO_ENVIANDO)),
+            EmailOutbox.proximo_intento <= ahora,
+        )
+        .order_by(EmailOutbox.proximo_intento, EmailOutbox.id)
+        .limit(limite)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+    correos = query.all()
+    plazo = ahora + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+    for correo in correos:
+        correo.estado = ESTADO_ENVIANDO
+        correo.proximo_intento = plazo
+    ids = [correo.id for correo in correos]
+    db.commit()
+    return ids
+
+
+def _reclamados(db: Session, ids: List[int]) -> List[EmailOutbox]:
+    # Los que siguen en `enviando`: si el plazo venció, otro worker pudo tomarlos
+    return (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.id.in_(ids), EmailOutbox.estado == ESTADO_ENVIANDO)
+        .order_by(EmailOutbox.id)
+        .all()
+    )
+
+
+def procesar_lote(db: Session, limite: int | None = None) -> int:
+    """
+    Envía un lote de correos pendientes cuyo `proximo_intento` ya llegó.
+    Devuelve cuántos correos se procesaron (enviados o reprogramados).
+
+    Reclama el lote en una transacción corta, envía por SMTP sin ninguna
+    transacción abierta y registra los resultados en otra transacción corta.
+    """
+    if not email_service.smtp_configurado():
+        return 0
+
+    ids = _reclamar(db, limite or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not ids:
+        return 0
+
+    envios: Dict[int, Tuple[str, email_service.ContenidoEmail]] = {}
+    errores: Dict[int, Optional[Exception]] = {}
+    for correo in _reclamados(db, ids):
+        try:
+            envios[correo.id] = (correo.destinatario, email_service.ContenidoEmail(
+                correo.asunto, _descifrar(correo.cuerpo_texto), _descifrar(correo.cuerpo_html)
+            ))
+        except CuerpoIlegibleError as e:
+            errores[correo.id] = e
+    db.commit()
+
+    if envios:
+        errores.update(zip(envios, email_service.enviar_lote(list(envios.values()))))
+
+    ahora = datetime.utcnow()
+    for correo in _reclamados(db, list(errores)):
+        error = errores[correo.id]
+        if error is None:
+            correo.estado = ESTADO_ENVIADO
+            correo.enviado_at = ahora
+            correo.ultimo_error = None
+            _vaciar(correo)
+        else:
+            _reprogramar(correo, error, ahora)
+    db.commit()
+    return len(ids)
+
+
+def drenar_outbox() -> None:
+    """Procesa lotes hasta vaciar los pendientes vencidos (lo ejecuta el worker)."""
+    SessionLocal = get_sessionmaker()
+    db = SessionLocal()
+    try:
+        limite = settings.EMAIL_OUTBOX_BATCH_SIZE
+        while procesar_lote(db, limite) == limite:
+            pass
+    finally:
+        db.close()
+
+
+worker_outbox = TareaPeriodica("email-outbox", drenar_outbox, settings.EMAIL_OUTBOX_POLL_SECONDS)
+
+
+def notificar() -> None:
+    """Avisa al worker que hay correos nuevos (llamar después del commit)."""
+    worker_outbox.despertar()
+
+
+# ========== RETENCIÓN ==========
+
+def purgar(db: Session, ahora: Optional[datetime] = None) -> int:
+    """
+    Borra los correos `enviado` y `fallido` creados hace más de
+    `EMAIL_OUTBOX_RETENTION_DAYS` días. Hace commit y devuelve cuántos borró.
+    """
+    limite = (ahora or datetime.utcnow()) - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+    borrados = (
+        db.query(EmailOutbox)
+        .filter(
+            EmailOutbox.estado.in_((ESTADO_ENVIADO, ESTADO_FALLIDO)),
+            EmailOutbox.created_at < limite,
+        )
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return borrados
+
+
+def purgar_outbox() -> None:
+    """Una pasada de la purga (lo ejecuta `worker_purga_outbox`)."""
+    db = get_sessionmaker()()
+    try:
+        borrados = purgar(db)
+    finally:
+        db.close()
+    if borrados:
+        logger.info("%d correo(s) viejo(s) borrado(s) del outbox.", borrados)
+
+
+worker_purga_outbox = TareaPeriodica(
+    "email-outbox-purga", purgar_outbox, settings.EMAIL_OUTBOX_PURGE_SECONDS
+)
+
+
+def contar_por_estado(db: Session) -> Dict[str, int]:
+    """Cantidad de correos del outbox por estado (para /metrics)."""
+    filas = db.query(EmailOutbox.estado, func.count(EmailOutbox.id)).group_by(EmailOutbox.estado).all()
+    return {estado: total for estado, total in filas}
@@ -8,14 +8,34 @@ SMTP_STARTTLS y FRONTEND_URL.
 Si SMTP no está configurado (SMTP_HOST o SMTP_USER vacíos), `enviar_email` lanza
 `EmailNoConfiguradoError`. Los callers deben capturar los errores para que un fallo
 de envío NO deshaga un registro que ya fue creado en la base de datos.
+
+Las conexiones SMTP se reutilizan mediante un pool pequeño (`SMTP_POOL_SIZE`): el
+handshake STARTTLS + login se hace una sola vez por conexión y no por mensaje.
+Los flujos de la API no envían directamente: guardan el correo en el outbox
+(`app.services.email_outbox`) y un worker lo envía en lotes con `enviar_lote`.
+
+Para probar localmente sin un proveedor real se puede levantar un servidor de
+depuración (`python -m aiosmtpd -n -l localhost:1025`) y configurar
+SMTP_HOST=localhost, SMTP_PORT=1025, SMTP_USER=dev, SMTP_STARTTLS=false (el login
+se omite cuando el servidor no anuncia AUTH).
 """
 
+import logging
 import smtplib
+import threading
+import time
+from contextlib import contextmanager
 from email.mime.multipart import MIMEMultipart
+from email.policy import compat32
 from email.mime.text import MIMEText
 from email.utils import formataddr
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
 from app.core.config import settings
+from app.services import email_templates as plantillas
+
+logger = logging.getLogger(__name__)
 
 
 class EmailNoConfiguradoError(RuntimeError):
@@ -33,180 +53,266 @@ def smtp_configurado() -> bool:
     return bool(settings.SMTP_HOST and settings.SMTP_USER)
 
 
-def enviar_email(destinatario: str, asunto: str, cuerpo_texto: str, cuerpo_html: str | None = None) -> None:
-    """
-    Envía un correo. Lanza EmailNoConfiguradoError si falta configuración SMTP
-    o EmailEnvioError si el envío falla.
-    """
-    if not smtp_configurado():
-        raise EmailNoConfiguradoError("SMTP no configurado")
+def _remitente() -> str:
+    return settings.SMTP_FROM or settings.SMTP_USER
+
+
+@lru_cache(maxsize=4)
+def _encabezado_from(nombre: str, direccion: str) -> str:
+    # formataddr codifica el nombre (RFC 2047); es igual para todos los correos.
+    return formataddr((nombre, direccion))
 
-    remitente = settings.SMTP_FROM or settings.SMTP_USER
 
+def _construir_mensaje(destinatario: str, asunto: str, cuerpo_texto: str, cuerpo_html: str | None) -> MIMEMultipart:
     mensaje = MIMEMultipart("alternative")
     mensaje["Subject"] = asunto
-    mensaje["From"] = formataddr((settings.SMTP_FROM_NAME, remitente))
+    mensaje["From"] = _encabezado_from(settings.SMTP_FROM_NAME, _remitente())
     mensaje["To"] = destinatario
 
     mensaje.attach(MIMEText(cuerpo_texto, "plain", "utf-8"))
     if cuerpo_html:
         mensaje.attach(MIMEText(cuerpo_html, "html", "utf-8"))
+    return mensaje
 
-    try:
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=15) as servidor:
+
+class ContenidoEmail(NamedTuple):
+    asunto: str
+    cuerpo_texto: str
+    cuerpo_html: Optional[str] = None
+
+
+# ========== POOL DE CONEXIONES SMTP ==========
+
+class PoolSMTP:
+    """
+    Pool de conexiones SMTP persistentes.
+
+    Cada conexión se abre (STARTTLS + login) una sola vez y se devuelve al pool
+    tras usarla. Las conexiones inactivas más de `max_inactividad` segundos se
+    cierran al intentar reutilizarlas (los servidores suelen cortarlas solos).
+    Como máximo hay `tamano` conexiones abiertas en simultáneo.
+    """
+
+    def __init__(self, tamano: int, max_inactividad: float):
+        self._libres: List[tuple] = []  # [(smtplib.SMTP, ultimo_uso)]
+        self._lock = threading.Lock()
+        self._semaforo = threading.BoundedSemaphore(max(1, tamano))
+        self._max_inactividad = max_inactividad
+
+    def _abrir(self) -> smtplib.SMTP:
+        servidor = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=15)
+        try:
             if settings.SMTP_STARTTLS:
                 servidor.starttls()
-            if settings.SMTP_USER:
+            # Los servidores de depuración locales no anuncian AUTH.
+            if settings.SMTP_USER and servidor.has_extn("auth"):
                 servidor.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            servidor.sendmail(remitente, [destinatario], mensaje.as_string())
-    except EmailNoConfiguradoError:
-        raise
+        except Exception:
+            _cerrar_silencioso(servidor)
+            raise
+        return servidor
+
+    def _tomar_libre(self) -> Optional[smtplib.SMTP]:
+        ahora = time.monotonic()
+        with self._lock:
+            while self._libres:
+                servidor, ultimo_uso = self._libres.pop()
+                if ahora - ultimo_uso <= self._max_inactividad:
+                    break
+                _cerrar_silencioso(servidor)
+            else:
+                return None
+        # Verificar que el servidor no haya cortado la conexión mientras estaba ociosa.
+        try:
+            if servidor.noop()[0] == 250:
+                return servidor
+        except (smtplib.SMTPException, OSError):
+            pass
+        _cerrar_silencioso(servidor)
+        return None
+
+    @contextmanager
+    def conexion(self, nueva: bool = False) -> Iterator[smtplib.SMTP]:
+        """
+        Entrega una conexión lista para `sendmail`. Si el bloque lanza una
+        excepción la conexión se descarta en lugar de volver al pool.
+        """
+        self._semaforo.acquire()
+        try:
+            servidor = None if nueva else self._tomar_libre()
+            if servidor is None:
+                servidor = self._abrir()
+            try:
+                yield servidor
+            except BaseException:
+                _cerrar_silencioso(servidor)
+                raise
+            with self._lock:
+                self._libres.append((servidor, time.monotonic()))
+        finally:
+            self._semaforo.release()
+
+    def cerrar(self) -> None:
+        """Cierra todas las conexiones ociosas (al apagar la aplicación)."""
+        with self._lock:
+            libres, self._libres = self._libres, []
+        for servidor, _ in libres:
+            _cerrar_silencioso(servidor)
+
+
+def _cerrar_silencioso(servidor: smtplib.SMTP) -> None:
+    try:
+        servidor.quit()
+    except Exception:  # noqa: BLE001 - la conexión puede estar ya cortada
+        try:
+            servidor.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+
+pool_smtp = PoolSMTP(settings.SMTP_POOL_SIZE, settings.SMTP_POOL_MAX_IDLE_SECONDS)
+
+
+# Política de serialización reutilizada por todos los mensajes: sin re-plegado de
+# encabezados (los nuestros son cortos), que es la parte más cara de `as_string`.
+_POLITICA_SERIALIZACION = compat32.clone(max_line_length=None)
+
+
+def _serializar(mensaje: MIMEMultipart) -> str:
+    return mensaje.as_string(policy=_POLITICA_SERIALIZACION)
+
+
+def _entregar(servidor: smtplib.SMTP, destinatario: str, mensaje: MIMEMultipart) -> None:
+    servidor.sendmail(_remitente(), [destinatario], _serializar(mensaje))
+
+
+def enviar_email(destinatario: str, asunto: str, cuerpo_texto: str, cuerpo_html: str | None = None) -> None:
+    """
+    Envía un correo. Lanza EmailNoConfiguradoError si falta configuración SMTP
+    o EmailEnvioError si el envío falla.
+    """
+    if not smtp_configurado():
+        raise EmailNoConfiguradoError("SMTP no configurado")
+
+    mensaje = _construir_mensaje(destinatario, asunto, cuerpo_texto, cuerpo_html)
+
+    try:
+        try:
+            with pool_smtp.conexion() as servidor:
+                _entregar(servidor, destinatario, mensaje)
+        except smtplib.SMTPServerDisconnected:
+            # La conexión reutilizada fue cerrada por el servidor: un reintento
+            # con una conexión nueva.
+            with pool_smtp.conexion(nueva=True) as servidor:
+                _entregar(servidor, destinatario, mensaje)
     except Exception as e:  # noqa: BLE001 - queremos envolver cualquier fallo de red/SMTP
         raise EmailEnvioError(str(e)) from e
 
 
-def enviar_bienvenida_medico(
+def enviar_lote(correos: Sequence[Tuple[str, ContenidoEmail]]) -> List[Optional[Exception]]:
+    """
+    Envía varios correos sobre UNA sola conexión del pool (lo usa el worker del
+    outbox). `correos` es una lista de (destinatario, contenido). Devuelve, por
+    cada correo, None si se envió o la excepción del fallo. Si se cae la
+    conexión a mitad del lote, el resto se marca con ese error.
+    """
+    if not smtp_configurado():
+        raise EmailNoConfiguradoError("SMTP no configurado")
+
+    resultados: List[Optional[Exception]] = [None] * len(correos)
+    i = 0
+    try:
+        with pool_smtp.conexion() as servidor:
+            for i, (destinatario, contenido) in enumerate(correos):
+                mensaje = _construir_mensaje(destinatario, *contenido)
+                try:
+                    _entregar(servidor, destinatario, mensaje)
+                except smtplib.SMTPRecipientsRefused as e:
+                    # Rechazo del destinatario: la conexión sigue siendo válida.
+                    resultados[i] = e
+            i = len(correos)
+    except Exception as e:  # noqa: BLE001 - cualquier fallo de red/SMTP
+        for j in range(i, len(correos)):
+            resultados[j] = e
+    return resultados
+
+
+def cerrar_conexiones() -> None:
+    """Cierra las conexiones SMTP ociosas del pool (al apagar la API)."""
+    pool_smtp.cerrar()
+
+
+# ========== CONTENIDO DE LOS CORREOS ==========
+# Las plantillas se compilan una sola vez (ver app/services/email_templates.py);
+# acá sólo se calculan los valores de cada destinatario.
+
+def _url_frontend(ruta: str) -> str:
+    return f"{settings.FRONTEND_URL.rstrip('/')}{ruta}"
+
+
+def contenido_bienvenida_medico(
     email: str,
     nombre: str,
     hospital_nombre: str,
     password_temporal: str,
-) -> None:
+) -> ContenidoEmail:
     """
-    Envía el correo de bienvenida con las credenciales temporales al médico.
-    Lanza EmailNoConfiguradoError o EmailEnvioError si no puede enviarse.
+    Arma el correo de bienvenida con las credenciales temporales al médico.
     """
-    login_url = f"{settings.FRONTEND_URL.rstrip('/')}/login"
-    asunto = "Bienvenido a Salud en Mapa"
-
-    cuerpo_texto = (
-        f"Bienvenido a Salud en Mapa\n\n"
-        f"Hola {nombre},\n\n"
-        f"Se ha creado una cuenta para usted.\n\n"
-        f"Hospital: {hospital_nombre}\n"
-        f"Usuario: {email}\n"
-        f"Contraseña temporal: {password_temporal}\n\n"
-        f"Ingrese al sistema y cambie su contraseña: {login_url}\n\n"
-        f"Este es un mensaje automático, por favor no responda a este correo."
-    )
-
-    cuerpo_html = f"""\
-<html>
-  <body style="font-family: Arial, sans-serif; color: #1f2937; line-height: 1.6;">
-    <h2 style="color: #7c3aed;">Bienvenido a Salud en Mapa</h2>
-    <p>Hola <strong>{nombre}</strong>,</p>
-    <p>Se ha creado una cuenta para usted.</p>
-    <table style="border-collapse: collapse;">
-      <tr><td style="padding: 4px 12px 4px 0;"><strong>Hospital:</strong></td><td>{hospital_nombre}</td></tr>
-      <tr><td style="padding: 4px 12px 4px 0;"><strong>Usuario:</strong></td><td>{email}</td></tr>
-      <tr><td style="padding: 4px 12px 4px 0;"><strong>Contraseña temporal:</strong></td>
-          <td><code style="font-size: 16px;">{password_temporal}</code></td></tr>
-    </table>
-    <p style="margin-top: 16px;">
-      <a href="{login_url}"
-         style="background: #7c3aed; color: #fff; padding: 10px 18px; border-radius: 8px;
-                text-decoration: none;">Ingresar al sistema</a>
-    </p>
-    <p>Por seguridad, <strong>cambie su contraseña</strong> en el primer inicio de sesión.</p>
-    <p style="color: #6b7280; font-size: 12px;">Este es un mensaje automático, por favor no responda a este correo.</p>
-  </body>
-</html>
-"""
-
-    enviar_email(email, asunto, cuerpo_texto, cuerpo_html)
+    return ContenidoEmail(*plantillas.BIENVENIDA_MEDICO.render(
+        email=email,
+        nombre=nombre,
+        hospital_nombre=hospital_nombre,
+        password_temporal=password_temporal,
+        login_url=_url_frontend("/login"),
+    ))
 
 
-def enviar_recuperacion_password(
+def contenido_recuperacion_password(
     email: str,
     nombre: str,
     token: str,
     expira_minutos: int,
-) -> None:
+) -> ContenidoEmail:
     """
-    Envía el correo de recuperación de contraseña con el código/enlace.
+    Arma el correo de recuperación de contraseña con el código/enlace.
     Incluye el código (para pegar en la app móvil) y un enlace al frontend web.
-    Lanza EmailNoConfiguradoError o EmailEnvioError si no puede enviarse.
     """
-    reset_url = f"{settings.FRONTEND_URL.rstrip('/')}/reset-password?token={token}"
-    asunto = "Recuperación de contraseña - Salud en Mapa"
-
-    cuerpo_texto = (
-        f"Recuperación de contraseña\n\n"
-        f"Hola {nombre},\n\n"
-        f"Recibimos una solicitud para restablecer tu contraseña.\n\n"
-        f"Código de recuperación: {token}\n\n"
-        f"Ingresá este código en la app para definir una nueva contraseña, "
-        f"o abrí este enlace: {reset_url}\n\n"
-        f"El código vence en {expira_minutos} minutos y solo puede usarse una vez.\n\n"
-        f"Si no solicitaste este cambio, podés ignorar este mensaje.\n\n"
-        f"Este es un mensaje automático, por favor no respondas a este correo."
-    )
-
-    cuerpo_html = f"""\
-<html>
-  <body style="font-family: Arial, sans-serif; color: #1f2937; line-height: 1.6;">
-    <h2 style="color: #2571b6;">Recuperación de contraseña</h2>
-    <p>Hola <strong>{nombre}</strong>,</p>
-    <p>Recibimos una solicitud para restablecer tu contraseña.</p>
-    <p>Código de recuperación:</p>
-    <p style="font-size: 18px; background: #f3f4f6; padding: 10px 14px; border-radius: 8px;
-              display: inline-block;"><code>{token}</code></p>
-    <p>Ingresá este código en la app para definir una nueva contraseña, o usá el botón:</p>
-    <p style="margin-top: 12px;">
-      <a href="{reset_url}"
-         style="background: #2571b6; color: #fff; padding: 10px 18px; border-radius: 8px;
-                text-decoration: none;">Restablecer contraseña</a>
-    </p>
-    <p style="color: #6b7280;">El código vence en {expira_minutos} minutos y solo puede usarse una vez.
-       Si no solicitaste este cambio, podés ignorar este mensaje.</p>
-    <p style="color: #6b7280; font-size: 12px;">Este es un mensaje automático, por favor no respondas a este correo.</p>
-  </body>
-</html>
-"""
-
-    enviar_email(email, asunto, cuerpo_texto, cuerpo_html)
+    return ContenidoEmail(*plantillas.RECUPERACION_PASSWORD.render(
+        nombre=nombre,
+        token=token,
+        expira_minutos=expira_minutos,
+        reset_url=_url_frontend(f"/reset-password?token={token}"),
+    ))
 
 
-def enviar_invitacion_admin(
+def contenido_invitacion_admin(
     email: str,
     token: str,
     expira_horas: int,
-) -> None:
+) -> ContenidoEmail:
     """
-    Envía el correo de invitación para registrarse como administrador.
+    Arma el correo de invitación para registrarse como administrador.
     Incluye un enlace de un solo uso al frontend web con el token.
     No envía ninguna contraseña.
-    Lanza EmailNoConfiguradoError o EmailEnvioError si no puede enviarse.
     """
-    accept_url = f"{settings.FRONTEND_URL.rstrip('/')}/aceptar-invitacion-admin?token={token}"
-    asunto = "Invitación para administrar Salud en Mapa"
-
-    cuerpo_texto = (
-        f"Invitación a Salud en Mapa\n\n"
-        f"Hola,\n\n"
-        f"Has sido invitado a formar parte de Salud en Mapa como Administrador.\n\n"
-        f"Completá tu registro utilizando el siguiente enlace: {accept_url}\n\n"
-        f"El enlace vence en {expira_horas} horas y solo puede usarse una vez.\n\n"
-        f"Si no esperabas esta invitación, podés ignorar este mensaje.\n\n"
-        f"Este es un mensaje automático, por favor no respondas a este correo."
-    )
-
-    cuerpo_html = f"""\
-<html>
-  <body style="font-family: Arial, sans-serif; color: #1f2937; line-height: 1.6;">
-    <h2 style="color: #2571b6;">Invitación a Salud en Mapa</h2>
-    <p>Hola,</p>
-    <p>Has sido invitado a formar parte de <strong>Salud en Mapa</strong> como Administrador.</p>
-    <p>Completá tu registro y creá tu contraseña con el siguiente botón:</p>
-    <p style="margin-top: 12px;">
-      <a href="{accept_url}"
-         style="background: #2571b6; color: #fff; padding: 10px 18px; border-radius: 8px;
-                text-decoration: none;">Completar registro</a>
-    </p>
-    <p style="color: #6b7280;">El enlace vence en {expira_horas} horas y solo puede usarse una vez.
-       Si no esperabas esta invitación, podés ignorar este mensaje.</p>
-    <p style="color: #6b7280; font-size: 12px;">Este es un mensaje automático, por favor no respondas a este correo.</p>
-  </body>
-</html>
-"""
+    return ContenidoEmail(*plantillas.INVITACION_ADMIN.render(
+        expira_horas=expira_horas,
+        accept_url=_url_frontend(f"/aceptar-invitacion-admin?token={token}"),
+    ))
+
+
+# ========== ENVÍO DIRECTO ==========
+# Envían en el momento (bloqueante). Los flujos de la API usan el outbox
+# (`app.services.email_outbox`) para no depender del SMTP dentro de la request.
+
+def enviar_bienvenida_medico(email: str, nombre: str, hospital_nombre: str, password_temporal: str) -> None:
+    enviar_email(email, *contenido_bienvenida_medico(email, nombre, hospital_nombre, password_temporal))
+
+
+def enviar_recuperacion_password(email: str, nombre: str, token: str, expira_minutos: int) -> None:
+    enviar_email(email, *contenido_recuperacion_password(email, nombre, token, expira_minutos))
+
 
-    enviar_email(email, asunto, cuerpo_texto, cuerpo_html)
+def enviar_invitacion_admin(email: str, token: str, expira_horas: int) -> None:
+    enviar_email(email, *contenido_invitacion_admin(email, token, expira_horas))
@@ -0,0 +1,183 @@
+"""
+Plantillas de los correos del sistema.
+
+Cada plantilla (asunto, texto plano y HTML con marcadores `${campo}` al estilo
+`string.Template`) se compila UNA vez al importar el módulo: el texto se parte en
+segmentos literales y posiciones de campos, así renderizar para cada
+destinatario es sólo unir strings, sin volver a parsear la plantilla. En la
+versión HTML los valores se escapan con `html.escape`.
+"""
+
+import html
+from string import Template
+from typing import Dict, List, Optional, Tuple
+
+
+class PlantillaCompilada:
+    """Plantilla `${campo}` pre-parseada en segmentos literales y campos."""
+
+    def __init__(self, fuente: str, escapar_html: bool = False):
+        self.fuente = fuente
+        self._escapar = escapar_html
+        self._segmentos: List[str] = []
+        self._campos: List[Tuple[int, str]] = []  # (índice del segmento, nombre del campo)
+        self._compilar()
+
+    def _compilar(self) -> None:
+        ultimo = 0
+        for m in Template.pattern.finditer(self.fuente):
+            self._segmentos.append(self.fuente[ultimo:m.start()])
+            if m.group("escaped") is not None:
+                self._segmentos.append("$")
+            else:
+                campo = m.group("named") or m.group("braced")
+                if campo is None:
+                    raise ValueError(f"Marcador inválido en la plantilla: {m.group(0)!r}")
+                self._campos.append((len(self._segmentos), campo))
+                self._segmentos.append("")
+            ultimo = m.end()
+        self._segmentos.append(self.fuente[ultimo:])
+
+    @property
+    def campos(self) -> List[str]:
+        return [campo for _, campo in self._campos]
+
+    def render(self, valores: Dict[str, object]) -> str:
+        partes = self._segmentos.copy()
+        for i, campo in self._campos:
+            valor = str(valores[campo])
+            partes[i] = html.escape(valor) if self._escapar else valor
+        return "".join(partes)
+
+
+class PlantillaEmail:
+    def __init__(self, asunto: str, texto: str, html_fuente: Optional[str] = None):
+        self.asunto = PlantillaCompilada(asunto)
+        self.texto = PlantillaCompilada(texto)
+        self.html = PlantillaCompilada(html_fuente, escapar_html=True) if html_fuente else None
+
+    def render(self, **valores) -> Tuple[str, str, Optional[str]]:
+        """Devuelve (asunto, cuerpo_texto, cuerpo_html)."""
+        return (
+            self.asunto.render(valores),
+            self.texto.render(valores),
+            self.html.render(valores) if self.html else None,
+        )
+
+
+BIENVENIDA_MEDICO = PlantillaEmail(
+    asunto="Bienvenido a Salud en Mapa",
+    texto="""\
+Bienvenido a Salud en Mapa
+
+Hola ${nombre},
+
+Se ha creado una cuenta para usted.
+
+Hospital: ${hospital_nombre}
+Usuario: ${email}
+Contraseña temporal: ${password_temporal}
+
+Ingrese al sistema y cambie su contraseña: ${login_url}
+
+Este es un mensaje automático, por favor no responda a este correo.""",
+    html_fuente="""\
+<html>
+  <body style="font-family: Arial, sans-serif; color: #1f2937; line-height: 1.6;">
+    <h2 style="color: #7c3aed;">Bienvenido a Salud en Mapa</h2>
+    <p>Hola <strong>${nombre}</strong>,</p>
+    <p>Se ha creado una cuenta para usted.</p>
+    <table style="border-collapse: collapse;">
+      <tr><td style="padding: 4px 12px 4px 0;"><strong>Hospital:</strong></td><td>${hospital_nombre}</td></tr>
+      <tr><td style="padding: 4px 12px 4px 0;"><strong>Usuario:</strong></td><td>${email}</td></tr>
+      <tr><td style="padding: 4px 12px 4px 0;"><strong>Contraseña temporal:</strong></td>
+          <td><code style="font-size: 16px;">${password_temporal}</code></td></tr>
+    </table>
+    <p style="margin-top: 16px;">
+      <a href="${login_url}"
+         style="background: #7c3aed; color: #fff; padding: 10px 18px; border-radius: 8px;
+                text-decoration: none;">Ingresar al sistema</a>
+    </p>
+    <p>Por seguridad, <strong>cambie su contraseña</strong> en el primer inicio de sesión.</p>
+    <p style="color: #6b7280; font-size: 12px;">Este es un mensaje automático, por favor no responda a este correo.</p>
+  </body>
+</html>
+""",
+)
+
+RECUPERACION_PASSWORD = PlantillaEmail(
+    asunto="Recuperación de contraseña - Salud en Mapa",
+    texto="""\
+Recuperación de contraseña
+
+Hola ${nombre},
+
+Recibimos una solicitud para restablecer tu contraseña.
+
+Código de recuperación: ${token}
+
+Ingresá este código en la app para definir una nueva contraseña, o abrí este enlace: ${reset_url}
+
+El código vence en ${expira_minutos} minutos y solo puede usarse una vez.
+
+Si no solicitaste este cambio, podés ignorar este mensaje.
+
+Este es un mensaje automático, por favor no respondas a este correo.""",
+    html_fuente="""\
+<html>
+  <body style="font-family: Arial, sans-serif; color: #1f2937; line-height: 1.6;">
+    <h2 style="color: #2571b6;">Recuperación de contraseña</h2>
+    <p>Hola <strong>${nombre}</strong>,</p>
+    <p>Recibimos una solicitud para restablecer tu contraseña.</p>
+    <p>Código de recuperación:</p>
+    <p style="font-size: 18px; background: #f3f4f6; padding: 10px 14px; border-radius: 8px;
+              display: inline-block;"><code>${token}</code></p>
+    <p>Ingresá este código en la app para definir una nueva contraseña, o usá el botón:</p>
+    <p style="margin-top: 12px;">
+      <a href="${reset_url}"
+         style="background: #2571b6; color: #fff; padding: 10px 18px; border-radius: 8px;
+                text-decoration: none;">Restablecer contraseña</a>
+    </p>
+    <p style="color: #6b7280;">El código vence en ${expira_minutos} minutos y solo puede usarse una vez.
+       Si no solicitaste este cambio, podés ignorar este mensaje.</p>
+    <p style="color: #6b7280; font-size: 12px;">Este es un mensaje automático, por favor no respondas a este correo.</p>
+  </body>
+</html>
+""",
+)
+
+INVITACION_ADMIN = PlantillaEmail(
+    asunto="Invitación para administrar Salud en Mapa",
+    texto="""\
+Invitación a Salud en Mapa
+
+Hola,
+
+Has sido invitado a formar parte de Salud en Mapa como Administrador.
+
+Completá tu registro utilizando el siguiente enlace: ${accept_url}
+
+El enlace vence en ${expira_horas} horas y solo puede usarse una vez.
+
+Si no esperabas esta invitación, podés ignorar este mensaje.
+
+Este es un mensaje automático, por favor no respondas a este correo.""",
+    html_fuente="""\
+<html>
+  <body style="font-family: Arial, sans-serif; color: #1f2937; line-height: 1.6;">
+    <h2 style="color: #2571b6;">Invitación a Salud en Mapa</h2>
+    <p>Hola,</p>
+    <p>Has sido invitado a formar parte de <strong>Salud en Mapa</strong> como Administrador.</p>
+    <p>Completá tu registro y creá tu contraseña con el siguiente botón:</p>
+    <p style="margin-top: 12px;">
+      <a href="${accept_url}"
+         style="background: #2571b6; color: #fff; padding: 10px 18px; border-radius: 8px;
+                text-decoration: none;">Completar registro</a>
+    </p>
+    <p style="color: #6b7280;">El enlace vence en ${expira_horas} horas y solo puede usarse una vez.
+       Si no esperabas esta invitación, podés ignorar este mensaje.</p>
+    <p style="color: #6b7280; font-size: 12px;">Este es un mensaje automático, por favor no respondas a este correo.</p>
+  </body>
+</html>
+""",
+)
@@ -0,0 +1,364 @@
+"""
+Resumen materializado de estadísticas por hospital (tabla `estadisticas_hospitales`).
+
+Los conteos (pacientes, asignados, médicos por especialidad, formularios
+pendientes, mensajes no leídos) se agregan con unas pocas consultas agrupadas
+por hospital y se guardan con un UPSERT; la vista de administración sólo lee la
+tabla. Se usa una tabla común (no una vista materializada de PostgreSQL) para
+que el mismo código funcione en SQLite.
+
+Cómo se mantiene al día:
+
+- Incremental: un listener `after_flush` de la sesión anota qué hospitales (o
+  pacientes/médicos, que se traducen a hospitales después) tocó cada
+  transacción; al hacer commit pasan a una lista de pendientes que
+  `worker_incremental` recalcula cada `ESTADISTICAS_INCREMENTAL_SECONDS`.
+  Los UPDATE masivos (`query.update()`) no pasan por el flush: quien los hace
+  llama a `marcar_paciente` / `marcar_hospital`.
+- Completo: `worker_completo` recalcula todos los hospitales cada
+  `ESTADISTICAS_REFRESH_SECONDS` (y al arrancar), lo que cubre cambios hechos
+  desde otro proceso o fuera de la API.
+- En PostgreSQL ambos refrescos toman el advisory lock `CLAVE_LOCK` (ver
+  `app.core.tareas.liderazgo`): una sola réplica recalcula a la vez y las demás
+  saltean esa pasada. También a mano:
+      python -m app.services.estadisticas_hospitales
+"""
+
+import logging
+import threading
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import and_, delete, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tareas import TareaPeriodica, liderazgo
+from app.db.db import get_sessionmaker
+from app.models.models import (
+    Asignacion,
+    Especialidad,
+    EstadisticaHospital,
+    FormularioAsignacion,
+    Hospital,
+    Medico,
+    Mensaje,
+    Paciente,
+    medico_especialidad,
+    medico_hospital,
+)
+
+logger = logging.getLogger(__name__)
+
+_CLAVE_SESION = "estadisticas_hospitales_pendientes"
+# Clave del advisory lock de PostgreSQL (la comparten el refresco incremental y
+# el completo: escriben las mismas filas)
+CLAVE_LOCK = 48_020_291
+_COLUMNAS = [c.name for c in EstadisticaHospital.__table__.columns if c.name != "hospital_id"]
+
+
+# ========== CÁLCULO ==========
+
+def _calcular(db: Session, hospital_ids: Optional[Set[int]]) -> List[dict]:
+    """Filas de `estadisticas_hospitales` para esos hospitales (None = todos)."""
+    def solo(columna):
+        return [columna.in_(hospital_ids)] if hospital_ids is not None else []
+
+    ahora = datetime.utcnow()
+    filas: Dict[int, dict] = {
+        hospital_id: {
+            "hospital_id": hospital_id,
+            "total_pacientes": 0,
+            "pacientes_asignados": 0,
+            "pacientes_sin_medico": 0,
+            "total_medicos": 0,
+            "medicos_por_especialidad": {},
+            "formularios_pendientes": 0,
+            "mensajes_no_leidos": 0,
+            "actualizado_at": ahora,
+        }
+        for hospital_id in db.scalars(select(Hospital.id).where(*solo(Hospital.id)))
+    }
+    if not filas:
+        return []
+
+    pacientes = db.execute(
+        select(Paciente.hospital_id, func.count(Paciente.id), func.count(Asignacion.id))
+        .outerjoin(Asignacion, and_(Asignacion.paciente_id == Paciente.id, Asignacion.activo.is_(True)))
+        .where(Paciente.hospital_id.isnot(None), *solo(Paciente.hospital_id))
+        .group_by(Paciente.hospital_id)
+    )
+    for hospital_id, total, asignados in pacientes:
+        if hospital_id in filas:
+            filas[hospital_id].update(
+                total_pacientes=total, pacientes_asignados=asignados, pacientes_sin_medico=total - asignados
+            )
+
+    medicos = db.execute(
+        select(medico_hospital.c.hospital_id, func.count())
+        .where(*solo(medico_hospital.c.hospital_id))
+        .group_by(medico_hospital.c.hospital_id)
+    )
+    for hospital_id, total in medicos:
+        if hospital_id in filas:
+            filas[hospital_id]["total_medicos"] = total
+
+    especialidades = db.execute(
+        select(medico_hospital.c.hospital_id, Especialidad.nombre, func.count())
+        .join(medico_especialidad, medico_especialidad.c.medico_id == medico_hospital.c.medico_id)
+        .join(Especialidad, Especialidad.id == medico_especialidad.c.especialidad_id)
+        .where(*solo(medico_hospital.c.hospital_id))
+        .group_by(medico_hospital.c.hospital_id, Especialidad.nombre)
+    )
+    for hospital_id, especialidad, total in especialidades:
+        if hospital_id in filas:
+            filas[hospital_id]["medicos_por_especialidad"][especialidad] = total
+
+    formularios = db.execute(
+        select(Paciente.hospital_id, func.count(FormularioAsignacion.id))
+        .join(Paciente, Paciente.id == FormularioAsignacion.paciente_id)
+        .where(FormularioAsignacion.estado == "pendiente", *solo(Paciente.hospital_id))
+        .group_by(Paciente.hospital_id)
+    )
+    for hospital_id, total in formularios:
+        if hospital_id in filas:
+            filas[hospital_id]["formularios_pendientes"] = total
+
+    mensajes = db.execute(
+        select(Paciente.hospital_id, func.count(Mensaje.id))
+        .join(Paciente, Paciente.id == Mensaje.paciente_id)
+        .where(Mensaje.leido == 0, *solo(Paciente.hospital_id))
+        .group_by(Paciente.hospital_id)
+    )
+    for hospital_id, total in mensajes:
+        if hospital_id in filas:
+            filas[hospital_id]["mensajes_no_leidos"] = total
+
+    return list(filas.values())
+
+
+def _guardar(db: Session, filas: List[dict]) -> None:
+    """UPSERT por hospital_id (seguro aunque dos procesos recalculen a la vez)."""
+    dialecto = db.get_bind().dialect.name
+    if dialecto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialecto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        db.execute(delete(EstadisticaHospital).where(
+            EstadisticaHospital.hospital_id.in_([f["hospital_id"] for f in filas])
+        ))
+        db.execute(EstadisticaHospital.__table__.insert(), filas)
+        return
+
+    sentencia = insert(EstadisticaHospital.__table__)
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=["hospital_id"],
+        set_={columna: sentencia.excluded[columna] for columna in _COLUMNAS},
+    )
+    db.execute(sentencia, filas)
+
+
+def recalcular(db: Session, hospital_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recalcula y guarda (con commit) las estadísticas de esos hospitales, o de
+    todos si `hospital_ids` es None. Devuelve cuántos hospitales actualizó.
+    """
+    ids = None if hospital_ids is None else {h for h in hospital_ids if h}
+    if ids is not None and not ids:
+        return 0
+
+    filas = _calcular(db, ids)
+    if filas:
+        _guardar(db, filas)
+    if ids is None:
+        # Hospitales borrados (en SQLite el ON DELETE CASCADE no siempre aplica)
+        db.execute(delete(EstadisticaHospital).where(EstadisticaHospital.hospital_id.notin_(select(Hospital.id))))
+    db.commit()
+    return len(filas)
+
+
+# ========== SEGUIMIENTO DE CAMBIOS ==========
+
+_lock = threading.Lock()
+_pendientes = {"hospitales": set(), "pacientes": set(), "medicos": set()}
+
+
+def _pendientes_de(db: Session) -> Dict[str, Set[int]]:
+    return db.info.setdefault(_CLAVE_SESION, {"hospitales": set(), "pacientes": set(), "medicos": set()})
+
+
+def marcar_hospital(db: Session, *hospital_ids: Optional[int]) -> None:
+    """Marca hospitales para recalcular cuando la transacción de `db` haga commit."""
+    _pendientes_de(db)["hospitales"].update(h for h in hospital_ids if h)
+
+
+def marcar_paciente(db: Session, *paciente_ids: Optional[int]) -> None:
+    """Marca el hospital de esos pacientes para recalcular al hacer commit."""
+    _pendientes_de(db)["pacientes"].update(p for p in paciente_ids if p)
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_cambios(db: Session, contexto) -> None:
+    # En after_flush, new/dirty/deleted y el historial de atributos todavía
+    # reflejan lo que se acaba de escribir.
+    pendientes = None
+    for obj in chain(db.new, db.dirty, db.deleted):
+        if isinstance(obj, Paciente):
+            historial = inspect(obj).attrs.hospital_id.history
+            ids = [h for h in chain(historial.added, historial.unchanged, historial.deleted) if h]
+            destino, valores = "hospitales", ids
+        elif isinstance(obj, (Asignacion, FormularioAsignacion, Mensaje)):
+            destino, valores = "pacientes", [obj.paciente_id] if obj.paciente_id else []
+        elif isinstance(obj, Medico):
+            estado = inspect(obj)
+            historial = estado.attrs.hospitales.history
+            valores = [h.id for h in chain(historial.added, historial.deleted) if h.id]
+            if valores:
+                pendientes = pendientes or _pendientes_de(db)
+                pendientes["hospitales"].update(valores)
+            # Cambios de especialidades: afectan a los hospitales actuales del médico
+            destino = "medicos"
+            valores = [obj.id] if obj.id and estado.attrs.especialidades.history.has_changes() else []
+        elif isinstance(obj, Hospital):
+            destino, valores = "hospitales", [obj.id] if obj.id else []
+        else:
+            continue
+        if valores:
+            pendientes = pendientes or _pendientes_de(db)
+            pendientes[destino].update(valores)
+
+
+@event.listens_for(Session, "after_commit")
+def _confirmar_cambios(db: Session) -> None:
+    pendientes = db.info.pop(_CLAVE_SESION, None)
+    if not pendientes:
+        return
+    with _lock:
+        for tipo, ids in pendientes.items():
+            _pendientes[tipo].update(ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_cambios(db: Session) -> None:
+    db.info.pop(_CLAVE_SESION, None)
+
+
+def actualizar_pendientes() -> int:
+    """
+    Recalcula los hospitales con cambios confirmados desde la última vez, si
+    esta réplica es la líder (si no, los cambios quedan para la próxima pasada).
+    """
+    with liderazgo(CLAVE_LOCK) as lider:
+        if not lider:
+            logger.debug("Estadísticas por hospital: otra réplica tiene el lock.")
+            return 0
+        return _actualizar_pendientes()
+
+
+def _actualizar_pendientes() -> int:
+    with _lock:
+        tomados = {tipo: set(ids) for tipo, ids in _pendientes.items()}
+        for ids in _pendientes.values():
+            ids.clear()
+    if not any(tomados.values()):
+        return 0
+
+    db = get_sessionmaker()()
+    try:
+        hospital_ids = set(tomados["hospitales"])
+        if tomados["pacientes"]:
+            hospital_ids.update(db.scalars(
+                select(Paciente.hospital_id).distinct()
+                .where(Paciente.id.in_(tomados["pacientes"]), Paciente.hospital_id.isnot(None))
+            ))
+        if tomados["medicos"]:
+            hospital_ids.update(db.scalars(
+                select(medico_hospital.c.hospital_id).distinct()
+                .where(medico_hospital.c.medico_id.in_(tomados["medicos"]))
+            ))
+        return recalcular(db, hospital_ids)
+    except Exception:
+        # Se reintenta en la próxima pasada
+        with _lock:
+            for tipo, ids in tomados.items():
+                _pendientes[tipo].update(ids)
+        raise
+    finally:
+        db.close()
+
+
+def recalcular_todo() -> int:
+    """Refresco completo de todos los hospitales, si esta réplica es la líder."""
+    with liderazgo(CLAVE_LOCK) as lider:
+        if not lider:
+            logger.debug("Estadísticas por hospital: otra réplica tiene el lock.")
+            return 0
+        db = get_sessionmaker()()
+        try:
+            total = recalcular(db)
+        finally:
+            db.close()
+    logger.info("Estadísticas de %d hospital(es) recalculadas.", total)
+    return total
+
+
+worker_incremental = TareaPeriodica(
+    "estadisticas-hospitales", actualizar_pendientes, settings.ESTADISTICAS_INCREMENTAL_SECONDS
+)
+worker_completo = TareaPeriodica(
+    "estadisticas-hospitales-completo", recalcular_todo, settings.ESTADISTICAS_REFRESH_SECONDS
+)
+
+
+# ========== CONSULTA ==========
+
+def _como_dict(estadistica: EstadisticaHospital, hospital_nombre: str) -> dict:
+    return {
+        "hospital_id": estadistica.hospital_id,
+        "hospital_nombre": hospital_nombre,
+        **{columna: getattr(estadistica, columna) for columna in _COLUMNAS},
+    }
+
+
+def listar(db: Session) -> List[dict]:
+    """Estadísticas materializadas de todos los hospitales, por nombre de hospital."""
+    filas = (
+        db.query(EstadisticaHospital, Hospital.nombre)
+        .join(Hospital, Hospital.id == EstadisticaHospital.hospital_id)
+        .order_by(Hospital.nombre, Hospital.id)
+        .all()
+    )
+    return [_como_dict(estadistica, nombre) for estadistica, nombre in filas]
+
+
+def obtener(db: Session, hospital_id: int) -> Optional[dict]:
+    """
+    Estadísticas materializadas de un hospital, o None si el hospital no existe.
+    Si todavía no tiene fila (recién creado) se calculan en el momento.
+    """
+    fila = (
+        db.query(EstadisticaHospital, Hospital.nombre)
+        .join(Hospital, Hospital.id == EstadisticaHospital.hospital_id)
+        .filter(EstadisticaHospital.hospital_id == hospital_id)
+        .first()
+    )
+    if fila is not None:
+        return _como_dict(*fila)
+    nombre = db.scalar(select(Hospital.nombre).where(Hospital.id == hospital_id))
+    if nombre is None:
+        return None
+    return {**_calcular(db, {hospital_id})[0], "hospital_nombre": nombre}
+
+
+def main() -> None:
+    import argparse
+
+    argparse.ArgumentParser(description="Recalcula las estadísticas materializadas de todos los hospitales.").parse_args()
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Hospitales actualizados: %d", recalcular_todo())
+
+
+if __name__ == "__main__":
+    main()
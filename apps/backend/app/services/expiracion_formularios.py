@@ -0,0 +1,108 @@
+"""
+Expiración de asignaciones de formularios vencidas.
+
+Las asignaciones `pendiente` con `fecha_expiracion` en el pasado pasan a
+`expirado`. Lo hace `worker_expiracion` cada `EXPIRACION_FORMULARIOS_SECONDS`
+(arrancado desde el `lifespan`), así los listados y los conteos de pendientes
+no tienen que compararse con la fecha en cada request. También a mano o desde
+un cron:
+    python -m app.services.expiracion_formularios
+
+- Por lotes de `EXPIRACION_FORMULARIOS_LOTE`: cada lote es un SELECT de IDs
+  sobre el índice `(estado, fecha_expiracion)` y un UPDATE por IDs, con su
+  propio commit (transacciones cortas, sin bloquear toda la tabla).
+- En PostgreSQL sólo una réplica trabaja a la vez: la que obtiene el advisory
+  lock `CLAVE_LOCK` (ver `app.core.tareas.liderazgo`); las demás saltean esa
+  pasada.
+- Como el UPDATE masivo no pasa por el flush, marca los pacientes afectados
+  para las estadísticas materializadas por hospital.
+"""
+
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tareas import TareaPeriodica, liderazgo
+from app.db.db import get_sessionmaker
+from app.models.models import FormularioAsignacion
+from app.services import estadisticas_hospitales
+
+logger = logging.getLogger(__name__)
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_EXPIRADO = "expirado"
+
+# Clave del advisory lock de PostgreSQL (cualquier bigint fijo y propio de esta tarea)
+CLAVE_LOCK = 48_020_292
+
+
+def expirar_vencidas(db: Session, ahora: Optional[datetime] = None, lote: Optional[int] = None) -> int:
+    """
+    Pasa a `expirado` las asignaciones pendientes vencidas en `ahora` (por
+    defecto, la hora actual UTC). Hace commit por lote y devuelve cuántas expiró.
+    """
+    ahora = ahora or datetime.utcnow()
+    lote = lote or settings.EXPIRACION_FORMULARIOS_LOTE
+    total = 0
+    while True:
+        filas = db.execute(
+            select(FormularioAsignacion.id, FormularioAsignacion.paciente_id)
+            .where(
+                FormularioAsignacion.estado == ESTADO_PENDIENTE,
+                FormularioAsignacion.fecha_expiracion < ahora,
+            )
+            .limit(lote)
+        ).all()
+        if not filas:
+            return total
+        ids = [fila.id for fila in filas]
+        # El estado se vuelve a comprobar: una respuesta pudo completarla entre
+        # el SELECT y el UPDATE
+        resultado = db.execute(
+            update(FormularioAsignacion)
+            .where(FormularioAsignacion.id.in_(ids), FormularioAsignacion.estado == ESTADO_PENDIENTE)
+            .values(estado=ESTADO_EXPIRADO)
+            .execution_options(synchronize_session=False)
+        )
+        estadisticas_hospitales.marcar_paciente(db, *{fila.paciente_id for fila in filas})
+        db.commit()
+        total += resultado.rowcount
+        if len(filas) < lote:
+            return total
+
+
+def expirar_pendientes() -> int:
+    """Una pasada completa, si esta réplica es la líder."""
+    with liderazgo(CLAVE_LOCK) as lider:
+        if not lider:
+            logger.debug("Expiración de formularios: otra réplica tiene el lock.")
+            return 0
+        db = get_sessionmaker()()
+        try:
+            total = expirar_vencidas(db)
+        finally:
+            db.close()
+    if total:
+        logger.info("%d asignación(es) de formularios expirada(s).", total)
+    return total
+
+
+worker_expiracion = TareaPeriodica(
+    "expiracion-formularios", expirar_pendientes, settings.EXPIRACION_FORMULARIOS_SECONDS
+)
+
+
+def main() -> None:
+    import argparse
+
+    argparse.ArgumentParser(description="Expira las asignaciones de formularios vencidas.").parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(f"Asignaciones expiradas: {expirar_pendientes()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ from sqlalchemy.orm import Session
 
 from app.core.security import get_password_hash
 from app.models.models import Medico, Paciente, Especialidad, Hospital, RolEnum
+from app.services import catalogos
 
 
 class MedicoValidationError(ValueError):
@@ -41,35 +42,30 @@ def documento_en_uso(db: Session, documento: str) -> bool:
 
 def resolver_especialidades_por_id(db: Session, especialidad_ids: List[int]) -> List[Especialidad]:
     """Resuelve especialidades por ID (solo activas). Lanza MedicoValidationError si alguna no existe."""
-    especialidades: List[Especialidad] = []
-    for esp_id in especialidad_ids or []:
-        esp = db.query(Especialidad).filter(
-            Especialidad.id == esp_id,
-            Especialidad.activa == 1,
-        ).first()
-        if not esp:
-            raise MedicoValidationError(f"Especialidad con ID {esp_id} no encontrada o inactiva")
-        especialidades.append(esp)
+    especialidades, esp_id = catalogos.resolver(db, Especialidad, especialidad_ids, solo_activas=True)
+    if esp_id is not None:
+        raise MedicoValidationError(f"Especialidad con ID {esp_id} no encontrada o inactiva")
     return especialidades
 
 
 def buscar_especialidades_por_nombre(db: Session, nombres: List[str]) -> List[Especialidad]:
     """
-    Resuelve especialidades por nombre (solo activas). Coincidencia case-insensitive.
-    Lanza MedicoValidationError con el nombre concreto si alguna no existe.
+    Resuelve especialidades por nombre (solo activas), sin distinguir mayúsculas
+    ni acentos, usando el catálogo en memoria. Lanza MedicoValidationError con
+    el nombre concreto si alguna no existe.
     """
-    especialidades: List[Especialidad] = []
+    ids: List[int] = []
     for nombre in nombres or []:
         nombre_limpio = (nombre or "").strip()
         if not nombre_limpio:
             continue
-        esp = db.query(Especialidad).filter(
-            Especialidad.nombre.ilike(nombre_limpio),
-            Especialidad.activa == 1,
-        ).first()
-        if not esp:
+        esp = catalogos.especialidad_por_nombre(db, nombre_limpio)
+        if not esp or esp["activa"] != 1:
             raise MedicoValidationError(f"Especialidad no encontrada: '{nombre_limpio}'")
-        especialidades.append(esp)
+        ids.append(esp["id"])
+    especialidades, esp_id = catalogos.resolver(db, Especialidad, ids, solo_activas=True)
+    if esp_id is not None:
+        raise MedicoValidationError(f"Especialidad con ID {esp_id} no encontrada o inactiva")
     return especialidades
 
 
@@ -0,0 +1,199 @@
+"""
+Asignaciones recurrentes de formularios (seguimiento crónico).
+
+Una `FormularioProgramacion` define, para un formulario y un paciente, cada
+cuántos días se repite la asignación, cuántas veces y cuántos días tiene el
+paciente para responder cada una. `worker_programaciones` (cada
+`PROGRAMACIONES_SECONDS`, arrancado desde el `lifespan`) materializa las
+ocurrencias que vencieron como filas de `formulario_asignaciones`. También a
+mano o desde un cron:
+    python -m app.services.programacion_formularios
+
+La materialización es por conjuntos, en lotes de `PROGRAMACIONES_LOTE`
+programaciones y una transacción por lote:
+
+- Un `INSERT ... SELECT` crea la siguiente ocurrencia de cada programación del
+  lote. `numero_instancia` se calcula en SQL: el máximo actual del par
+  formulario/paciente más un `ROW_NUMBER()` (por si un paciente tiene dos
+  programaciones del mismo formulario en el lote), sin un COUNT por fila.
+- Un `UPDATE` avanza `proxima_fecha` un intervalo, suma `generadas` y desactiva
+  las programaciones que completaron sus repeticiones.
+
+Si el worker estuvo detenido, las ocurrencias atrasadas se generan en pasadas
+sucesivas, cada una con su fecha; las que ya vencieron las expira
+`app.services.expiracion_formularios`. En PostgreSQL sólo una réplica
+materializa a la vez (`app.core.tareas.liderazgo`).
+"""
+
+import logging
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import DateTime, func, insert, literal, select, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.core.config import settings
+from app.core.tareas import TareaPeriodica, liderazgo
+from app.db.db import get_sessionmaker
+from app.models.models import FormularioAsignacion, FormularioProgramacion
+from app.services import estadisticas_hospitales
+
+logger = logging.getLogger(__name__)
+
+# Clave del advisory lock de PostgreSQL (distinta de la de expiración)
+CLAVE_LOCK = 48_020_293
+
+
+class sumar_dias(FunctionElement):
+    """`fecha + dias` días en SQL (NULL si `dias` es NULL), para cada dialecto."""
+    type = DateTime()
+    name = "sumar_dias"
+    inherit_cache = True
+
+
+@compiles(sumar_dias)
+def _sumar_dias(elemento, compilador, **kw):
+    fecha, dias = (compilador.process(c, **kw) for c in elemento.clauses)
+    return f"({fecha} + {dias} * INTERVAL '1 day')"
+
+
+@compiles(sumar_dias, "sqlite")
+def _sumar_dias_sqlite(elemento, compilador, **kw):
+    fecha, dias = (compilador.process(c, **kw) for c in elemento.clauses)
+    # Mismo formato de texto que usa SQLAlchemy para DateTime en SQLite
+    return f"strftime('%Y-%m-%d %H:%M:%f000', {fecha}, '+' || {dias} || ' days')"
+
+
+# ========== ALTA ==========
+
+def crear_programaciones(
+    db: Session,
+    *,
+    formulario_id: int,
+    paciente_ids: Sequence[int],
+    creado_por: int,
+    intervalo_dias: int,
+    repeticiones: int,
+    fecha_inicio: Optional[datetime] = None,
+    vigencia_dias: Optional[int] = None,
+) -> List[FormularioProgramacion]:
+    """
+    Una programación por paciente (sin repetidos). NO hace commit. La primera
+    ocurrencia es `fecha_inicio` (por defecto, ahora).
+    """
+    inicio = fecha_inicio or datetime.utcnow()
+    programaciones = [
+        FormularioProgramacion(
+            formulario_id=formulario_id,
+            paciente_id=paciente_id,
+            creado_por=creado_por,
+            fecha_inicio=inicio,
+            intervalo_dias=intervalo_dias,
+            repeticiones=repeticiones,
+            vigencia_dias=vigencia_dias,
+            generadas=0,
+            proxima_fecha=inicio,
+            activa=True,
+        )
+        for paciente_id in dict.fromkeys(paciente_ids)
+    ]
+    db.add_all(programaciones)
+    return programaciones
+
+
+# ========== MATERIALIZACIÓN ==========
+
+def materializar(db: Session, ahora: Optional[datetime] = None, lote: Optional[int] = None) -> int:
+    """
+    Genera las asignaciones de todas las ocurrencias vencidas en `ahora`. Hace
+    commit por lote y devuelve cuántas asignaciones creó.
+    """
+    ahora = ahora or datetime.utcnow()
+    lote = lote or settings.PROGRAMACIONES_LOTE
+    P, A = FormularioProgramacion, FormularioAsignacion
+    total = 0
+    while True:
+        filas = db.execute(
+            select(P.id, P.paciente_id)
+            .where(P.activa.is_(True), P.proxima_fecha <= ahora)
+            .order_by(P.proxima_fecha, P.id)
+            .limit(lote)
+        ).all()
+        if not filas:
+            return total
+        ids = [fila.id for fila in filas]
+
+        instancia_actual = (
+            select(func.coalesce(func.max(A.numero_instancia), 0))
+            .where(A.formulario_id == P.formulario_id, A.paciente_id == P.paciente_id)
+            .correlate(P)
+            .scalar_subquery()
+        )
+        orden = func.row_number().over(partition_by=(P.formulario_id, P.paciente_id), order_by=P.id)
+        ocurrencias = select(
+            P.formulario_id,
+            P.paciente_id,
+            P.creado_por,
+            P.proxima_fecha,
+            sumar_dias(P.proxima_fecha, P.vigencia_dias),
+            instancia_actual + orden,
+            literal("pendiente"),
+            literal({}, type_=A.datos_extra.type),
+            P.id,
+        ).where(P.id.in_(ids))
+        resultado = db.execute(insert(A).from_select(
+            [
+                A.formulario_id, A.paciente_id, A.asignado_por, A.fecha_asignacion, A.fecha_expiracion,
+                A.numero_instancia, A.estado, A.datos_extra, A.programacion_id,
+            ],
+            ocurrencias,
+        ))
+        db.execute(
+            update(P)
+            .where(P.id.in_(ids))
+            .values(
+                generadas=P.generadas + 1,
+                proxima_fecha=sumar_dias(P.proxima_fecha, P.intervalo_dias),
+                activa=P.generadas + 1 < P.repeticiones,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        # El INSERT masivo no pasa por el flush
+        estadisticas_hospitales.marcar_paciente(db, *{fila.paciente_id for fila in filas})
+        db.commit()
+        total += resultado.rowcount
+
+
+def materializar_pendientes() -> int:
+    """Una pasada completa, si esta réplica es la líder."""
+    with liderazgo(CLAVE_LOCK) as lider:
+        if not lider:
+            logger.debug("Programaciones de formularios: otra réplica tiene el lock.")
+            return 0
+        db = get_sessionmaker()()
+        try:
+            total = materializar(db)
+        finally:
+            db.close()
+    if total:
+        logger.info("%d asignación(es) de formularios programadas generada(s).", total)
+    return total
+
+
+worker_programaciones = TareaPeriodica(
+    "programaciones-formularios", materializar_pendientes, settings.PROGRAMACIONES_SECONDS
+)
+
+
+def main() -> None:
+    import argparse
+
+    argparse.ArgumentParser(description="Genera las asignaciones de formularios programadas que vencieron.").parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(f"Asignaciones generadas: {materializar_pendientes()}")
+
+
+if __name__ == "__main__":
+    main()
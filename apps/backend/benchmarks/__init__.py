@@ -0,0 +1,27 @@
+"""
+Benchmarks del backend.
+
+Se ejecutan como módulos desde apps/backend:
+
+- `benchmarks.datos`: genera datos sintéticos reproducibles (semilla + escala)
+  sobre SQLite o PostgreSQL.
+- `benchmarks.escenarios`: mide login, bandeja de mensajes, historial de chat,
+  listado de respuestas y hospitales cercanos; produce un JSON comparable
+  entre commits.
+- `benchmarks.carga_websocket`: prueba de carga del chat por WebSocket contra
+  un uvicorn en ejecución (conexiones simultáneas, latencia de entrega).
+- `benchmarks.bench_email_templates`: micro-benchmark del armado de correos.
+- `benchmarks.bench_auth_jwt`: micro-benchmark de la verificación de tokens JWT
+  por request (con y sin caché de claims).
+- `benchmarks.bench_serializacion`: serialización de listados grandes
+  (`response_model` + json/orjson contra `json_directo`).
+- `benchmarks.bench_compresion`: bytes transferidos con y sin gzip/Brotli en
+  endpoints representativos (sobre una base de `benchmarks.datos`).
+- `benchmarks.perfil_arranque`: tiempo de importación por módulo de `app.main`,
+  tamaño de la tabla de rutas y rutas duplicadas.
+
+Ejemplo:
+
+    python -m benchmarks.datos --db sqlite:///bench.db --escala chica --semilla 42
+    python -m benchmarks.escenarios --db sqlite:///bench.db -n 200 --salida resultados.json
+"""
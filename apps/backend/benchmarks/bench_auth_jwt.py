@@ -0,0 +1,70 @@
+"""
+Micro-benchmark de la autenticación por request: 10k verificaciones de token.
+
+Compara `jwt.decode` directo (lo que hacía cada request) contra
+`decodificar_token` con el mismo token repetido (ráfaga de un cliente: acierto
+en la caché) y con un token distinto por request (peor caso: falla en la caché,
+se verifica y se guarda). También mide la dependencia `get_current_user`
+completa.
+
+Uso (desde apps/backend):
+    python -m benchmarks.bench_auth_jwt [-n 10000]
+"""
+
+import argparse
+import json
+import time
+from datetime import timedelta
+
+from jose import jwt
+
+from app.core import deps, security
+
+
+def _medir(nombre: str, n: int, funcion) -> dict:
+    inicio = time.perf_counter()
+    for i in range(n):
+        funcion(i)
+    total = time.perf_counter() - inicio
+    return {"caso": nombre, "n": n, "total_ms": round(total * 1000, 2), "us_por_request": round(total / n * 1e6, 2)}
+
+
+def _token(i: int) -> str:
+    return security.create_access_token(
+        {"sub": str(i), "rol": "paciente", "email": f"paciente{i}@bench.local", "nombre": f"Paciente {i}"},
+        expires_delta=timedelta(hours=1),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, default=10_000)
+    args = parser.parse_args()
+
+    token = _token(1)
+    distintos = [_token(i) for i in range(args.n)]
+
+    def jwt_decode(i: int) -> None:
+        jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
+
+    def cache_acierto(i: int) -> None:
+        security.decodificar_token(token)
+
+    def cache_falla(i: int) -> None:
+        security.decodificar_token(distintos[i])
+
+    def dependencia(i: int) -> None:
+        deps.get_current_user(token)
+
+    security._cache_tokens.limpiar()
+    resultados = [
+        _medir("jwt.decode por request", args.n, jwt_decode),
+        _medir("decodificar_token, mismo token (acierto)", args.n, cache_acierto),
+        _medir("decodificar_token, token distinto (falla)", args.n, cache_falla),
+        _medir("deps.get_current_user, mismo token", args.n, dependencia),
+    ]
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
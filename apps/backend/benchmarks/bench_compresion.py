@@ -0,0 +1,89 @@
+"""
+Bytes transferidos con y sin compresión en endpoints representativos.
+
+Pide cada endpoint a la API completa (in-process, vía TestClient) con
+`Accept-Encoding: identity`, `gzip` y `br` (si el paquete `brotli` está
+instalado) y reporta los bytes del cuerpo tal como viajan, el porcentaje de
+ahorro y la latencia media de cada variante.
+
+Uso (desde apps/backend, con una base ya generada por `benchmarks.datos`):
+    python -m benchmarks.bench_compresion --db sqlite:///bench.db [-n 20]
+"""
+
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.comun import commit_actual, crear_engine
+from benchmarks.escenarios import Contexto, preparar
+
+
+def _endpoints(ctx: Contexto) -> List[Tuple[str, str, Dict[str, str]]]:
+    medico = ctx.medicos[0][2]
+    paciente = ctx.pacientes[0][2]
+    return [
+        ("formularios_asignados", "/formularios/mis-asignaciones?estado=todos", paciente),
+        ("formularios_medico", "/formularios/", medico),
+        ("listado_respuestas", "/formularios/respuestas?limit=50", medico),
+        ("catalogo_hospitales", "/hospitales/", {}),
+        ("hospitales_cercanos", "/hospitales/mis-cercanos", paciente),
+        ("catalogo_especialidades", "/especialidades/", {}),
+    ]
+
+
+def _medir(cliente, url: str, headers: Dict[str, str], codificacion: str, n: int) -> Dict:
+    headers = {**headers, "Accept-Encoding": codificacion}
+    tamanos, latencias = [], []
+    for _ in range(n):
+        inicio = time.perf_counter()
+        with cliente.stream("GET", url, headers=headers) as respuesta:
+            crudo = b"".join(respuesta.iter_raw())
+        latencias.append(time.perf_counter() - inicio)
+        tamanos.append(len(crudo))
+    return {
+        "codificacion": respuesta.headers.get("content-encoding", "identity"),
+        "status": respuesta.status_code,
+        "bytes": tamanos[-1],
+        "latencia_media_ms": round(statistics.mean(latencias) * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bytes en el cable con y sin compresión.")
+    parser.add_argument("--db", required=True, help="URL de la base generada con benchmarks.datos")
+    parser.add_argument("-n", type=int, default=20, help="Requests por endpoint y codificación")
+    args = parser.parse_args()
+
+    engine = crear_engine(args.db)
+    from fastapi.testclient import TestClient
+    from app.core import compresion
+    from app.main import app
+
+    cliente = TestClient(app)
+    ctx = preparar(cliente, engine)
+    if not ctx.medicos or not ctx.pacientes:
+        raise SystemExit("La base no tiene datos de benchmark: ejecutar primero `python -m benchmarks.datos`.")
+
+    codificaciones = ["identity", "gzip"] + (["br"] if compresion.brotli is not None else [])
+    resultados = []
+    for nombre, url, headers in _endpoints(ctx):
+        variantes = [_medir(cliente, url, headers, c, args.n) for c in codificaciones]
+        original = variantes[0]["bytes"]
+        for variante in variantes:
+            variante["ahorro_pct"] = round(100 * (1 - variante["bytes"] / original), 1) if original else 0.0
+        resultados.append({"endpoint": nombre, "url": url, "variantes": variantes})
+
+    informe = {
+        "commit": commit_actual(),
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "minimo_bytes": compresion.settings.COMPRESION_MIN_BYTES,
+        "resultados": resultados,
+    }
+    print(json.dumps(informe, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Micro-benchmark del armado de correos: 10k renders de la plantilla de bienvenida.
+
+Compara la plantilla precompilada (app/services/email_templates.py) contra
+`string.Template.substitute` (parsea la plantilla en cada llamada) y mide el
+armado del mensaje MIME completo.
+
+Uso (desde apps/backend):
+    python -m benchmarks.bench_email_templates [-n 10000]
+"""
+
+import argparse
+import html
+import json
+import time
+from string import Template
+
+from app.services import email_service
+from app.services.email_templates import BIENVENIDA_MEDICO
+
+
+def _valores(i: int) -> dict:
+    return {
+        "email": f"medico{i}@example.com",
+        "nombre": f"Médico {i}",
+        "hospital_nombre": "Hospital de Clínicas",
+        "password_temporal": f"Tmp-{i:06d}",
+        "login_url": "https://www.saludenmapa.com/login",
+    }
+
+
+def _medir(nombre: str, n: int, funcion) -> dict:
+    inicio = time.perf_counter()
+    for i in range(n):
+        funcion(i)
+    total = time.perf_counter() - inicio
+    return {"caso": nombre, "n": n, "total_ms": round(total * 1000, 2), "us_por_render": round(total / n * 1e6, 2)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, default=10_000)
+    args = parser.parse_args()
+
+    texto_src = BIENVENIDA_MEDICO.texto.fuente
+    html_src = BIENVENIDA_MEDICO.html.fuente
+    valores = [_valores(i) for i in range(args.n)]
+
+    def template_sin_cache(i: int) -> None:
+        v = valores[i]
+        Template(texto_src).substitute(v)
+        Template(html_src).substitute({k: html.escape(str(x)) for k, x in v.items()})
+
+    def plantilla_compilada(i: int) -> None:
+        BIENVENIDA_MEDICO.render(**valores[i])
+
+    def mensaje_mime(i: int) -> None:
+        v = valores[i]
+        asunto, texto, cuerpo_html = BIENVENIDA_MEDICO.render(**v)
+        email_service._serializar(email_service._construir_mensaje(v["email"], asunto, texto, cuerpo_html))
+
+    resultados = [
+        _medir("string.Template por llamada", args.n, template_sin_cache),
+        _medir("plantilla precompilada", args.n, plantilla_compilada),
+        _medir("render + mensaje MIME", args.n, mensaje_mime),
+    ]
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
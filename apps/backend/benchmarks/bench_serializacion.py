@@ -0,0 +1,89 @@
+"""
+Micro-benchmark de serialización de listados grandes.
+
+Arma una app FastAPI mínima con el mismo listado (filas de
+`RespuestaResumenItemOut`, como `GET /formularios/respuestas`) servido de tres
+formas y mide el tiempo por request con TestClient (sin base de datos):
+
+- `validado_json`: dicts validados por `response_model` + `JSONResponse`
+  (lo que hacía la app antes).
+- `validado_orjson`: lo mismo con `ORJSONResponse` (default actual de la app).
+- `directo`: los mismos dicts con `json_directo` (orjson, sin pasar por el
+  `response_model`), como sirven ahora los listados grandes.
+
+Uso (desde apps/backend):
+    python -m benchmarks.bench_serializacion [--filas 5000] [-n 50]
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.respuestas import json_directo
+from app.schemas.schemas import RespuestasResumenPaginadoOut
+
+
+def _filas(n: int) -> list:
+    base = datetime(2026, 1, 1)
+    return [
+        {
+            "asignacion_id": i, "formulario_id": i % 10, "formulario_titulo": f"Formulario {i % 10}",
+            "estado": "completado" if i % 3 else "pendiente", "numero_instancia": 1 + i % 4,
+            "paciente_id": i, "paciente_nombre": f"Paciente {i}", "paciente_documento": f"{1_000_000 + i}",
+            "medico_id": i % 50, "medico_nombre": f"Médico {i % 50}", "hospital_id": i % 20,
+            "hospital_nombre": f"Hospital {i % 20}", "fecha_asignacion": base + timedelta(minutes=i),
+            "fecha_completado": base + timedelta(minutes=i, hours=2) if i % 3 else None,
+            "tiene_respuesta": bool(i % 3),
+        }
+        for i in range(n)
+    ]
+
+
+def _app(filas: list) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/validado_json", response_model=RespuestasResumenPaginadoOut, response_class=JSONResponse)
+    def validado_json():
+        return {"total": len(filas), "items": filas}
+
+    @app.get("/validado_orjson", response_model=RespuestasResumenPaginadoOut, response_class=ORJSONResponse)
+    def validado_orjson():
+        return {"total": len(filas), "items": filas}
+
+    @app.get("/directo", response_model=RespuestasResumenPaginadoOut)
+    def directo():
+        return json_directo({"total": len(filas), "items": filas})
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, default=5_000)
+    parser.add_argument("-n", type=int, default=50)
+    args = parser.parse_args()
+
+    cliente = TestClient(_app(_filas(args.filas)))
+    referencia = cliente.get("/validado_json").json()
+
+    resultados = []
+    for ruta in ("validado_json", "validado_orjson", "directo"):
+        assert cliente.get(f"/{ruta}").json() == referencia, ruta
+        inicio = time.perf_counter()
+        for _ in range(args.n):
+            cliente.get(f"/{ruta}")
+        total = time.perf_counter() - inicio
+        resultados.append({
+            "caso": ruta, "filas": args.filas, "n": args.n,
+            "ms_por_request": round(total / args.n * 1000, 2),
+        })
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Prueba de carga del chat por WebSocket contra un uvicorn local.
+
+Flujo por paciente (usuarios generados por `benchmarks.datos`):
+1. `POST /auth/login` una sola vez (bcrypt es caro) y `GET /mensajes/conversaciones`
+   para conocer su médico asignado.
+2. Por cada conexión: `POST /mensajes/ws-token` justo antes de conectar (el ticket
+   dura 60 s) y `ws://.../mensajes/ws/{paciente_id}/{medico_id}?token=...`.
+3. Cada conexión envía mensajes a `--tasa` mensajes/seg durante `--duracion` seg.
+
+El servidor reenvía cada mensaje a todas las conexiones del chat (incluida la que
+lo envió), así que la latencia de entrega se mide desde el envío hasta cada
+recepción. Con `--por-chat` > 1 se abren varias conexiones al mismo chat y se mide
+también el fan-out.
+
+Uso (desde apps/backend):
+    python -m benchmarks.datos --db sqlite:///bench.db --escala chica
+    DATABASE_URL=sqlite:///bench.db uvicorn app.main:app --port 8000
+    python -m benchmarks.carga_websocket --url http://localhost:8000 --conexiones 1000 --tasa 0.5
+
+Para miles de conexiones puede hacer falta subir el límite de descriptores
+(`ulimit -n 65535`) tanto en el cliente como en el servidor.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import websockets
+
+from benchmarks.comun import commit_actual, percentil
+from benchmarks.datos import PASSWORD_BENCHMARK
+
+
+@dataclass
+class Estadisticas:
+    conexiones_ok: int = 0
+    conexiones_fallidas: int = 0
+    desconexiones: int = 0
+    enviados: int = 0
+    latencias: List[float] = field(default_factory=list)
+    # contenido -> instante de envío
+    pendientes: Dict[str, float] = field(default_factory=dict)
+
+
+async def _preparar_paciente(http: httpx.AsyncClient, numero: int) -> Optional[Tuple[int, int, Dict[str, str]]]:
+    """Login del paciente N y su chat (paciente_id, medico_id, headers)."""
+    respuesta = await http.post(
+        "/auth/login", data={"username": f"paciente{numero}@bench.local", "password": PASSWORD_BENCHMARK}
+    )
+    if respuesta.status_code != 200:
+        return None
+    headers = {"Authorization": f"Bearer {respuesta.json()['access_token']}"}
+    conversaciones = (await http.get("/mensajes/conversaciones", headers=headers)).json()
+    if not conversaciones:
+        return None
+    chat = conversaciones[0]
+    return chat["paciente_id"], chat["medico_id"], headers
+
+
+async def _conexion(
+    http: httpx.AsyncClient,
+    url_ws: str,
+    chat: Tuple[int, int, Dict[str, str]],
+    id_conexion: int,
+    tasa: float,
+    fin: float,
+    est: Estadisticas,
+) -> None:
+    paciente_id, medico_id, headers = chat
+    try:
+        ticket = await http.post(
+            "/mensajes/ws-token", json={"paciente_id": paciente_id, "medico_id": medico_id}, headers=headers
+        )
+        ticket.raise_for_status()
+        ws = await websockets.connect(
+            f"{url_ws}/mensajes/ws/{paciente_id}/{medico_id}?token={ticket.json()['token']}",
+            open_timeout=30,
+        )
+    except Exception:  # noqa: BLE001 - se contabiliza como conexión fallida
+        est.conexiones_fallidas += 1
+        return
+    est.conexiones_ok += 1
+
+    async def recibir() -> None:
+        async for crudo in ws:
+            contenido = json.loads(crudo).get("contenido")
+            enviado = est.pendientes.get(contenido)
+            if enviado is not None:
+                est.latencias.append(time.perf_counter() - enviado)
+
+    receptor = asyncio.create_task(recibir())
+    secuencia = 0
+    try:
+        while time.perf_counter() < fin:
+            await asyncio.sleep(1 / tasa)
+            secuencia += 1
+            contenido = f"bench {id_conexion}-{secuencia}"
+            est.pendientes[contenido] = time.perf_counter()
+            await ws.send(json.dumps({"contenido": contenido}))
+            est.enviados += 1
+        # Margen para recibir las últimas entregas
+        await asyncio.sleep(2)
+    except websockets.ConnectionClosed:
+        est.desconexiones += 1
+    finally:
+        receptor.cancel()
+        await ws.close()
+
+
+async def ejecutar(args) -> Dict:
+    url_ws = args.url.replace("http://", "ws://").replace("https://", "wss://")
+    limites = httpx.Limits(max_connections=args.concurrencia_http, max_keepalive_connections=args.concurrencia_http)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limites) as http:
+        pacientes_necesarios = -(-args.conexiones // args.por_chat)
+        chats = [
+            c for c in await asyncio.gather(
+                *(_preparar_paciente(http, n) for n in range(1, pacientes_necesarios + 1))
+            ) if c
+        ]
+        if not chats:
+            raise SystemExit("No se pudo preparar ningún chat: ¿la base tiene datos de benchmark?")
+
+        est = Estadisticas()
+        inicio = time.perf_counter()
+        fin = inicio + args.rampa + args.duracion
+        tareas = []
+        for i in range(args.conexiones):
+            chat = chats[(i // args.por_chat) % len(chats)]
+            tareas.append(asyncio.create_task(_conexion(http, url_ws, chat, i, args.tasa, fin, est)))
+            if args.rampa:
+                await asyncio.sleep(args.rampa / args.conexiones)
+        await asyncio.gather(*tareas)
+        duracion = time.perf_counter() - inicio
+
+    ms = [x * 1000 for x in est.latencias]
+    return {
+        "commit": commit_actual(),
+        "url": args.url,
+        "conexiones_solicitadas": args.conexiones,
+        "conexiones_ok": est.conexiones_ok,
+        "conexiones_fallidas": est.conexiones_fallidas,
+        "desconexiones": est.desconexiones,
+        "chats": len(chats),
+        "duracion_s": round(duracion, 2),
+        "mensajes_enviados": est.enviados,
+        "entregas": len(ms),
+        "enviados_por_segundo": round(est.enviados / duracion, 2),
+        "entregas_por_segundo": round(len(ms) / duracion, 2),
+        "latencia_p50_ms": round(percentil(ms, 50), 2),
+        "latencia_p95_ms": round(percentil(ms, 95), 2),
+        "latencia_p99_ms": round(percentil(ms, 99), 2),
+        "latencia_max_ms": round(max(ms), 2) if ms else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prueba de carga del chat por WebSocket.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--conexiones", type=int, default=100, help="WebSockets simultáneos")
+    parser.add_argument("--por-chat", type=int, default=1, help="Conexiones por chat (paciente)")
+    parser.add_argument("--tasa", type=float, default=1.0, help="Mensajes por segundo por conexión")
+    parser.add_argument("--duracion", type=float, default=30.0, help="Segundos de envío")
+    parser.add_argument("--rampa", type=float, default=10.0, help="Segundos para abrir todas las conexiones")
+    parser.add_argument("--concurrencia-http", type=int, default=50, help="Requests HTTP simultáneas (login/tickets)")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto, stdout)")
+    args = parser.parse_args()
+
+    informe = asyncio.run(ejecutar(args))
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
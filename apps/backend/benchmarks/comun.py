@@ -0,0 +1,59 @@
+"""Utilidades compartidas por los benchmarks."""
+
+import os
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List
+
+
+def crear_engine(url: str):
+    """
+    Apunta la aplicación a la base `url` y devuelve su engine. Debe llamarse
+    antes de usar la app: `init_engine` lee DATABASE_URL.
+    """
+    from app.db import db
+
+    os.environ["DATABASE_URL"] = url
+    db.init_engine(force=True)
+    return db.get_engine()
+
+
+def percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def resumen_latencias(nombre: str, latencias_s: List[float], duracion_s: float, **extra) -> Dict:
+    ms = [x * 1000 for x in latencias_s]
+    return {
+        "escenario": nombre,
+        "n": len(ms),
+        "media_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentil(ms, 50), 3),
+        "p95_ms": round(percentil(ms, 95), 3),
+        "p99_ms": round(percentil(ms, 99), 3),
+        "por_segundo": round(len(ms) / duracion_s, 2) if duracion_s else 0.0,
+        **extra,
+    }
+
+
+def cronometrar(funcion: Callable[[int], None], iteraciones: int) -> List[float]:
+    latencias = []
+    for i in range(iteraciones):
+        inicio = time.perf_counter()
+        funcion(i)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+
+def commit_actual() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
@@ -0,0 +1,289 @@
+"""
+Generador de datos sintéticos reproducibles para los benchmarks.
+
+Con la misma semilla y escala genera exactamente los mismos datos, así los
+resultados de distintos commits son comparables. Inserta con `INSERT` masivos
+(executemany por lotes) e IDs explícitos, sin pasar por el ORM fila a fila.
+
+Todos los usuarios generados tienen la contraseña `PASSWORD_BENCHMARK`; los
+emails siguen el patrón `paciente{n}@bench.local` / `medico{n}@bench.local`.
+
+Uso (desde apps/backend):
+    python -m benchmarks.datos --db sqlite:///bench.db --escala chica --semilla 42
+"""
+
+import argparse
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Engine
+
+PASSWORD_BENCHMARK = "benchmark123"
+LOTE = 10_000
+
+# Rectángulo aproximado de Paraguay
+LATITUD = (-27.5, -19.3)
+LONGITUD = (-62.6, -54.3)
+
+
+@dataclass(frozen=True)
+class Escala:
+    hospitales: int
+    especialidades: int
+    medicos: int
+    pacientes: int
+    formularios: int
+    formularios_por_paciente: int
+    mensajes: int
+
+
+ESCALAS: Dict[str, Escala] = {
+    "mini": Escala(hospitales=10, especialidades=10, medicos=40, pacientes=300,
+                   formularios=3, formularios_por_paciente=2, mensajes=5_000),
+    "chica": Escala(hospitales=50, especialidades=20, medicos=200, pacientes=2_000,
+                    formularios=5, formularios_por_paciente=3, mensajes=50_000),
+    "mediana": Escala(hospitales=200, especialidades=40, medicos=1_000, pacientes=20_000,
+                      formularios=10, formularios_por_paciente=5, mensajes=500_000),
+    "grande": Escala(hospitales=500, especialidades=60, medicos=3_000, pacientes=100_000,
+                     formularios=20, formularios_por_paciente=8, mensajes=3_000_000),
+}
+
+
+def _lotes(filas: Iterable[dict], tamano: int = LOTE) -> Iterator[List[dict]]:
+    lote: List[dict] = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _insertar(conn, tabla, filas: Iterable[dict]) -> int:
+    total = 0
+    for lote in _lotes(filas):
+        conn.execute(insert(tabla), lote)
+        total += len(lote)
+    return total
+
+
+def _sincronizar_secuencias(conn, tablas) -> None:
+    """En PostgreSQL, avanza las secuencias de ID después de insertar IDs explícitos."""
+    if conn.dialect.name != "postgresql":
+        return
+    for tabla in tablas:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{tabla.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {tabla.name}), 1))"
+        ))
+
+
+def generar(engine: Engine, escala: Escala, semilla: int = 42) -> Dict[str, int]:
+    """
+    Crea el esquema (si falta) y carga los datos sintéticos. La base debe estar
+    vacía. Devuelve la cantidad de filas insertadas por tabla.
+    """
+    from app.core.security import get_password_hash
+    from app.db.db import Base
+    from app.models import models as m
+
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(m.Hospital)).scalar():
+            raise RuntimeError("La base ya tiene datos: use una base vacía o --recrear.")
+
+    rnd = random.Random(semilla)
+    # Un solo hash para todos: bcrypt por usuario haría la carga inviable.
+    password_hash = get_password_hash(PASSWORD_BENCHMARK)
+    ahora = datetime(2026, 1, 1)
+    totales: Dict[str, int] = {}
+
+    hospitales = [
+        {
+            "id": i,
+            "nombre": f"Hospital {i}",
+            "codigo": f"H{i:05d}",
+            "departamento": f"Departamento {i % 17 + 1}",
+            "ciudad": f"Ciudad {i % 60 + 1}",
+            "latitud": rnd.uniform(*LATITUD),
+            "longitud": rnd.uniform(*LONGITUD),
+        }
+        for i in range(1, escala.hospitales + 1)
+    ]
+    especialidades = [
+        {"id": i, "nombre": f"Especialidad {i}", "activa": 1}
+        for i in range(1, escala.especialidades + 1)
+    ]
+    medicos = [
+        {
+            "id": i,
+            "documento": f"M{i:08d}",
+            "nombre": f"Médico {i}",
+            "email": f"medico{i}@bench.local",
+            "hashed_password": password_hash,
+            "rol": m.RolEnum.medico,
+            "debe_cambiar_password": False,
+        }
+        for i in range(1, escala.medicos + 1)
+    ]
+    # Cada médico trabaja en 1 o 2 hospitales y tiene 1 o 2 especialidades
+    medicos_por_hospital: Dict[int, List[int]] = {h["id"]: [] for h in hospitales}
+    medico_hospital, medico_especialidad = [], []
+    for medico in medicos:
+        for hospital_id in rnd.sample(range(1, escala.hospitales + 1), k=min(escala.hospitales, rnd.randint(1, 2))):
+            medico_hospital.append({"medico_id": medico["id"], "hospital_id": hospital_id})
+            medicos_por_hospital[hospital_id].append(medico["id"])
+        for especialidad_id in rnd.sample(range(1, escala.especialidades + 1), k=min(escala.especialidades, rnd.randint(1, 2))):
+            medico_especialidad.append({"medico_id": medico["id"], "especialidad_id": especialidad_id})
+
+    pacientes, asignaciones, medico_de_paciente = [], [], {}
+    for i in range(1, escala.pacientes + 1):
+        hospital = hospitales[rnd.randrange(len(hospitales))]
+        pacientes.append({
+            "id": i,
+            "documento": f"P{i:08d}",
+            "nombre": f"Paciente {i}",
+            "nombre_normalizado": f"paciente {i}",
+            "fecha_nacimiento": date(1940, 1, 1) + timedelta(days=rnd.randrange(365 * 70)),
+            "genero": rnd.choice(list(m.GeneroEnum)),
+            "email": f"paciente{i}@bench.local",
+            "hashed_password": password_hash,
+            "rol": m.RolEnum.paciente,
+            "latitud": hospital["latitud"] + rnd.uniform(-0.2, 0.2),
+            "longitud": hospital["longitud"] + rnd.uniform(-0.2, 0.2),
+            "hospital_id": hospital["id"],
+        })
+        candidatos = medicos_por_hospital[hospital["id"]]
+        if candidatos:
+            medico_id = rnd.choice(candidatos)
+            medico_de_paciente[i] = medico_id
+            asignaciones.append({
+                "id": len(asignaciones) + 1,
+                "paciente_id": i,
+                "medico_id": medico_id,
+                "fecha_asignacion": ahora - timedelta(days=rnd.randrange(365)),
+                "activo": True,
+            })
+
+    preguntas = [
+        {"id": "temperatura", "tipo": "numero", "texto": "Temperatura corporal"},
+        {"id": "tos", "tipo": "si_no", "texto": "¿Tiene tos?"},
+        {"id": "saturacion", "tipo": "numero", "texto": "Saturación de oxígeno"},
+    ]
+    formularios = [
+        {
+            "id": i,
+            "tipo": "seguimiento",
+            "titulo": f"Formulario {i}",
+            "preguntas": preguntas,
+            "creador_id": rnd.randint(1, escala.medicos),
+            "fecha_creacion": ahora,
+            "activo": True,
+            "meta": {},
+        }
+        for i in range(1, escala.formularios + 1)
+    ]
+
+    formulario_asignaciones, respuestas = [], []
+    for paciente_id, medico_id in medico_de_paciente.items():
+        for numero in range(1, escala.formularios_por_paciente + 1):
+            asignada = ahora - timedelta(days=rnd.randrange(180))
+            completada = rnd.random() < 0.6
+            asignacion_id = len(formulario_asignaciones) + 1
+            formulario_id = rnd.randint(1, escala.formularios)
+            formulario_asignaciones.append({
+                "id": asignacion_id,
+                "formulario_id": formulario_id,
+                "paciente_id": paciente_id,
+                "asignado_por": medico_id,
+                "fecha_asignacion": asignada,
+                "fecha_expiracion": asignada + timedelta(days=7),
+                "fecha_completado": asignada + timedelta(days=1) if completada else None,
+                "numero_instancia": numero,
+                "estado": "completado" if completada else rnd.choice(["pendiente", "expirado"]),
+                "datos_extra": {},
+            })
+            if completada:
+                respuestas.append({
+                    "id": len(respuestas) + 1,
+                    "paciente_id": paciente_id,
+                    "formulario_id": formulario_id,
+                    "asignacion_id": asignacion_id,
+                    "respuestas": {
+                        "temperatura": round(rnd.uniform(36.0, 39.5), 1),
+                        "tos": rnd.random() < 0.3,
+                        "saturacion": rnd.randint(88, 99),
+                    },
+                    "timestamp": asignada + timedelta(days=1),
+                })
+
+    def _mensajes() -> Iterator[dict]:
+        pares = list(medico_de_paciente.items())
+        if not pares:
+            return
+        for i in range(1, escala.mensajes + 1):
+            paciente_id, medico_id = pares[rnd.randrange(len(pares))]
+            del_paciente = rnd.random() < 0.5
+            yield {
+                "id": i,
+                "contenido": f"Mensaje {i}",
+                "paciente_id": paciente_id,
+                "medico_id": medico_id,
+                "timestamp": ahora + timedelta(seconds=i),
+                "leido": 0 if rnd.random() < 0.2 else 1,
+                "remitente_rol": m.RolEnum.paciente if del_paciente else m.RolEnum.medico,
+            }
+
+    with engine.begin() as conn:
+        totales["hospitales"] = _insertar(conn, m.Hospital.__table__, hospitales)
+        totales["especialidades"] = _insertar(conn, m.Especialidad.__table__, especialidades)
+        totales["medicos"] = _insertar(conn, m.Medico.__table__, medicos)
+        totales["medico_hospital"] = _insertar(conn, m.medico_hospital, medico_hospital)
+        totales["medico_especialidad"] = _insertar(conn, m.medico_especialidad, medico_especialidad)
+        totales["pacientes"] = _insertar(conn, m.Paciente.__table__, pacientes)
+        totales["asignaciones"] = _insertar(conn, m.Asignacion.__table__, asignaciones)
+        totales["formularios"] = _insertar(conn, m.Formulario.__table__, formularios)
+        totales["formulario_asignaciones"] = _insertar(conn, m.FormularioAsignacion.__table__, formulario_asignaciones)
+        totales["respuestas_formularios"] = _insertar(conn, m.RespuestaFormulario.__table__, respuestas)
+        totales["mensajes"] = _insertar(conn, m.Mensaje.__table__, _mensajes())
+        _sincronizar_secuencias(conn, [
+            m.Hospital.__table__, m.Especialidad.__table__, m.Medico.__table__, m.Paciente.__table__,
+            m.Asignacion.__table__, m.Formulario.__table__, m.FormularioAsignacion.__table__,
+            m.RespuestaFormulario.__table__, m.Mensaje.__table__,
+        ])
+    return totales
+
+
+def recrear_esquema(engine: Engine) -> None:
+    """Borra y vuelve a crear todas las tablas (¡pierde los datos!)."""
+    from app.db.db import Base
+    from app.models import models  # noqa: F401 - registra los modelos en Base.metadata
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def main() -> None:
+    from benchmarks.comun import crear_engine
+
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos para los benchmarks.")
+    parser.add_argument("--db", required=True, help="URL de la base (sqlite:///bench.db, postgresql+psycopg2://...)")
+    parser.add_argument("--escala", choices=sorted(ESCALAS), default="chica")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--recrear", action="store_true", help="Borra y recrea las tablas antes de cargar")
+    args = parser.parse_args()
+
+    engine = crear_engine(args.db)
+    if args.recrear:
+        recrear_esquema(engine)
+    totales = generar(engine, ESCALAS[args.escala], args.semilla)
+    for tabla, total in totales.items():
+        print(f"{tabla:>25}: {total}")
+
+
+if __name__ == "__main__":
+    main()
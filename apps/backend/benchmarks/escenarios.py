@@ -0,0 +1,180 @@
+"""
+Escenarios de benchmark sobre la API completa (in-process, vía TestClient).
+
+Cada escenario repite una request típica rotando entre varios usuarios
+generados por `benchmarks.datos` y reporta latencias (media, p50, p95, p99),
+requests por segundo, cantidad promedio de consultas SQL (header X-DB-Queries)
+y errores.
+
+Uso (desde apps/backend, con una base ya generada):
+    python -m benchmarks.escenarios --db sqlite:///bench.db -n 200 --salida resultados.json
+"""
+
+import argparse
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import func, select
+
+from benchmarks.comun import commit_actual, crear_engine, cronometrar, resumen_latencias
+from benchmarks.datos import PASSWORD_BENCHMARK
+
+USUARIOS_POR_ROL = 10
+
+
+@dataclass
+class Contexto:
+    cliente: object
+    # (id, email, headers de autorización)
+    medicos: List[Tuple[int, str, Dict[str, str]]] = field(default_factory=list)
+    pacientes: List[Tuple[int, str, Dict[str, str]]] = field(default_factory=list)
+    # (paciente_id, medico_id, headers del médico)
+    chats: List[Tuple[int, int, Dict[str, str]]] = field(default_factory=list)
+
+
+def _login(cliente, email: str) -> Dict[str, str]:
+    respuesta = cliente.post("/auth/login", data={"username": email, "password": PASSWORD_BENCHMARK})
+    respuesta.raise_for_status()
+    return {"Authorization": f"Bearer {respuesta.json()['access_token']}"}
+
+
+def preparar(cliente, engine) -> Contexto:
+    """Elige usuarios de forma determinista y obtiene sus tokens."""
+    from app.models.models import Asignacion, Medico, Paciente
+
+    ctx = Contexto(cliente=cliente)
+    with engine.connect() as conn:
+        medicos = conn.execute(
+            select(Medico.id, Medico.email)
+            .join(Asignacion, Asignacion.medico_id == Medico.id)
+            .where(Asignacion.activo.is_(True))
+            .group_by(Medico.id, Medico.email)
+            .order_by(func.count(Asignacion.id).desc(), Medico.id)
+            .limit(USUARIOS_POR_ROL)
+        ).all()
+        pacientes = conn.execute(
+            select(Paciente.id, Paciente.email, Asignacion.medico_id)
+            .join(Asignacion, Asignacion.paciente_id == Paciente.id)
+            .where(Asignacion.activo.is_(True))
+            .order_by(Paciente.id)
+            .limit(USUARIOS_POR_ROL)
+        ).all()
+
+    headers_medico = {}
+    for medico_id, email in medicos:
+        headers = _login(cliente, email)
+        headers_medico[medico_id] = headers
+        ctx.medicos.append((medico_id, email, headers))
+    for paciente_id, email, medico_id in pacientes:
+        ctx.pacientes.append((paciente_id, email, _login(cliente, email)))
+        if medico_id not in headers_medico:
+            headers_medico[medico_id] = _login(cliente, f"medico{medico_id}@bench.local")
+        ctx.chats.append((paciente_id, medico_id, headers_medico[medico_id]))
+    return ctx
+
+
+def _ejecutar(nombre: str, ctx: Contexto, iteraciones: int, request: Callable[[int], object]) -> Dict:
+    consultas: List[int] = []
+    errores = 0
+
+    def paso(i: int) -> None:
+        nonlocal errores
+        respuesta = request(i)
+        if respuesta.status_code >= 400:
+            errores += 1
+        if "x-db-queries" in respuesta.headers:
+            consultas.append(int(respuesta.headers["x-db-queries"]))
+
+    inicio = time.perf_counter()
+    latencias = cronometrar(paso, iteraciones)
+    duracion = time.perf_counter() - inicio
+    return resumen_latencias(
+        nombre, latencias, duracion,
+        consultas_sql_promedio=round(sum(consultas) / len(consultas), 2) if consultas else None,
+        errores=errores,
+    )
+
+
+def login(ctx: Contexto, n: int) -> Dict:
+    return _ejecutar("login", ctx, n, lambda i: ctx.cliente.post(
+        "/auth/login",
+        data={"username": ctx.pacientes[i % len(ctx.pacientes)][1], "password": PASSWORD_BENCHMARK},
+    ))
+
+
+def bandeja(ctx: Contexto, n: int) -> Dict:
+    return _ejecutar("bandeja_medico", ctx, n, lambda i: ctx.cliente.get(
+        "/mensajes/conversaciones", headers=ctx.medicos[i % len(ctx.medicos)][2],
+    ))
+
+
+def historial_chat(ctx: Contexto, n: int) -> Dict:
+    def request(i: int):
+        paciente_id, medico_id, headers = ctx.chats[i % len(ctx.chats)]
+        return ctx.cliente.get(f"/mensajes/chat/{paciente_id}/{medico_id}?limit=50", headers=headers)
+    return _ejecutar("historial_chat", ctx, n, request)
+
+
+def respuestas(ctx: Contexto, n: int) -> Dict:
+    return _ejecutar("listado_respuestas", ctx, n, lambda i: ctx.cliente.get(
+        "/formularios/respuestas?limit=50", headers=ctx.medicos[i % len(ctx.medicos)][2],
+    ))
+
+
+def proximidad(ctx: Contexto, n: int) -> Dict:
+    return _ejecutar("hospitales_cercanos", ctx, n, lambda i: ctx.cliente.get(
+        "/hospitales/mis-cercanos", headers=ctx.pacientes[i % len(ctx.pacientes)][2],
+    ))
+
+
+ESCENARIOS: Dict[str, Callable[[Contexto, int], Dict]] = {
+    "login": login,
+    "bandeja": bandeja,
+    "chat": historial_chat,
+    "respuestas": respuestas,
+    "proximidad": proximidad,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks de escenarios de la API.")
+    parser.add_argument("--db", required=True, help="URL de la base generada con benchmarks.datos")
+    parser.add_argument("-n", "--iteraciones", type=int, default=200)
+    parser.add_argument("--escenarios", nargs="+", choices=sorted(ESCENARIOS), default=list(ESCENARIOS))
+    parser.add_argument("--calentamiento", type=int, default=10, help="Iteraciones descartadas por escenario")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto, stdout)")
+    args = parser.parse_args()
+
+    engine = crear_engine(args.db)
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    cliente = TestClient(app)
+    ctx = preparar(cliente, engine)
+    if not ctx.medicos or not ctx.pacientes:
+        raise SystemExit("La base no tiene datos de benchmark: ejecutar primero `python -m benchmarks.datos`.")
+
+    resultados = []
+    for nombre in args.escenarios:
+        ESCENARIOS[nombre](ctx, args.calentamiento)
+        resultados.append(ESCENARIOS[nombre](ctx, args.iteraciones))
+
+    informe = {
+        "commit": commit_actual(),
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "base": engine.dialect.name,
+        "iteraciones": args.iteraciones,
+        "resultados": resultados,
+    }
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Perfil del arranque de la API: tiempo de importación por módulo y tamaño de la
+tabla de rutas.
+
+Importa `app.main` en un proceso nuevo con `python -X importtime` (así no
+influye lo que ya esté cargado en este proceso) y reporta:
+
+- Tiempo total de `import app.main` y los módulos más caros, acumulado (con sus
+  dependencias) y propio.
+- Tiempo propio agrupado por paquete de primer nivel (fastapi, sqlalchemy, app, ...).
+- Rutas registradas (HTTP y WebSocket), rutas duplicadas (mismo método y path)
+  y tiempo de generar el esquema OpenAPI.
+
+Uso (desde apps/backend):
+    python -m benchmarks.perfil_arranque [--top 20] [--salida perfil.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from benchmarks.comun import commit_actual
+
+# "import time:       self [us] |  cumulative | imported package"
+_LINEA_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def tiempos_importacion(modulo: str = "app.main") -> List[Dict]:
+    """Importa `modulo` en un subproceso y devuelve una fila por módulo importado."""
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        capture_output=True, text=True, env=os.environ.copy(), check=False,
+    )
+    if proceso.returncode != 0:
+        raise SystemExit(f"No se pudo importar {modulo}:\n{proceso.stderr[-2000:]}")
+    filas = []
+    for linea in proceso.stderr.splitlines():
+        coincidencia = _LINEA_IMPORTTIME.match(linea)
+        if coincidencia:
+            propio, acumulado, sangria, nombre = coincidencia.groups()
+            filas.append({
+                "modulo": nombre,
+                "propio_ms": int(propio) / 1000,
+                "acumulado_ms": int(acumulado) / 1000,
+                "nivel": len(sangria) // 2,
+            })
+    return filas
+
+
+def resumen_rutas(app) -> Dict:
+    from starlette.routing import Route, WebSocketRoute
+
+    http = [r for r in app.routes if isinstance(r, Route)]
+    websockets = [r for r in app.routes if isinstance(r, WebSocketRoute)]
+    claves = Counter((metodo, r.path) for r in http for metodo in sorted(r.methods or ()))
+    duplicadas = sorted(f"{metodo} {path}" for (metodo, path), n in claves.items() if n > 1)
+
+    app.openapi_schema = None
+    inicio = time.perf_counter()
+    esquema = app.openapi()
+    openapi_ms = (time.perf_counter() - inicio) * 1000
+    return {
+        "rutas_http": len(http),
+        "rutas_websocket": len(websockets),
+        "duplicadas": duplicadas,
+        "operaciones_openapi": sum(len(ops) for ops in esquema.get("paths", {}).values()),
+        "openapi_ms": round(openapi_ms, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Perfil de arranque de la API.")
+    parser.add_argument("--top", type=int, default=20, help="Cantidad de módulos a listar")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto, stdout)")
+    args = parser.parse_args()
+
+    filas = tiempos_importacion()
+    total = next((f["acumulado_ms"] for f in filas if f["modulo"] == "app.main"), 0.0)
+    por_paquete: Dict[str, float] = defaultdict(float)
+    for fila in filas:
+        por_paquete[fila["modulo"].split(".")[0]] += fila["propio_ms"]
+
+    from app.main import app
+
+    informe = {
+        "commit": commit_actual(),
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "import_app_main_ms": round(total, 1),
+        "modulos_importados": len(filas),
+        "top_acumulado": [
+            {"modulo": f["modulo"], "ms": round(f["acumulado_ms"], 1)}
+            for f in sorted(filas, key=lambda f: f["acumulado_ms"], reverse=True)[:args.top]
+        ],
+        "top_propio": [
+            {"modulo": f["modulo"], "ms": round(f["propio_ms"], 1)}
+            for f in sorted(filas, key=lambda f: f["propio_ms"], reverse=True)[:args.top]
+        ],
+        "por_paquete_ms": {
+            paquete: round(ms, 1)
+            for paquete, ms in sorted(por_paquete.items(), key=lambda p: p[1], reverse=True)[:args.top]
+        },
+        "rutas": resumen_rutas(app),
+    }
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,17 @@
 # File: tests/conftest.py
 # python
+from datetime import date
 from pathlib import Path
 import os
+
+import pytest
 from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.db import Base
+from app.models.models import Formulario, GeneroEnum, Hospital, Medico, Paciente
 
 ROOT = Path(__file__).resolve().parent.parent
 ENV_PATH = ROOT / ".env"
@@ -31,4 +40,90 @@ if "DATABASE_URL" not in os.environ:
     pw = os.getenv("POSTGRES_PASSWORD", "")
     host = os.getenv("POSTGRES_SERVER", "localhost")
     db = os.getenv("POSTGRES_DB", "chronic_covid19")
-    os.environ["DATABASE_URL"] = f"postgresql+psycopg2://{user}:{pw}@{host}:5432/{db}"
\ No newline at end of file
+    os.environ["DATABASE_URL"] = f"postgresql+psycopg2://{user}:{pw}@{host}:5432/{db}"
+
+# ========== BASE EN MEMORIA Y DATOS DE PRUEBA ==========
+
+@pytest.fixture
+def engine():
+    """
+    SQLite en memoria con todas las tablas. StaticPool: la sesión del test y las
+    que abren los workers (ver `sesiones_de_workers`) comparten la misma base.
+    """
+    # check_same_thread: TestClient ejecuta los endpoints sync en otro hilo
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def SessionLocal(engine):
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def sesion(SessionLocal):
+    sesion = SessionLocal()
+    yield sesion
+    sesion.close()
+
+
+@pytest.fixture
+def sesiones_de_workers(monkeypatch, engine, SessionLocal):
+    """Las tareas en segundo plano abren sus sesiones (y locks) sobre la base del test."""
+    # Import diferido: los servicios leen la configuración (y el .env) al importarse
+    from app.core import tareas
+    from app.services import estadisticas_hospitales, expiracion_formularios, programacion_formularios
+
+    for modulo in (estadisticas_hospitales, expiracion_formularios, programacion_formularios):
+        monkeypatch.setattr(modulo, "get_sessionmaker", lambda: SessionLocal)
+    monkeypatch.setattr(tareas, "get_engine", lambda: engine)
+
+
+class Fabrica:
+    """Crea (y agrega a la sesión) registros con datos mínimos válidos; `datos` pisa los valores por defecto."""
+
+    def __init__(self, sesion):
+        self.sesion = sesion
+        self._secuencia = 0
+
+    def _clave(self, id_):
+        if id_ is not None:
+            return id_
+        self._secuencia += 1
+        return f"s{self._secuencia}"
+
+    def _agregar(self, objeto):
+        self.sesion.add(objeto)
+        return objeto
+
+    def hospital(self, id=None, **datos) -> Hospital:
+        clave = self._clave(id)
+        valores = dict(id=id, nombre=f"Hospital {clave}", codigo=f"H{clave}")
+        return self._agregar(Hospital(**{**valores, **datos}))
+
+    def medico(self, id=None, **datos) -> Medico:
+        clave = self._clave(id)
+        valores = dict(
+            id=id, documento=f"M{clave}", nombre=f"Médico {clave}", email=f"m{clave}@example.com",
+            hashed_password="x",
+        )
+        return self._agregar(Medico(**{**valores, **datos}))
+
+    def paciente(self, id=None, **datos) -> Paciente:
+        clave = self._clave(id)
+        valores = dict(
+            id=id, documento=f"P{clave}", nombre=f"Paciente {clave}", fecha_nacimiento=date(1980, 1, 1),
+            genero=GeneroEnum.otro, email=f"p{clave}@example.com", hashed_password="x",
+        )
+        return self._agregar(Paciente(**{**valores, **datos}))
+
+    def formulario(self, id=None, **datos) -> Formulario:
+        valores = dict(id=id, tipo="seguimiento", preguntas=[], creador_id=1)
+        return self._agregar(Formulario(**{**valores, **datos}))
+
+
+@pytest.fixture
+def fabrica(sesion):
+    return Fabrica(sesion)
@@ -0,0 +1,58 @@
+# python
+import pytest
+from sqlalchemy import event
+
+from app.models.models import Asignacion, FormularioAsignacion
+from app.services import asignacion_formularios
+
+
+@pytest.fixture
+def db(sesion, fabrica):
+    fabrica.medico(id=1)
+    fabrica.medico(id=2)
+    fabrica.formulario(id=1)
+    for i in (1, 2, 3, 4):
+        fabrica.paciente(id=i)
+    sesion.add_all([
+        Asignacion(paciente_id=1, medico_id=1, activo=True),
+        Asignacion(paciente_id=2, medico_id=1, activo=True),
+        Asignacion(paciente_id=3, medico_id=1, activo=False),
+        Asignacion(paciente_id=4, medico_id=2, activo=True),
+        FormularioAsignacion(formulario_id=1, paciente_id=2, asignado_por=1, numero_instancia=1),
+        FormularioAsignacion(formulario_id=1, paciente_id=2, asignado_por=1, numero_instancia=2),
+    ])
+    sesion.commit()
+    return sesion
+
+
+def test_pacientes_activos_de_medico(db):
+    assert asignacion_formularios.pacientes_activos_de_medico(db, 1) == [1, 2]
+
+
+def test_asigna_con_numeracion_por_paciente_y_consultas_fijas(db):
+    sentencias = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: sentencias.append(args[2]))
+
+    asignados, faltante = asignacion_formularios.asignar_a_pacientes(
+        db, formulario_id=1, paciente_ids=[2, 1, 2, 3], asignado_por=1,
+    )
+    db.commit()
+
+    assert (asignados, faltante) == ([2, 1, 3], None)
+    # Pacientes + instancias agrupadas + INSERT (executemany)
+    assert len([s for s in sentencias if not s.startswith(("BEGIN", "COMMIT"))]) == 3
+    instancias = {
+        a.paciente_id: a.numero_instancia
+        for a in db.query(FormularioAsignacion).filter(FormularioAsignacion.id > 2)
+    }
+    assert instancias == {1: 1, 2: 3, 3: 1}
+
+
+def test_paciente_inexistente_no_asigna_ninguno(db):
+    asignados, faltante = asignacion_formularios.asignar_a_pacientes(
+        db, formulario_id=1, paciente_ids=[1, 99], asignado_por=1,
+    )
+    db.commit()
+
+    assert (asignados, faltante) == ([], 99)
+    assert db.query(FormularioAsignacion).count() == 2
@@ -0,0 +1,26 @@
+# python
+from sqlalchemy import create_engine, func, select
+
+from app.models.models import Asignacion, Mensaje, Paciente
+from benchmarks.datos import Escala, generar
+
+ESCALA = Escala(hospitales=3, especialidades=2, medicos=6, pacientes=20,
+                formularios=2, formularios_por_paciente=2, mensajes=50)
+
+
+def _huella(engine):
+    with engine.connect() as conn:
+        return (
+            conn.execute(select(func.count()).select_from(Mensaje)).scalar(),
+            conn.execute(select(Paciente.hospital_id).order_by(Paciente.id)).scalars().all(),
+            conn.execute(select(Asignacion.medico_id).order_by(Asignacion.id)).scalars().all(),
+        )
+
+
+def test_generador_es_reproducible_con_la_misma_semilla():
+    a, b = create_engine("sqlite://"), create_engine("sqlite://")
+    generar(a, ESCALA, semilla=7)
+    generar(b, ESCALA, semilla=7)
+
+    assert _huella(a) == _huella(b)
+    assert _huella(a)[0] == 50
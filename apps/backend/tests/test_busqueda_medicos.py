@@ -0,0 +1,88 @@
+# python
+import pytest
+from sqlalchemy import event
+
+from app.models.models import Especialidad, Hospital, Medico
+from app.services.busqueda_medicos import CursorInvalido, listar_medicos
+
+
+@pytest.fixture
+def db(sesion, fabrica):
+    central = fabrica.hospital(id=1, nombre="Central", codigo="HC")
+    norte = fabrica.hospital(id=2, nombre="Norte", codigo="HN")
+    neumo = Especialidad(id=1, nombre="Neumología")
+    clinica = Especialidad(id=2, nombre="Clínica")
+    nombres = ["Ana", "Bruno", "Beatriz", "Carla", "Ana"]  # nombre repetido: desempata el id
+    for i, nombre in enumerate(nombres, start=1):
+        fabrica.medico(
+            id=i, nombre=nombre, hospitales=[central if i % 2 else norte],
+            especialidades=[neumo, clinica] if i <= 2 else [clinica],
+        )
+    sesion.commit()
+    sesion.expunge_all()
+    return sesion
+
+
+def _recorrer(db, **filtros):
+    ids, cursor = [], None
+    while True:
+        pagina, cursor = listar_medicos(db, limit=2, cursor=cursor, **filtros)
+        ids.extend(m.id for m in pagina)
+        if cursor is None:
+            return ids
+
+
+def test_paginacion_por_cursor_recorre_todo_en_orden(db):
+    assert _recorrer(db) == [1, 5, 3, 2, 4]
+
+
+def test_filtros(db):
+    assert _recorrer(db, hospital_id=2) == [2, 4]
+    assert _recorrer(db, especialidad_id=1) == [1, 2]
+    assert _recorrer(db, nombre="b") == [3, 2]
+    assert _recorrer(db, nombre="%") == []
+
+
+def test_cantidad_de_consultas_constante(db):
+    consultas = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *a: consultas.append(1))
+    medicos, _ = listar_medicos(db, limit=5)
+    [(m.especialidades, m.hospitales) for m in medicos]
+    assert len(medicos) == 5
+    assert len(consultas) == 3
+
+
+def test_cursor_invalido(db):
+    with pytest.raises(CursorInvalido):
+        listar_medicos(db, cursor="no-es-un-cursor")
+
+
+def test_medicos_de_especialidad_en_una_consulta(db, fabrica):
+    from app.services.busqueda_medicos import listar_medicos_de_especialidad
+
+    medico = db.get(Medico, 1)
+    medico.hospitales.append(db.get(Hospital, 2))  # el principal sigue siendo el 1
+    fabrica.medico(id=6, nombre="Sin hospital", especialidades=[db.get(Especialidad, 1)])
+    db.commit()
+
+    consultas = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *a: consultas.append(1))
+    pagina, total = listar_medicos_de_especialidad(db, 1, limit=2)
+    assert total == 3
+    assert len(consultas) == 2  # página + total
+    assert pagina == [
+        {"id": 1, "nombre": "Ana", "documento": "M1", "email": "m1@example.com",
+         "hospital_id": 1, "hospital_nombre": "Central"},
+        {"id": 2, "nombre": "Bruno", "documento": "M2", "email": "m2@example.com",
+         "hospital_id": 2, "hospital_nombre": "Norte"},
+    ]
+    pagina, _ = listar_medicos_de_especialidad(db, 1, skip=2)
+    assert pagina[0]["id"] == 6 and pagina[0]["hospital_id"] is None
+
+
+def test_sin_limit_devuelve_todos(db):
+    medicos, cursor = listar_medicos(db)
+    assert [m.id for m in medicos] == [1, 5, 3, 2, 4]
+    assert cursor is None
+    _, cursor = listar_medicos(db, limit=2)
+    assert [m.id for m in listar_medicos(db, cursor=cursor)[0]] == [3, 2, 4]
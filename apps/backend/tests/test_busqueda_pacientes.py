@@ -0,0 +1,66 @@
+# python
+import pytest
+from sqlalchemy import event
+
+from app.models.models import Asignacion, Paciente
+from app.services.busqueda_pacientes import LIMITE_MAXIMO, buscar_pacientes, buscar_pacientes_con_asignacion
+
+
+@pytest.fixture
+def db(sesion, fabrica):
+    for documento, nombre in [("1234567", "José Pérez"), ("7654321", "María José Gómez"), ("1239999", "Pedro Alí")]:
+        fabrica.paciente(documento=documento, nombre=nombre)
+    sesion.commit()
+    return sesion
+
+
+def test_busqueda_por_nombre_ignora_acentos_y_mayusculas(db):
+    pacientes, total = buscar_pacientes(db, "JOSE")
+
+    assert total == 2
+    # El nombre que empieza con el término va primero
+    assert [p.nombre for p in pacientes] == ["José Pérez", "María José Gómez"]
+
+
+def test_busqueda_por_prefijo_de_documento(db):
+    pacientes, total = buscar_pacientes(db, "123")
+
+    assert total == 2
+    assert {p.documento for p in pacientes} == {"1234567", "1239999"}
+
+
+def test_busqueda_paginada_con_limite_maximo(db):
+    pacientes, total = buscar_pacientes(db, "e", skip=1, limit=LIMITE_MAXIMO + 50)
+
+    assert total == 3
+    assert len(pacientes) == 2
+
+
+def test_nombre_normalizado_se_actualiza_al_cambiar_el_nombre(db):
+    paciente = db.query(Paciente).filter_by(documento="1239999").one()
+    paciente.nombre = "Pedro Núñez"
+    db.commit()
+
+    assert paciente.nombre_normalizado == "pedro nunez"
+    assert buscar_pacientes(db, "nunez")[1] == 1
+
+
+def test_busqueda_con_asignacion_usa_cantidad_fija_de_consultas(db, fabrica):
+    hospital = fabrica.hospital(nombre="Hospital Central", codigo="HC")
+    medico = fabrica.medico(nombre="Dra. Ruiz", hospitales=[hospital])
+    db.flush()
+    for paciente in db.query(Paciente).all():
+        paciente.hospital_id = hospital.id
+        db.add(Asignacion(paciente_id=paciente.id, medico_id=medico.id, activo=True))
+    db.commit()
+    db.expunge_all()
+
+    sentencias = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: sentencias.append(args[2]))
+    filas, total = buscar_pacientes_con_asignacion(db, "e")
+    resultado = [(p.hospital.nombre, a.medico.nombre, [h.codigo for h in a.medico.hospitales]) for p, a in filas]
+
+    assert total == 3
+    assert resultado == [("Hospital Central", "Dra. Ruiz", ["HC"])] * 3
+    # COUNT + SELECT principal + colecciones del médico (especialidades, hospitales)
+    assert len(sentencias) == 4
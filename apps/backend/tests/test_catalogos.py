@@ -0,0 +1,97 @@
+# python
+import pytest
+from sqlalchemy import event
+
+from app.models.models import Especialidad, Hospital
+from app.services import catalogos
+from app.services.medico_service import MedicoValidationError, buscar_especialidades_por_nombre
+
+
+@pytest.fixture
+def db(engine, sesion, fabrica):
+    sesion.add_all([
+        Especialidad(id=1, nombre="Neumología", activa=1),
+        Especialidad(id=2, nombre="Cardiología", activa=0),
+    ])
+    fabrica.hospital(id=1, nombre="Central", codigo="HC", ciudad="Asunción")
+    fabrica.hospital(id=2, nombre="Regional Norte", codigo="RN")
+    sesion.commit()
+    catalogos.invalidar()
+    consultas = []
+    event.listen(engine, "before_cursor_execute", lambda *a: consultas.append(1))
+    yield sesion, consultas
+    catalogos.invalidar()
+
+
+def test_lecturas_desde_memoria(db):
+    sesion, consultas = db
+    assert [e["nombre"] for e in catalogos.especialidades(sesion)] == ["Neumología"]
+    assert [e["id"] for e in catalogos.especialidades(sesion, incluir_inactivas=True)] == [2, 1]
+    assert catalogos.hospital_por_id(sesion, 2)["nombre"] == "Regional Norte"
+    assert catalogos.especialidad_por_nombre(sesion, "  NEUMOLOGIA ")["id"] == 1
+    assert catalogos.hospital_por_id(sesion, 99) is None
+    assert len(consultas) == 2  # una carga de cada catálogo
+
+
+def test_invalidar_recarga_el_catalogo(db):
+    sesion, _ = db
+    assert catalogos.hospital_por_id(sesion, 3) is None
+    sesion.add(Hospital(id=3, nombre="Nuevo", codigo="NU"))
+    sesion.commit()
+    assert catalogos.hospital_por_id(sesion, 3) is None  # snapshot vigente
+    catalogos.invalidar()
+    assert catalogos.hospital_por_id(sesion, 3)["nombre"] == "Nuevo"
+
+
+def test_resolver(db):
+    sesion, consultas = db
+    catalogos.especialidades(sesion)
+    consultas.clear()
+
+    hospitales, faltante = catalogos.resolver(sesion, Hospital, [2, 1, 2])
+    assert faltante is None and [h.id for h in hospitales] == [2, 1]
+    assert len(consultas) == 1
+
+    consultas.clear()
+    assert catalogos.resolver(sesion, Especialidad, [1, 2], solo_activas=True) == ([], 2)
+    assert catalogos.resolver(sesion, Hospital, [7]) == ([], 7)
+    assert consultas == []  # IDs inválidos se rechazan sin consultar
+
+
+def test_buscar_especialidades_por_nombre(db):
+    sesion, _ = db
+    assert [e.id for e in buscar_especialidades_por_nombre(sesion, ["neumologia", " "])] == [1]
+    with pytest.raises(MedicoValidationError, match="Cardiología"):
+        buscar_especialidades_por_nombre(sesion, ["Cardiología"])
+
+
+def test_etag_depende_del_contenido(db):
+    sesion, _ = db
+    etag, actualizado = catalogos.validadores(sesion, "hospitales")
+    catalogos.invalidar()
+    assert catalogos.validadores(sesion, "hospitales") == (etag, actualizado)
+
+    sesion.get(Hospital, 1).nombre = "Central renovado"
+    sesion.commit()
+    catalogos.invalidar()
+    assert catalogos.validadores(sesion, "hospitales")[0] != etag
+
+
+def test_version_compartida_se_consulta_con_intervalo(db, monkeypatch):
+    sesion, _ = db
+    lecturas = []
+    obtener_original = catalogos._versiones.obtener
+    monkeypatch.setattr(catalogos._versiones, "obtener", lambda *a: lecturas.append(1) or obtener_original(*a))
+    monkeypatch.setattr(catalogos.settings, "CATALOGO_VERSION_CHECK_SECONDS", 3600)
+    for _ in range(5):
+        catalogos.hospitales(sesion)
+    assert lecturas == []  # invalidar() del fixture dejó la versión vista
+
+    # Otro worker invalida: con el intervalo vencido, la próxima lectura recarga
+    sesion.add(Hospital(id=3, nombre="Nuevo", codigo="NU"))
+    sesion.commit()
+    catalogos._versiones.guardar("version", -1)
+    assert catalogos.hospital_por_id(sesion, 3) is None
+    monkeypatch.setattr(catalogos.settings, "CATALOGO_VERSION_CHECK_SECONDS", 0)
+    assert catalogos.hospital_por_id(sesion, 3)["nombre"] == "Nuevo"
+    assert len(lecturas) == 1
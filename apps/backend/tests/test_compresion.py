@@ -0,0 +1,120 @@
+# python
+import gzip
+
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import compresion
+from app.core.compresion import CompresionMiddleware, elegir_codificacion
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+GRANDE = [{"id": i, "nombre": f"Hospital {i}", "ciudad": "Asunción"} for i in range(200)]
+
+app = FastAPI()
+app.add_middleware(CompresionMiddleware, minimo_bytes=500)
+
+
+@app.get("/grande")
+def grande():
+    return GRANDE
+
+
+@app.get("/chico")
+def chico():
+    return {"ok": True}
+
+
+@app.get("/catalogo")
+def catalogo(response: Response):
+    response.headers["ETag"] = '"abc"'
+    return GRANDE
+
+
+@app.get("/xlsx")
+def xlsx():
+    return Response(content=b"PK" + b"\x00" * 2000, media_type=XLSX)
+
+
+@app.get("/stream")
+def stream():
+    return StreamingResponse((b"linea %d\n" % i for i in range(300)), media_type="text/plain")
+
+
+@app.websocket("/ws")
+async def ws(websocket: WebSocket):
+    await websocket.accept()
+    await websocket.send_text("x" * 2000)
+    await websocket.close()
+
+
+cliente = TestClient(app)
+
+
+@pytest.fixture
+def sin_brotli(monkeypatch):
+    monkeypatch.setattr(compresion, "brotli", None)
+
+
+def test_elegir_codificacion(sin_brotli):
+    assert elegir_codificacion("gzip, deflate, br") == "gzip"
+    assert elegir_codificacion("gzip;q=0, deflate") is None
+    assert elegir_codificacion("*") == "gzip"
+    assert elegir_codificacion("") is None
+
+
+def test_respuesta_grande_con_gzip(sin_brotli):
+    respuesta = cliente.get("/grande", headers={"Accept-Encoding": "gzip, br"})
+    assert respuesta.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in respuesta.headers["vary"]
+    assert respuesta.json() == GRANDE
+    assert int(respuesta.headers["content-length"]) < len(respuesta.content)
+
+
+def test_respuesta_chica_sin_comprimir(sin_brotli):
+    respuesta = cliente.get("/chico", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in respuesta.headers
+    assert respuesta.json() == {"ok": True}
+
+
+def test_cliente_sin_accept_encoding():
+    respuesta = cliente.get("/grande", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in respuesta.headers
+    # Igual lleva Vary: la misma URL se comprime para otros clientes
+    assert "Accept-Encoding" in respuesta.headers["vary"]
+    etag = cliente.get("/catalogo", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    assert etag == '"abc"'
+
+
+def test_etag_pasa_a_debil_al_comprimir(sin_brotli):
+    respuesta = cliente.get("/catalogo", headers={"Accept-Encoding": "gzip"})
+    assert respuesta.headers["etag"] == 'W/"abc"'
+
+
+def test_xlsx_no_se_comprime(sin_brotli):
+    respuesta = cliente.get("/xlsx", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in respuesta.headers
+    assert "vary" not in respuesta.headers
+    assert respuesta.content.startswith(b"PK")
+
+
+def test_streaming_se_comprime_por_bloques(sin_brotli):
+    with cliente.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as respuesta:
+        assert respuesta.headers["content-encoding"] == "gzip"
+        assert "content-length" not in respuesta.headers
+        crudo = b"".join(respuesta.iter_raw())
+    assert gzip.decompress(crudo) == b"".join(b"linea %d\n" % i for i in range(300))
+
+
+def test_websocket_no_se_toca():
+    with cliente.websocket_connect("/ws", headers={"Accept-Encoding": "gzip"}) as websocket:
+        assert websocket.receive_text() == "x" * 2000
+
+
+def test_brotli_si_esta_instalado():
+    brotli = pytest.importorskip("brotli")
+    respuesta = cliente.get("/grande", headers={"Accept-Encoding": "gzip, br"})
+    assert respuesta.headers["content-encoding"] == "br"
+    assert respuesta.json() == GRANDE
+    assert brotli is compresion.brotli
@@ -0,0 +1,97 @@
+# python
+import pytest
+from sqlalchemy import event
+
+from app.models.models import Asignacion, Coordinador, Especialidad
+from app.services import estadisticas_hospitales
+from app.services.coordinador_service import (
+    desasignar_medico_de_paciente,
+    obtener_estadisticas_hospital,
+    obtener_pacientes_del_hospital,
+)
+
+
+@pytest.fixture
+def db(sesion, fabrica):
+    hospital = fabrica.hospital(id=1, nombre="Hospital Central", codigo="HC")
+    fabrica.hospital(id=2, nombre="Otro", codigo="OT")
+    fabrica.medico(
+        id=1, nombre="Dra. Ruiz", hospitales=[hospital], especialidades=[Especialidad(id=1, nombre="Neumología")],
+    )
+    sesion.add(Coordinador(
+        id=1, documento="C1", nombre="Coord", email="c1@example.com", hashed_password="x", hospital_id=1,
+    ))
+    for i in range(1, 6):
+        fabrica.paciente(id=i, hospital_id=1 if i < 5 else 2)
+    # Pacientes 1 y 2 con médico; el 3 tuvo uno pero ya no está activo
+    sesion.add_all([
+        Asignacion(paciente_id=1, medico_id=1, activo=True),
+        Asignacion(paciente_id=2, medico_id=1, activo=True),
+        Asignacion(paciente_id=3, medico_id=1, activo=False),
+    ])
+    sesion.commit()
+    sesion.expunge_all()
+    return sesion
+
+
+COORDINADOR = {"id": 1, "rol": "coordinador", "email": "c1@example.com", "nombre": "Coord"}
+
+
+def test_listado_paginado_con_medico_en_consultas_fijas(db):
+    sentencias = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: sentencias.append(args[2]))
+
+    pacientes, total = obtener_pacientes_del_hospital(db, 1, COORDINADOR, skip=1, limit=2, orden="-nombre")
+
+    assert total == 4
+    assert [p["nombre"] for p in pacientes] == ["Paciente 3", "Paciente 2"]
+    assert pacientes[0]["medico_asignado"] is None
+    assert pacientes[1]["medico_asignado"].nombre == "Dra. Ruiz"
+    assert [h.codigo for h in pacientes[1]["medico_asignado"].hospitales] == ["HC"]
+    # coordinador + COUNT + SELECT principal + colecciones del médico
+    assert len(sentencias) == 5
+
+
+def test_filtros_de_listado(db):
+    _, total = obtener_pacientes_del_hospital(db, 1, COORDINADOR, con_medico=False)
+    assert total == 2
+
+    pacientes, total = obtener_pacientes_del_hospital(db, 1, COORDINADOR, medico_id=1, q="paciente 2")
+    assert total == 1
+    assert pacientes[0]["documento"] == "P2"
+
+
+def test_estadisticas_desde_la_tabla_materializada(db):
+    estadisticas_hospitales.recalcular(db)
+    sentencias = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: sentencias.append(args[2]))
+
+    estadisticas = obtener_estadisticas_hospital(db, 1, COORDINADOR)
+    assert estadisticas["total_medicos"] == 1
+    assert estadisticas["total_pacientes"] == 4
+    assert estadisticas["pacientes_asignados"] == 2
+    assert estadisticas["pacientes_sin_medico"] == 2
+    assert estadisticas["porcentaje_cobertura"] == 50.0
+    assert estadisticas["medicos_por_especialidad"] == {"Neumología": 1}
+    # coordinador + fila materializada
+    assert len(sentencias) == 2
+
+    # Un cambio del coordinador se refleja enseguida
+    asignacion = db.query(Asignacion).filter_by(paciente_id=1, activo=True).one()
+    desasignar_medico_de_paciente(db, asignacion.id, COORDINADOR)
+    assert obtener_estadisticas_hospital(db, 1, COORDINADOR)["pacientes_asignados"] == 1
+
+
+def test_estadisticas_ven_los_cambios_masivos_marcados(db):
+    estadisticas_hospitales.recalcular(db)
+    # Un UPDATE masivo (como los de expiración o asignación masiva) sólo marca
+    db.query(Asignacion).filter_by(paciente_id=2).update({"activo": False}, synchronize_session=False)
+    estadisticas_hospitales.marcar_paciente(db, 2)
+    db.commit()
+    estadisticas_hospitales.recalcular(db, [1])  # lo que hace el worker incremental
+
+    assert obtener_estadisticas_hospital(db, 1, COORDINADOR)["pacientes_asignados"] == 1
+
+
+def test_estadisticas_de_hospital_sin_fila_materializada(db):
+    assert obtener_estadisticas_hospital(db, 1, COORDINADOR)["total_pacientes"] == 4
@@ -0,0 +1,206 @@
+# python
+import email
+import smtplib
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.models import EmailOutbox
+from app.services import email_service, email_outbox
+
+
+class SMTPFalso:
+    """Servidor SMTP en memoria: registra conexiones y mensajes enviados."""
+
+    conexiones = 0
+    enviados = []
+    mensajes = []
+
+    def __init__(self, host, port, timeout=None):
+        SMTPFalso.conexiones += 1
+
+    def starttls(self):
+        pass
+
+    def has_extn(self, nombre):
+        return False
+
+    def login(self, usuario, password):
+        pass
+
+    def sendmail(self, remitente, destinatarios, mensaje):
+        SMTPFalso.enviados.append(destinatarios[0])
+        SMTPFalso.mensajes.append(mensaje)
+
+    def noop(self):
+        return (250, b"OK")
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def smtp_falso(monkeypatch):
+    SMTPFalso.conexiones = 0
+    SMTPFalso.enviados = []
+    SMTPFalso.mensajes = []
+    monkeypatch.setattr(smtplib, "SMTP", SMTPFalso)
+    monkeypatch.setattr(email_service.settings, "SMTP_HOST", "localhost")
+    monkeypatch.setattr(email_service.settings, "SMTP_USER", "dev")
+    email_service.pool_smtp.cerrar()
+    yield SMTPFalso
+    email_service.cerrar_conexiones()
+
+
+def test_enviar_email_reutiliza_conexion(smtp_falso):
+    for i in range(3):
+        email_service.enviar_email(f"m{i}@example.com", "Asunto", "Cuerpo")
+
+    assert smtp_falso.enviados == ["m0@example.com", "m1@example.com", "m2@example.com"]
+    assert smtp_falso.conexiones == 1
+
+
+@pytest.fixture
+def db_outbox():
+    engine = create_engine("sqlite://")
+    EmailOutbox.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def test_outbox_envia_en_lote(smtp_falso, db_outbox):
+    for i in range(5):
+        email_outbox.encolar(db_outbox, f"m{i}@example.com", email_service.ContenidoEmail("Asunto", "Cuerpo"))
+    db_outbox.commit()
+
+    assert email_outbox.procesar_lote(db_outbox) == 5
+    assert sorted(smtp_falso.enviados) == [f"m{i}@example.com" for i in range(5)]
+    assert smtp_falso.conexiones == 1
+    estados = {c.estado for c in db_outbox.query(EmailOutbox)}
+    assert estados == {email_outbox.ESTADO_ENVIADO}
+
+
+def test_outbox_reintenta_y_pasa_a_dead_letter(smtp_falso, db_outbox, monkeypatch):
+    def sendmail_caido(self, remitente, destinatarios, mensaje):
+        raise smtplib.SMTPServerDisconnected("conexión cerrada")
+
+    monkeypatch.setattr(SMTPFalso, "sendmail", sendmail_caido)
+    monkeypatch.setattr(email_outbox.settings, "EMAIL_OUTBOX_MAX_RETRIES", 2)
+    correo = email_outbox.encolar(db_outbox, "m@example.com", email_service.ContenidoEmail("Asunto", "Cuerpo"))
+    db_outbox.commit()
+
+    email_outbox.procesar_lote(db_outbox)
+    assert correo.estado == email_outbox.ESTADO_PENDIENTE
+    assert correo.intentos == 1
+    assert correo.proximo_intento > datetime.utcnow()
+
+    correo.proximo_intento = datetime.utcnow()
+    db_outbox.commit()
+    email_outbox.procesar_lote(db_outbox)
+    assert correo.estado == email_outbox.ESTADO_FALLIDO
+    assert "conexión cerrada" in correo.ultimo_error
+    # El dead-letter conserva el cuerpo (cifrado) para revisarlo o reenviarlo
+    assert email_outbox._descifrar(correo.cuerpo_texto) == "Cuerpo"
+
+
+def test_outbox_no_guarda_secretos_en_claro(smtp_falso, db_outbox):
+    correo = email_outbox.encolar(db_outbox, "m@example.com", email_service.contenido_recuperacion_password(
+        "m@example.com", "Ana", "tok-secreto", 30
+    ))
+    db_outbox.commit()
+    assert "tok-secreto" not in correo.cuerpo_texto
+    assert "tok-secreto" not in correo.cuerpo_html
+
+    email_outbox.procesar_lote(db_outbox)
+    texto = email.message_from_string(smtp_falso.mensajes[0]).get_payload(0).get_payload(decode=True)
+    assert b"tok-secreto" in texto
+    # Una vez enviado no se conserva el cuerpo
+    assert correo.estado == email_outbox.ESTADO_ENVIADO
+    assert (correo.cuerpo_texto, correo.cuerpo_html) == ("", None)
+
+
+def test_outbox_envia_sin_transaccion_abierta(smtp_falso, db_outbox, monkeypatch):
+    durante_envio = []
+
+    def sendmail(self, remitente, destinatarios, mensaje):
+        durante_envio.append((db_outbox.in_transaction(), db_outbox.query(EmailOutbox.estado).scalar()))
+        db_outbox.rollback()
+
+    monkeypatch.setattr(SMTPFalso, "sendmail", sendmail)
+    email_outbox.encolar(db_outbox, "m@example.com", email_service.ContenidoEmail("Asunto", "Cuerpo"))
+    db_outbox.commit()
+
+    email_outbox.procesar_lote(db_outbox)
+    # Reclamado (y confirmado) antes de ir al SMTP
+    assert durante_envio == [(False, email_outbox.ESTADO_ENVIANDO)]
+    assert db_outbox.query(EmailOutbox).one().estado == email_outbox.ESTADO_ENVIADO
+
+
+def test_outbox_reintenta_lotes_con_plazo_vencido(smtp_falso, db_outbox):
+    ahora = datetime.utcnow()
+    for destinatario, plazo in [
+        ("caido@example.com", ahora - timedelta(seconds=1)),
+        ("vigente@example.com", ahora + timedelta(minutes=5)),
+    ]:
+        db_outbox.add(EmailOutbox(
+            destinatario=destinatario, asunto="Asunto", cuerpo_texto="Cuerpo",
+            estado=email_outbox.ESTADO_ENVIANDO, intentos=0, proximo_intento=plazo,
+        ))
+    db_outbox.commit()
+
+    assert email_outbox.procesar_lote(db_outbox) == 1
+    assert smtp_falso.enviados == ["caido@example.com"]
+
+
+def test_outbox_envia_pendientes_encolados_en_claro(smtp_falso, db_outbox):
+    # Filas anteriores al cifrado de los cuerpos
+    db_outbox.add(EmailOutbox(
+        destinatario="m@example.com", asunto="Asunto", cuerpo_texto="Código: tok-viejo",
+        estado=email_outbox.ESTADO_PENDIENTE, intentos=0, proximo_intento=datetime.utcnow(),
+    ))
+    db_outbox.commit()
+
+    email_outbox.procesar_lote(db_outbox)
+    assert db_outbox.query(EmailOutbox).one().estado == email_outbox.ESTADO_ENVIADO
+    texto = email.message_from_string(smtp_falso.mensajes[0]).get_payload(0).get_payload(decode=True)
+    assert "tok-viejo" in texto.decode()
+
+
+def test_outbox_purga_correos_viejos_procesados(db_outbox):
+    ahora = datetime.utcnow()
+    viejo, reciente = ahora - timedelta(days=30), ahora - timedelta(hours=1)
+    for estado, creado in [
+        ("enviado", viejo), ("fallido", viejo), ("pendiente", viejo), ("enviado", reciente),
+    ]:
+        db_outbox.add(EmailOutbox(
+            destinatario="m@example.com", asunto="Asunto", cuerpo_texto="", estado=estado, created_at=creado,
+        ))
+    db_outbox.commit()
+
+    assert email_outbox.purgar(db_outbox, ahora=ahora) == 2
+    assert sorted(c.estado for c in db_outbox.query(EmailOutbox)) == ["enviado", "pendiente"]
+
+
+def test_outbox_sin_smtp_configurado_no_envia(db_outbox, monkeypatch):
+    monkeypatch.setattr(email_service.settings, "SMTP_HOST", "")
+    email_outbox.encolar(db_outbox, "m@example.com", email_service.ContenidoEmail("Asunto", "Cuerpo"))
+    db_outbox.commit()
+
+    assert email_outbox.procesar_lote(db_outbox) == 0
+    assert db_outbox.query(EmailOutbox).one().estado == email_outbox.ESTADO_PENDIENTE
+
+
+def test_plantilla_escapa_valores_en_html():
+    asunto, texto, cuerpo_html = email_service.contenido_bienvenida_medico(
+        "m@example.com", "Ana <b>", "Hospital & Clínica", "Tmp-1"
+    )
+
+    assert "Hola Ana <b>," in texto
+    assert "Ana &lt;b&gt;" in cuerpo_html
+    assert "Hospital &amp; Clínica" in cuerpo_html
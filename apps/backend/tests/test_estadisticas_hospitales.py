@@ -0,0 +1,83 @@
+# python
+from contextlib import contextmanager
+
+import pytest
+
+from app.models.models import (
+    Asignacion, Especialidad, EstadisticaHospital, FormularioAsignacion, Mensaje, Paciente, RolEnum,
+)
+from app.services import estadisticas_hospitales
+
+
+@pytest.fixture
+def db(sesion, fabrica, sesiones_de_workers):
+    fabrica.medico(
+        id=1, nombre="Dra. Ruiz", hospitales=[fabrica.hospital(id=1, nombre="Central", codigo="HC")],
+        especialidades=[Especialidad(id=1, nombre="Neumología")],
+    )
+    fabrica.hospital(id=2, nombre="Vacío", codigo="HV")
+    for i in (1, 2, 3):
+        fabrica.paciente(id=i, hospital_id=1)
+    fabrica.formulario(id=1)
+    sesion.add_all([
+        Asignacion(paciente_id=1, medico_id=1, activo=True),
+        FormularioAsignacion(formulario_id=1, paciente_id=1, asignado_por=1, estado="pendiente"),
+        Mensaje(contenido="hola", paciente_id=1, medico_id=1, leido=0, remitente_rol=RolEnum.paciente),
+    ])
+    sesion.commit()
+    estadisticas_hospitales.actualizar_pendientes()  # descarta los cambios de la carga inicial
+    return sesion
+
+
+def _fila(db, hospital_id):
+    db.expire_all()
+    return db.get(EstadisticaHospital, hospital_id)
+
+
+def test_recalculo_completo(db):
+    assert estadisticas_hospitales.recalcular(db) == 2
+
+    filas = {f["hospital_id"]: f for f in estadisticas_hospitales.listar(db)}
+    assert filas[1]["total_pacientes"] == 3
+    assert filas[1]["pacientes_asignados"] == 1
+    assert filas[1]["pacientes_sin_medico"] == 2
+    assert filas[1]["total_medicos"] == 1
+    assert filas[1]["medicos_por_especialidad"] == {"Neumología": 1}
+    assert filas[1]["formularios_pendientes"] == 1
+    assert filas[1]["mensajes_no_leidos"] == 1
+    assert filas[2]["total_pacientes"] == 0
+    assert filas[2]["hospital_nombre"] == "Vacío"
+
+
+def test_actualizacion_incremental_tras_commit(db):
+    estadisticas_hospitales.recalcular(db)
+
+    db.add(Asignacion(paciente_id=2, medico_id=1, activo=True))
+    db.get(Paciente, 3).hospital_id = 2
+    db.flush()
+    db.rollback()
+    assert estadisticas_hospitales.actualizar_pendientes() == 0  # lo deshecho no cuenta
+
+    db.add(Asignacion(paciente_id=2, medico_id=1, activo=True))
+    db.get(Paciente, 3).hospital_id = 2
+    db.commit()
+    assert estadisticas_hospitales.actualizar_pendientes() == 2
+
+    assert (_fila(db, 1).total_pacientes, _fila(db, 1).pacientes_asignados) == (2, 2)
+    assert _fila(db, 2).total_pacientes == 1
+
+
+def test_sin_liderazgo_no_recalcula_y_conserva_los_cambios(db, monkeypatch):
+    @contextmanager
+    def otra_replica(clave):
+        yield False
+
+    lider = estadisticas_hospitales.liderazgo
+    db.get(Paciente, 3).hospital_id = 2
+    db.commit()
+    monkeypatch.setattr(estadisticas_hospitales, "liderazgo", otra_replica)
+    assert estadisticas_hospitales.recalcular_todo() == 0
+    assert estadisticas_hospitales.actualizar_pendientes() == 0
+
+    monkeypatch.setattr(estadisticas_hospitales, "liderazgo", lider)
+    assert estadisticas_hospitales.actualizar_pendientes() == 2
@@ -0,0 +1,55 @@
+# python
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.models import EstadisticaHospital, FormularioAsignacion
+from app.services import estadisticas_hospitales, expiracion_formularios
+
+AHORA = datetime.utcnow().replace(microsecond=0)
+
+
+@pytest.fixture
+def db(sesion, fabrica, sesiones_de_workers):
+    fabrica.hospital(id=1)
+    fabrica.medico(id=1)
+    fabrica.paciente(id=1, hospital_id=1)
+    fabrica.formulario(id=1)
+    vencida, vigente = AHORA - timedelta(hours=1), AHORA + timedelta(hours=1)
+    for estado, expiracion in [
+        ("pendiente", vencida), ("pendiente", vencida), ("pendiente", vencida),
+        ("pendiente", vigente), ("pendiente", None), ("completado", vencida),
+    ]:
+        sesion.add(FormularioAsignacion(
+            formulario_id=1, paciente_id=1, asignado_por=1, estado=estado, fecha_expiracion=expiracion,
+        ))
+    sesion.commit()
+    estadisticas_hospitales.actualizar_pendientes()  # descarta los cambios de la carga inicial
+    return sesion
+
+
+def _estados(db):
+    db.expire_all()
+    return [a.estado for a in db.query(FormularioAsignacion).order_by(FormularioAsignacion.id)]
+
+
+def test_expira_solo_pendientes_vencidas_por_lotes(db):
+    assert expiracion_formularios.expirar_vencidas(db, ahora=AHORA, lote=2) == 3
+    assert _estados(db) == ["expirado", "expirado", "expirado", "pendiente", "pendiente", "completado"]
+    # Idempotente
+    assert expiracion_formularios.expirar_vencidas(db, ahora=AHORA) == 0
+
+
+def test_actualiza_estadisticas_del_hospital(db):
+    estadisticas_hospitales.recalcular(db)
+    assert db.get(EstadisticaHospital, 1).formularios_pendientes == 5
+
+    expiracion_formularios.expirar_vencidas(db, ahora=AHORA)
+    assert estadisticas_hospitales.actualizar_pendientes() == 1
+    db.expire_all()
+    assert db.get(EstadisticaHospital, 1).formularios_pendientes == 2
+
+
+def test_pasada_completa_sin_postgresql(db):
+    assert expiracion_formularios.expirar_pendientes() == 3
+    assert _estados(db).count("expirado") == 3
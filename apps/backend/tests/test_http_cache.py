@@ -0,0 +1,53 @@
+# python
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.core.http_cache import no_modificado
+
+ETAG = '"abc123"'
+MODIFICADO = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+
+app = FastAPI()
+llamadas = []
+
+
+@app.get("/catalogo")
+def catalogo(request: Request, response: Response):
+    no_modificada = no_modificado(request, response, ETAG, MODIFICADO, max_age=30)
+    if no_modificada:
+        return no_modificada
+    llamadas.append(1)
+    return [{"id": 1}]
+
+
+cliente = TestClient(app)
+
+
+def test_respuesta_completa_con_validadores():
+    respuesta = cliente.get("/catalogo")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["etag"] == ETAG
+    assert respuesta.headers["cache-control"] == "public, max-age=30"
+    assert respuesta.headers["last-modified"] == "Thu, 01 Oct 2026 12:00:00 GMT"
+
+
+def test_if_none_match():
+    llamadas.clear()
+    for valor in (ETAG, f'"otro", W/{ETAG}', "*"):
+        respuesta = cliente.get("/catalogo", headers={"If-None-Match": valor})
+        assert respuesta.status_code == 304
+        assert respuesta.content == b""
+        assert respuesta.headers["etag"] == ETAG
+    assert llamadas == []
+    assert cliente.get("/catalogo", headers={"If-None-Match": '"viejo"'}).status_code == 200
+
+
+def test_if_modified_since_solo_sin_if_none_match():
+    fecha = "Thu, 01 Oct 2026 12:00:00 GMT"
+    assert cliente.get("/catalogo", headers={"If-Modified-Since": fecha}).status_code == 304
+    assert cliente.get("/catalogo", headers={"If-Modified-Since": "Wed, 30 Sep 2026 00:00:00 GMT"}).status_code == 200
+    assert cliente.get("/catalogo", headers={"If-Modified-Since": "no es una fecha"}).status_code == 200
+    respuesta = cliente.get("/catalogo", headers={"If-Modified-Since": fecha, "If-None-Match": '"viejo"'})
+    assert respuesta.status_code == 200
@@ -0,0 +1,28 @@
+# python
+from app.core.metricas import Contador, Histograma
+
+
+def test_contador_exporta_por_etiquetas():
+    contador = Contador("requests_total", "Requests.", ("route",))
+    contador.inc("/a")
+    contador.inc("/a")
+    contador.inc("/b")
+
+    lineas = contador.exportar()
+
+    assert 'requests_total{route="/a"} 2' in lineas
+    assert 'requests_total{route="/b"} 1' in lineas
+
+
+def test_histograma_acumula_buckets():
+    histograma = Histograma("latencia_seconds", "Latencia.", buckets=(0.1, 1.0))
+    histograma.observar(0.05)
+    histograma.observar(0.5)
+    histograma.observar(3.0)
+
+    lineas = histograma.exportar()
+
+    assert 'latencia_seconds_bucket{le="0.1"} 1' in lineas
+    assert 'latencia_seconds_bucket{le="1.0"} 2' in lineas
+    assert 'latencia_seconds_bucket{le="+Inf"} 3' in lineas
+    assert "latencia_seconds_count 3" in lineas
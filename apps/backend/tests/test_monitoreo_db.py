@@ -0,0 +1,30 @@
+# python
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.monitoreo_db import MonitoreoDBMiddleware, forma_parametros
+
+
+def test_forma_parametros_no_expone_valores():
+    assert forma_parametros({"documento": "1234567", "limite": 10}) == "{documento: str, limite: int}"
+    assert forma_parametros(("ana@example.com", 3)) == "(str, int)"
+    assert forma_parametros([{"id": 1}, {"id": 2}]) == "2 x {id: int}"
+
+
+def test_middleware_cuenta_consultas_de_la_request():
+    engine = create_engine("sqlite://")
+    app = FastAPI()
+    app.add_middleware(MonitoreoDBMiddleware)
+
+    @app.get("/dos-consultas")
+    def dos_consultas():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {}
+
+    respuesta = TestClient(app).get("/dos-consultas")
+
+    assert respuesta.headers["x-db-queries"] == "2"
+    assert respuesta.headers["server-timing"].startswith("db;dur=")
@@ -0,0 +1,77 @@
+# python
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.models import FormularioAsignacion, FormularioProgramacion
+from app.services import estadisticas_hospitales, programacion_formularios
+
+INICIO = datetime(2026, 1, 1, 8, 0)
+
+
+@pytest.fixture
+def db(sesion, fabrica, sesiones_de_workers):
+    fabrica.medico(id=1)
+    fabrica.formulario(id=1)
+    for i in (1, 2):
+        fabrica.paciente(id=i)
+    # Asignación manual previa: las programadas continúan la numeración
+    sesion.add(FormularioAsignacion(formulario_id=1, paciente_id=1, asignado_por=1, numero_instancia=1))
+    sesion.commit()
+    return sesion
+
+
+def _programar(db, **kwargs):
+    datos = dict(
+        formulario_id=1, paciente_ids=[1, 2, 1], creado_por=1,
+        intervalo_dias=7, repeticiones=3, fecha_inicio=INICIO, vigencia_dias=2,
+    )
+    datos.update(kwargs)
+    programaciones = programacion_formularios.crear_programaciones(db, **datos)
+    db.commit()
+    return programaciones
+
+
+def _programadas(db):
+    db.expire_all()
+    return [
+        (a.paciente_id, a.numero_instancia, a.fecha_asignacion, a.fecha_expiracion, a.estado)
+        for a in db.query(FormularioAsignacion)
+        .filter(FormularioAsignacion.programacion_id.isnot(None))
+        .order_by(FormularioAsignacion.fecha_asignacion, FormularioAsignacion.paciente_id)
+    ]
+
+
+def test_genera_ocurrencias_vencidas_con_numeracion_en_sql(db):
+    assert len(_programar(db)) == 2  # sin pacientes repetidos
+
+    # A los 8 días vencieron dos ocurrencias de cada programación
+    assert programacion_formularios.materializar(db, ahora=INICIO + timedelta(days=8), lote=1) == 4
+    semana = timedelta(days=7)
+    vigencia = timedelta(days=2)
+    assert _programadas(db) == [
+        (1, 2, INICIO, INICIO + vigencia, "pendiente"),
+        (2, 1, INICIO, INICIO + vigencia, "pendiente"),
+        (1, 3, INICIO + semana, INICIO + semana + vigencia, "pendiente"),
+        (2, 2, INICIO + semana, INICIO + semana + vigencia, "pendiente"),
+    ]
+    programacion = db.query(FormularioProgramacion).filter_by(paciente_id=1).one()
+    assert (programacion.generadas, programacion.proxima_fecha, programacion.activa) == (2, INICIO + 2 * semana, True)
+
+
+def test_se_desactiva_al_completar_repeticiones(db):
+    _programar(db, paciente_ids=[2], vigencia_dias=None)
+
+    assert programacion_formularios.materializar(db, ahora=INICIO + timedelta(days=365)) == 3
+    assert programacion_formularios.materializar(db, ahora=INICIO + timedelta(days=365)) == 0
+    assert [fila[1] for fila in _programadas(db)] == [1, 2, 3]
+    assert all(fila[3] is None for fila in _programadas(db))
+    assert db.query(FormularioProgramacion).one().activa is False
+
+
+def test_dos_programaciones_del_mismo_formulario_no_repiten_instancia(db):
+    _programar(db, paciente_ids=[2], repeticiones=1)
+    _programar(db, paciente_ids=[2], repeticiones=1)
+
+    assert programacion_formularios.materializar(db, ahora=INICIO) == 2
+    assert sorted(fila[1] for fila in _programadas(db)) == [1, 2]
@@ -0,0 +1,87 @@
+# python
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.deps import get_current_user
+from app.core.respuestas import json_directo
+from app.db.db import get_db
+from app.models.models import Asignacion, FormularioAsignacion, RespuestaFormulario
+from app.routers import formularios
+from app.schemas.schemas import RespuestasResumenPaginadoOut
+
+FILAS = [
+    {
+        "asignacion_id": i, "formulario_id": 3, "formulario_titulo": "Seguimiento",
+        "estado": "completado" if i % 2 else "pendiente", "numero_instancia": 1,
+        "paciente_id": i, "paciente_nombre": f"Paciente ñ {i}", "paciente_documento": str(1000 + i),
+        "medico_id": None, "medico_nombre": None, "hospital_id": 2, "hospital_nombre": "Hospital",
+        "fecha_asignacion": datetime(2026, 10, 1, 8, 30, 15, 123456),
+        "fecha_completado": datetime(2026, 10, 2, 9, 0) if i % 2 else None,
+        "tiene_respuesta": bool(i % 2),
+    }
+    for i in range(5)
+]
+
+app = FastAPI()
+
+
+@app.get("/validado", response_model=RespuestasResumenPaginadoOut)
+def validado():
+    return {"total": len(FILAS), "items": FILAS}
+
+
+@app.get("/directo", response_model=RespuestasResumenPaginadoOut)
+def directo():
+    return json_directo({"total": len(FILAS), "items": FILAS})
+
+
+cliente = TestClient(app)
+
+
+def test_json_directo_igual_al_response_model():
+    esperado = cliente.get("/validado")
+    respuesta = cliente.get("/directo")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"] == "application/json"
+    assert respuesta.json() == esperado.json()
+
+
+def test_json_directo_conserva_headers_y_status():
+    respuesta = json_directo({"ok": True}, status_code=201, headers={"X-Total-Count": "1"})
+    assert respuesta.status_code == 201
+    assert respuesta.headers["x-total-count"] == "1"
+
+
+def test_resumen_de_respuestas_cumple_el_schema(sesion, fabrica):
+    # El endpoint arma el JSON sin pasar por el response_model: si el schema y
+    # las filas se desalinean (campos, defaults, None) este test lo detecta
+    fabrica.medico(id=1, nombre="Dra. Ruiz")
+    fabrica.hospital(id=1, nombre="Central")
+    fabrica.paciente(id=1, hospital_id=1)
+    fabrica.paciente(id=2)  # sin hospital ni médico
+    fabrica.formulario(id=1, titulo="Seguimiento")
+    fabrica.formulario(id=2, titulo=None)
+    sesion.add_all([
+        Asignacion(paciente_id=1, medico_id=1, activo=True),
+        FormularioAsignacion(
+            id=1, formulario_id=1, paciente_id=1, asignado_por=1, estado="completado",
+            fecha_asignacion=datetime(2026, 10, 1, 8, 30, 15, 123456), fecha_completado=datetime(2026, 10, 2, 9, 0),
+        ),
+        FormularioAsignacion(
+            id=2, formulario_id=2, paciente_id=2, asignado_por=1, numero_instancia=3,
+            fecha_asignacion=datetime(2026, 10, 3),
+        ),
+        RespuestaFormulario(formulario_id=1, paciente_id=1, asignacion_id=1, respuestas={}),
+    ])
+    sesion.commit()
+
+    app_formularios = FastAPI()
+    app_formularios.include_router(formularios.router)
+    app_formularios.dependency_overrides[get_db] = lambda: sesion
+    app_formularios.dependency_overrides[get_current_user] = lambda: {"id": 1, "rol": "admin"}
+    datos = TestClient(app_formularios).get("/respuestas").json()
+
+    assert datos["total"] == 2
+    assert RespuestasResumenPaginadoOut.model_validate(datos).model_dump(mode="json") == datos
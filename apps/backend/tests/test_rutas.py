@@ -0,0 +1,29 @@
+# python
+import os
+import subprocess
+import sys
+from collections import Counter
+
+from starlette.routing import Route, WebSocketRoute
+
+
+def test_sin_rutas_duplicadas():
+    from app.main import app
+
+    claves = Counter(
+        (metodo, ruta.path)
+        for ruta in app.routes if isinstance(ruta, Route)
+        for metodo in ruta.methods or ()
+    )
+    claves.update(("WS", ruta.path) for ruta in app.routes if isinstance(ruta, WebSocketRoute))
+    assert [clave for clave, n in claves.items() if n > 1] == []
+
+
+def test_arranque_no_importa_openpyxl():
+    # En un proceso nuevo: otros tests pueden haber importado openpyxl
+    proceso = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print('openpyxl' in sys.modules)"],
+        capture_output=True, text=True, env=os.environ.copy(),
+    )
+    assert proceso.returncode == 0, proceso.stderr
+    assert proceso.stdout.strip() == "False"
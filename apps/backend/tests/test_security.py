@@ -0,0 +1,141 @@
+# python
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import JWTError
+
+from app.core import deps, security
+
+
+@pytest.fixture(autouse=True)
+def cache_vacia():
+    security._cache_tokens.limpiar()
+    yield
+    security._cache_tokens.limpiar()
+
+
+def _token(**extra):
+    datos = {"sub": "7", "rol": "admin", "email": "a@example.com", "nombre": "Ana", **extra}
+    return security.create_access_token(datos, expires_delta=timedelta(minutes=5))
+
+
+def test_token_valido_se_verifica_una_sola_vez(monkeypatch):
+    token = _token()
+    llamadas = []
+    decode_original = security.jwt.decode
+    monkeypatch.setattr(security.jwt, "decode", lambda *a, **k: llamadas.append(1) or decode_original(*a, **k))
+
+    usuario = deps.get_current_user(token)
+    assert usuario == {"id": 7, "rol": "admin", "email": "a@example.com", "nombre": "Ana"}
+    assert security.get_current_user(token, db=None) == usuario
+    assert len(llamadas) == 1
+
+
+def test_token_invalido_no_se_cachea():
+    token = _token()[:-2] + "xx"
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            deps.get_current_user(token)
+        assert error.value.status_code == 401
+    assert len(security._cache_tokens) == 0
+
+
+def test_token_expirado_no_se_acepta():
+    token = security.create_access_token({"sub": "7", "rol": "admin"}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(JWTError):
+        security.decodificar_token(token)
+    assert security.decode_token(token) is None
+
+
+@pytest.fixture
+def db_admin():
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db.db import Base
+    from app.models.models import Admin
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    sesion = sessionmaker(bind=engine)()
+    sesion.add(Admin(id=7, documento="A7", nombre="Ana", email="a@example.com", hashed_password="x", activo=1))
+    sesion.commit()
+    consultas = []
+    event.listen(engine, "before_cursor_execute", lambda *a: consultas.append(1))
+    deps._admins_activos.limpiar()
+    yield sesion, consultas
+    deps._admins_activos.limpiar()
+    sesion.close()
+
+
+def test_require_admin_cachea_estado_activo(db_admin):
+    db, consultas = db_admin
+    usuario = {"id": 7, "rol": "admin", "email": "a@example.com", "nombre": "Ana"}
+    for _ in range(3):
+        assert deps.require_admin(usuario, db) == usuario
+    assert len(consultas) == 1
+
+
+def test_baja_de_admin_se_aplica_al_instante(db_admin):
+    db, _ = db_admin
+    usuario = {"id": 7, "rol": "admin", "email": "a@example.com", "nombre": "Ana"}
+    deps.require_admin(usuario, db)
+
+    db.query(deps.Admin).filter(deps.Admin.id == 7).update({"activo": 0})
+    db.commit()
+    deps.registrar_estado_admin(7, False)
+
+    with pytest.raises(HTTPException) as error:
+        deps.require_admin(usuario, db)
+    assert error.value.status_code == 403
+    # Un lector que consultó antes de la baja no puede volver a marcarlo activo
+    assert deps._admins_activos.agregar(7, True) is False
+
+
+def test_admin_inexistente_no_se_cachea(db_admin):
+    db, _ = db_admin
+    assert deps.admin_activo(db, 99) is False
+    assert deps._admins_activos.obtener(99) is None
+
+
+def test_require_rol_devuelve_la_misma_dependencia():
+    assert deps.require_rol("admin", detalle="x") is deps.require_rol("admin", detalle="x")
+    assert deps.require_role(["medico", "admin"]) is deps.require_rol("medico", "admin")
+
+
+def test_usuario_se_resuelve_una_vez_por_request(monkeypatch):
+    from fastapi import Depends, FastAPI
+    from fastapi.testclient import TestClient
+
+    llamadas = []
+    original = deps.usuario_desde_token
+    monkeypatch.setattr(deps, "usuario_desde_token", lambda t: llamadas.append(t) or original(t))
+
+    def otra_dependencia(user: dict = Depends(deps.get_current_user)):
+        return user
+
+    app = FastAPI()
+
+    @app.get("/x")
+    def ruta(
+        admin: dict = Depends(deps.require_rol("admin", detalle="Solo admins")),
+        coord: dict = Depends(deps.require_admin_or_coordinador),
+        otro: dict = Depends(otra_dependencia),
+    ):
+        return {"id": admin["id"], "mismo": admin is coord is otro}
+
+    @app.get("/solo-medicos")
+    def solo_medicos(user: dict = Depends(deps.require_rol("medico", detalle="Solo médicos"))):
+        return user
+
+    cliente = TestClient(app)
+    cabecera = {"Authorization": f"Bearer {_token()}"}
+    respuesta = cliente.get("/x", headers=cabecera)
+    assert respuesta.json() == {"id": 7, "mismo": True}
+    assert len(llamadas) == 1
+
+    respuesta = cliente.get("/solo-medicos", headers=cabecera)
+    assert respuesta.status_code == 403
+    assert respuesta.json()["detail"] == "Solo médicos"
+    assert cliente.get("/x").status_code == 401
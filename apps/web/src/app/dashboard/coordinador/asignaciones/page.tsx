@@ -64,7 +64,7 @@ export default function CoordinadorAsignacionesPage() {
         apiClient.setToken(token);
 
         const [pacientesData, medicosData] = await Promise.all([
-          apiClient.getCoordinadorPacientes(),
+          apiClient.getAllCoordinadorPacientes(),
           apiClient.getCoordinadorMedicos(),
         ]);
 
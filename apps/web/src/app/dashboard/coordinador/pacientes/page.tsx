@@ -38,7 +38,7 @@ export default function CoordinadorPacientesPage() {
     try {
       if (token) {
         apiClient.setToken(token);
-        const pacientesData = await apiClient.getCoordinadorPacientes();
+        const pacientesData = await apiClient.getAllCoordinadorPacientes();
         console.log('👥 Pacientes del hospital:', pacientesData);
         setPackientes(pacientesData);
       }
@@ -40,6 +40,8 @@ import {
   FormularioListItem,
   FormularioAsignacion,
   FormularioAsignacionCreate,
+  FormularioAsignacionMasivaCreate,
+  FormularioAsignacionMasivaResultado,
   FormularioAsignacionDetalle,
   RespuestaFormularioCreate,
   RespuestaFormulario,
@@ -261,10 +263,26 @@ clearToken() {
     }
   }
 
-  async getAllMedicos(): Promise<Medico[]> {
+  /**
+   * Obtiene los médicos ordenados por nombre, recorriendo todas las páginas
+   * (el backend pagina por cursor con el header `X-Next-Cursor`).
+   */
+  async getAllMedicos(params?: {
+    hospital_id?: number;
+    especialidad_id?: number;
+    nombre?: string;
+  }): Promise<Medico[]> {
     try {
-      const response = await this.client.get<Medico[]>('/medicos/');
-      return response.data;
+      const medicos: Medico[] = [];
+      let cursor: string | undefined;
+      do {
+        const response = await this.client.get<Medico[]>('/medicos/', {
+          params: { ...params, limit: 500, cursor },
+        });
+        medicos.push(...response.data);
+        cursor = response.headers['x-next-cursor'] || undefined;
+      } while (cursor);
+      return medicos;
     } catch (error) {
       throw this.handleError(error);
     }
@@ -321,12 +339,25 @@ clearToken() {
     }
   }
 
+  /**
+   * Obtiene los médicos de una especialidad recorriendo todas las páginas
+   * (el backend devuelve el total en el header `X-Total-Count`).
+   */
   async getMedicosByEspecialidad(especialidadId: number): Promise<MedicoEspecialidad[]> {
     try {
-      const response = await this.client.get<MedicoEspecialidad[]>(
-        `/especialidades/${especialidadId}/medicos`
-      );
-      return response.data;
+      const limit = 500;
+      const medicos: MedicoEspecialidad[] = [];
+      let total = 0;
+      do {
+        const response = await this.client.get<MedicoEspecialidad[]>(
+          `/especialidades/${especialidadId}/medicos`,
+          { params: { skip: medicos.length, limit } }
+        );
+        medicos.push(...response.data);
+        total = Number(response.headers['x-total-count'] ?? medicos.length);
+        if (response.data.length === 0) break;
+      } while (medicos.length < total);
+      return medicos;
     } catch (error) {
       throw this.handleError(error);
     }
@@ -758,17 +789,53 @@ clearToken() {
   }
 
   /**
-   * Obtiene los pacientes del hospital del coordinador
+   * Obtiene los pacientes del hospital del coordinador (paginado; el total
+   * viene en el header X-Total-Count)
    */
-  async getCoordinadorPacientes(): Promise<Paciente[]> {
+  async getCoordinadorPacientes(params?: {
+    skip?: number;
+    limit?: number;
+    q?: string;
+    con_medico?: boolean;
+    medico_id?: number;
+    orden?: string;
+  }): Promise<Paciente[]> {
     try {
-      const response = await this.client.get<Paciente[]>('/coordinadores/me/pacientes');
+      const response = await this.client.get<Paciente[]>('/coordinadores/me/pacientes', { params });
       return response.data;
     } catch (error) {
       throw this.handleError(error);
     }
   }
 
+  /**
+   * Obtiene TODOS los pacientes del hospital del coordinador, recorriendo las
+   * páginas hasta el total del header X-Total-Count
+   */
+  async getAllCoordinadorPacientes(params?: {
+    q?: string;
+    con_medico?: boolean;
+    medico_id?: number;
+    orden?: string;
+  }): Promise<Paciente[]> {
+    try {
+      const limit = 500;
+      const pacientes: Paciente[] = [];
+      let total = 0;
+      do {
+        const response = await this.client.get<Paciente[]>('/coordinadores/me/pacientes', {
+          params: { ...params, skip: pacientes.length, limit },
+        });
+        pacientes.push(...response.data);
+        total = Number(response.headers['x-total-count'] ?? pacientes.length);
+        if (response.data.length === 0) break;
+      } while (pacientes.length < total);
+      return pacientes;
+    } catch (error) {
+      throw this.handleError(error);
+    }
+  }
+
 
   // ========== ASIGNACIONES ENDPOINTS ==========
 
@@ -1128,6 +1195,26 @@ async buscarPaciente(query: string, soloSinHospital: boolean = false): Promise<B
     }
   }
 
+  /**
+   * Asigna un formulario a varios pacientes (o a todos los pacientes activos del médico) en una sola request
+   */
+  async asignarFormularioMasivo(data: FormularioAsignacionMasivaCreate): Promise<FormularioAsignacionMasivaResultado> {
+    try {
+      const response = await this.client.post<FormularioAsignacionMasivaResultado>(
+        `/formularios/${data.formulario_id}/asignaciones/masivas`,
+        {
+          paciente_ids: data.paciente_ids,
+          todos_mis_pacientes: data.todos_mis_pacientes ?? false,
+          fecha_expiracion: data.fecha_expiracion,
+          datos_extra: data.datos_extra,
+        }
+      );
+      return response.data;
+    } catch (error) {
+      throw this.handleError(error);
+    }
+  }
+
   /**
    * Obtiene las asignaciones de un formulario
    */
@@ -493,6 +493,21 @@ export interface FormularioAsignacionCreate {
   datos_extra?: Record<string, any>;
 }
 
+/** Asignación masiva: `paciente_ids` o `todos_mis_pacientes` (solo uno de los dos) */
+export interface FormularioAsignacionMasivaCreate {
+  formulario_id: number;
+  paciente_ids?: number[];
+  todos_mis_pacientes?: boolean;
+  fecha_expiracion?: string;
+  datos_extra?: Record<string, any>;
+}
+
+export interface FormularioAsignacionMasivaResultado {
+  formulario_id: number;
+  asignadas: number;
+  paciente_ids: number[];
+}
+
 export interface FormularioAsignacionDetalle extends FormularioAsignacion {
   formulario_titulo?: string;
   formulario_tipo: string;